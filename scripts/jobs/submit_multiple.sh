@@ -17,6 +17,26 @@ fi
 echo "Proceeding with job submission..."
 echo ""
 
+source ~/scripts/util/events.sh
+
+# Check the calculations below every jobscript (a chain jobscript runs its
+# subdirectories) before anything reaches the queue.  VALIDATE=0 skips this;
+# the report is kept in validation.json.
+if [[ "${VALIDATE:-1}" != 0 ]]; then
+    mapfile -d '' job_dirs < <(find . -name "jobscript" -type f -printf '%h\0')
+    if (( ${#job_dirs[@]} > 0 )) && \
+       ! python3 ~/scripts/util/validate_inputs.py "${job_dirs[@]}" --json validation.json; then
+        echo "❌ Input validation failed; nothing submitted (see validation.json, or rerun with VALIDATE=0)."
+        exit 1
+    fi
+    echo ""
+fi
+
+# Every job is recorded in the job tracker (util/job_tracker.py status shows
+# the campaign); MAX_IN_FLIGHT=N waits before each sbatch until fewer than N
+# of your jobs are queued or running, with one cached squeue per TTL.
+tracker=~/scripts/util/job_tracker.py
+
 # Initialize counter for jobs found and submitted
 jobs_found=0
 jobs_submitted=0
@@ -33,10 +53,24 @@ while IFS= read -r -d '' jobscript_path; do
     # Change to the directory and run sbatch
     if cd "$job_dir"; then
         echo "  Submitting job in $job_dir..."
+        if [[ -n "${MAX_IN_FLIGHT:-}" ]]; then
+            python3 "$tracker" wait --max "$MAX_IN_FLIGHT"
+        fi
         
-        if sbatch jobscript; then
+        if sbatch_out=$(sbatch jobscript); then
+            echo "$sbatch_out"
             echo "  ✓ Successfully submitted job"
             ((jobs_submitted++))
+            # "submit" event keyed by job id (queue wait = job start − submit)
+            if [[ "$sbatch_out" =~ Submitted\ batch\ job\ ([0-9]+) ]]; then
+                job_id="${BASH_REMATCH[1]}"
+                t=$(ev_now)
+                SLURM_JOB_ID="$job_id" ev_emit submit "$PWD" "$t" "$t" 0
+                python3 "$tracker" record "$PWD" "$job_id" --campaign "$current_dir" \
+                    || echo "  ⚠️  Job not recorded in the job tracker"
+            else
+                echo "  ⚠️  No job id in the sbatch output; job not recorded in the job tracker"
+            fi
         else
             echo "  ✗ Failed to submit job"
             ((jobs_failed++))
@@ -65,3 +99,6 @@ elif [[ $jobs_submitted -eq $jobs_found ]]; then
 else
     echo "Some jobs failed to submit. Check the output above for details."
 fi
+if (( jobs_submitted > 0 )); then
+    echo "Track them with: python3 $tracker status --campaign $current_dir"
+fi
@@ -132,6 +132,8 @@ module purge
 module load intel/19.1.1  impi/19.0.9
 module load vasp/6.3.0
 export OMP_NUM_THREADS=1
+source ~/scripts/util/events.sh
+ev_start job
 
 ROOT="\$PWD"
 DIRS=($DIRS_LITERAL)
@@ -150,15 +152,24 @@ for ((i=0; i<\${#DIRS[@]}; i++)); do
 
   if (( i > 0 && \${#FILES_TO_COPY[@]} > 0 )); then
     echo "↪ Copying forward files from previous directory: \${DIRS[i-1]}"
+    ev_start copy
     for file in "\${FILES_TO_COPY[@]}"; do
-      cp -f "\$ROOT/\${DIRS[i-1]}/\$file" "\$file"
+      src="\$ROOT/\${DIRS[i-1]}/\$file"
+      # CHGCAR carries the previous cell in its header: re-grid onto this POSCAR
+      if [[ "\$file" == CHGCAR && -f POSCAR ]] && \\
+         python3 ~/scripts/util/chgcar.py regrid "\$src" POSCAR -o CHGCAR; then
+        continue
+      fi
+      cp -f "\$src" "\$file"
     done
+    ev_end copy "\$PWD" 0 "\$(ev_bytes "\${FILES_TO_COPY[@]}")"
   fi
 
-  ibrun vasp_std
+  ev_run vasp "\$PWD" ibrun vasp_std
   rc=\$?
   if (( rc != 0 )); then
     echo "❌ VASP failed with code \$rc in \$CUR"
+    ev_end job "\$ROOT" \$rc
     exit \$rc
   fi
   touch COMPLETED
@@ -166,6 +177,7 @@ for ((i=0; i<\${#DIRS[@]}; i++)); do
 done
 
 bash ~/scripts/util/parse_data.sh -x
+ev_end job "\$ROOT" 0
 EOF
 
 echo "Jobscript '$JOBSCRIPT' created."
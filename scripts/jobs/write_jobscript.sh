@@ -89,6 +89,8 @@ module purge
 module load intel/19.1.1  impi/19.0.9
 module load vasp/6.3.0
 export OMP_NUM_THREADS=1
+source ~/scripts/util/events.sh
+ev_start job
 start_time=\$(date +%s)
 CURRENT_DIR=\$(pwd)
 EOF
@@ -135,6 +137,7 @@ fi
 ###############################################################################
 cat >> jobscript <<EOF
 status=\$?
+ev_end job "\$CURRENT_DIR" \$status
 end_time=\$(date +%s)
 elapsed=\$((end_time - start_time))
 echo "Job completed in \$elapsed seconds"
@@ -136,6 +136,19 @@ def parse_atom_selection(atom_str, elems):
     keep = set(parts)
     return np.array([e in keep for e in elems])
 
+def group_planes(proj, mask, tol):
+    """Group selected atoms by projection; return [(plane_id, [ref_proj, [atom_idx]])] sorted by height"""
+    planes = {}                                # plane_id → [ref_proj, [atom_idx]]
+    for i, p in enumerate(proj):
+        if not mask[i]:
+            continue
+        pid = next((k for k,(ref,_) in planes.items() if abs(p-ref)<tol), None)
+        if pid is None:
+            pid = len(planes); planes[pid] = [p, []]
+        planes[pid][1].append(i)
+
+    return sorted(planes.items(), key=lambda kv: kv[1][0])
+
 # ─────────────────────────────────── main -------------------------------------
 def main():
     # Parse command line arguments
@@ -247,16 +260,7 @@ def main():
     cart   = frac @ lattice
     proj   = cart @ n_hat
 
-    planes = {}                                # plane_id → [ref_proj, [atom_idx]]
-    for i, p in enumerate(proj):
-        if not mask[i]:
-            continue
-        pid = next((k for k,(ref,_) in planes.items() if abs(p-ref)<tol), None)
-        if pid is None:
-            pid = len(planes); planes[pid] = [p, []]
-        planes[pid][1].append(i)
-
-    ordered = sorted(planes.items(), key=lambda kv: kv[1][0])
+    ordered = group_planes(proj, mask, tol)
 
     # ---- assign magnetic values & build MAGMOM array -------------------------
     magmom_values = ["0"] * natoms  # Initialize as strings to handle P/N values
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+exchange_fit.py
+Heisenberg exchange constants J1, J2, ... at every strain point of parsed
+magnetic-ordering sweeps, from one batched least-squares solve.
+
+The energies of the orderings at one strain point are fitted to
+
+    E / n_mag = E0 + Σ_k J_k · (½ Σ_{i,j in shell k} s_i s_j) / n_mag
+
+with s_i = ±1 the sign of each atom's MAGMOM (P/N placeholders allowed) and
+n_mag the number of magnetic atoms, so cells of different size can be mixed.
+J > 0 favours antiparallel neighbours; J is in meV per pair with |S| absorbed.
+Shells are distances between magnetic atoms separated by gaps larger than
+--shell-gap.  With --planes [X,Y,Z] every shell is split into pairs within
+one plane normal to that vector and pairs between planes (J1_in, J1_out, ...),
+the same planes coplanar_magnetic_ordering.py builds its orderings from.
+
+Pair tables come from one neighbour search per distinct structure and are
+shared by every ordering on it; the design matrices of all strain points are
+stacked and solved together.  Uncertainties are standard errors from the fit
+residuals, so they need more orderings than parameters.  Strain points with
+too few independent orderings are reported as underdetermined.
+
+Usage
+-----
+exchange_fit.py RESULT_DIR [RESULT_DIR ...] [--base DIR] [--relax] [--shells 2]
+                [--planes [0,0,1]] [--group parent|lattice] [--cutoff 8.0]
+
+RESULT_DIR is a parse_data.sh output folder; calculation paths in its
+energies.dat are relative to --base.  Each ordering's INCAR gives its spins;
+check with magnetic_retention.py that the orderings survived first.
+
+Outputs
+-------
+• RESULT_DIR/exchange.dat – one row per strain point: lattice, number of
+  orderings, E0, every J with its standard error, and the shell distances
+"""
+import argparse
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "util"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from coplanar_magnetic_ordering import parse_vector  # noqa: E402
+from magnetic_retention import MAGNETIC_TOL, parse_magmom  # noqa: E402
+from neighbours import neighbour_list  # noqa: E402
+from results_store import read_energies  # noqa: E402
+from vasp_io import read_poscar  # noqa: E402
+
+CUTOFF = 8.0          # Å, magnetic-pair search radius
+SHELL_GAP = 0.25      # Å, distance gap that separates two shells
+PLANE_TOL = 0.1       # Å, bond component along the plane normal still counted in-plane
+
+# ─────────────────────────────────── pair tables ─────────────────────────────
+def column_labels(shells, planes):
+    if not planes:
+        return [f"J{k + 1}" for k in range(shells)]
+    return [f"J{k + 1}_{side}" for k in range(shells) for side in ("in", "out")]
+
+
+def pair_table(pos, mask, shells, normal=None, cutoff=CUTOFF, shell_gap=SHELL_GAP,
+               plane_tol=PLANE_TOL):
+    """Directed magnetic pairs (i, j, column) of the first SHELLS shells and each column's mean distance."""
+    idx = np.flatnonzero(mask)
+    nl = neighbour_list(pos.frac[idx], pos.lattice, cutoff)
+    if len(nl) == 0:
+        raise ValueError(f"no magnetic pairs within {cutoff} Å")
+    d = np.unique(np.round(nl.dist, 4))
+    edges = d[1:][np.diff(d) > shell_gap]                   # first distance of each later shell
+    shell = np.searchsorted(edges, nl.dist + 1e-4, side="right")
+    keep = shell < shells
+    col = shell[keep]
+    if normal is not None:
+        out = np.abs(nl.vec[keep] @ normal) > plane_tol
+        col = 2 * col + out
+    ncols = shells * (2 if normal is not None else 1)
+    dist = np.bincount(col, weights=nl.dist[keep], minlength=ncols)
+    n = np.bincount(col, minlength=ncols)
+    with np.errstate(invalid="ignore"):
+        mean_d = dist / n
+    return idx[nl.i[keep]], idx[nl.j[keep]], col, mean_d
+
+
+def design_row(spins, table, ncols):
+    """[1, n_1, n_2, ...] per magnetic atom for one ordering on one pair table."""
+    i, j, col, _ = table
+    counts = np.bincount(col, weights=spins[i] * spins[j], minlength=ncols) / 2
+    nmag = np.count_nonzero(spins)
+    return np.concatenate([[1.0], counts / nmag]), nmag
+
+
+def read_spins(incar, natoms):
+    """Signs of the collinear MAGMOM in INCAR (0 for non-magnetic atoms), or None."""
+    m = re.search(r"^\s*MAGMOM\s*=\s*([^#!\n]*)", Path(incar).read_text(), re.M | re.I)
+    if not m:
+        return None
+    vals = np.array(parse_magmom(m.group(1)))
+    if len(vals) != natoms:
+        return None
+    return np.where(np.abs(vals) > MAGNETIC_TOL, np.sign(vals), 0.0)
+
+# ─────────────────────────────────── fitting ─────────────────────────────────
+def fit_all(blocks):
+    """Least squares of every (X, y) block in one batched solve.
+
+    Returns (beta, stderr, rank, active): arrays over blocks; parameters of
+    columns that are zero throughout a block are NaN.
+    """
+    G, p = len(blocks), blocks[0][0].shape[1]
+    M = max(len(y) for _, y in blocks)
+    X = np.zeros((G, M, p))
+    y = np.zeros((G, M))
+    m = np.array([len(yy) for _, yy in blocks])
+    for g, (xx, yy) in enumerate(blocks):
+        X[g, :len(yy)], y[g, :len(yy)] = xx, yy           # zero rows do not change the fit
+    active = np.abs(X).max(axis=1) > 0
+    beta = (np.linalg.pinv(X) @ y[..., None])[..., 0]
+    rank = np.linalg.matrix_rank(X)
+    rss = ((y - (X @ beta[..., None])[..., 0]) ** 2).sum(axis=1)
+    dof = m - active.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sigma2 = np.where(dof > 0, rss / dof, np.nan)
+        cov = sigma2[:, None, None] * np.linalg.pinv(np.swapaxes(X, 1, 2) @ X)
+    stderr = np.sqrt(np.clip(np.diagonal(cov, axis1=1, axis2=2), 0, None))
+    determined = rank == active.sum(axis=1)
+    beta[~active | ~determined[:, None]] = np.nan
+    stderr[~active | ~determined[:, None]] = np.nan
+    return beta, stderr, rank, active
+
+# ─────────────────────────────────── sweeps ──────────────────────────────────
+def collect(result_dir, args, normal, cache):
+    """[(group key, (a, b, c), [design rows], [E/n_mag], column distances)] of one sweep."""
+    ncols = args.shells * (2 if normal is not None else 1)
+    groups = {}
+    for d, a, b, c, energy in read_energies(Path(result_dir) / "energies.dat"):
+        calc = Path(args.base) / d
+        struct = calc / "CONTCAR" if args.relax and (calc / "CONTCAR").is_file() else calc / "POSCAR"
+        try:
+            text = struct.read_text()
+            pos = read_poscar(struct)
+            spins = read_spins(calc / "INCAR", pos.natoms)
+        except (OSError, ValueError, IndexError) as e:
+            print(f"  ⚠️  {d}: {e}")
+            continue
+        if spins is None or not spins.any():
+            print(f"  ⚠️  {d}: no collinear MAGMOM for {pos.natoms} atoms")
+            continue
+        key = (text, spins.astype(bool).tobytes())
+        if key not in cache:
+            n_cart = normal @ pos.lattice if normal is not None and np.all(np.abs(normal) <= 1) else normal
+            n_hat = None if normal is None else n_cart / np.linalg.norm(n_cart)
+            cache[key] = pair_table(pos, spins != 0, args.shells, n_hat, args.cutoff, args.shell_gap,
+                                    args.plane_tol)
+        row, nmag = design_row(spins, cache[key], ncols)
+        gkey = str(Path(d).parent) if args.group == "parent" else f"{a:.3f}x{b:.3f}x{c:.3f}"
+        g = groups.setdefault(gkey, [gkey, (a, b, c), [], [], cache[key][3]])
+        g[2].append(row)
+        g[3].append(energy / nmag)
+    return list(groups.values())
+
+
+def write_exchange(path, labels, groups, beta, stderr, rank):
+    head = ["Group", "A(Å)", "B(Å)", "C(Å)", "Orderings", "Rank", "E0(eV/mag)"]
+    head += [f"{h}{lab}(meV)" for lab in labels for h in ("", "d")]
+    head += [f"r_{lab}(Å)" for lab in labels]
+    lines = ["\t".join(head)]
+    for g, (key, abc, rows, _, dist) in enumerate(groups):
+        vals = [key, *(f"{x:.6f}" for x in abc), str(len(rows)), str(rank[g]), f"{beta[g, 0]:.6f}"]
+        for k in range(len(labels)):
+            vals += [f"{1e3 * beta[g, k + 1]:.4f}", f"{1e3 * stderr[g, k + 1]:.4f}"]
+        vals += [f"{x:.4f}" for x in dist]
+        lines.append("\t".join(vals))
+    tmp = Path(f"{path}.tmp")
+    tmp.write_text("\n".join(lines) + "\n")
+    tmp.replace(path)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("result_dirs", nargs="+")
+    ap.add_argument("--base", default=".", help="directory the calculation paths are relative to")
+    ap.add_argument("--relax", action="store_true", help="use CONTCAR instead of POSCAR")
+    ap.add_argument("--shells", type=int, default=2, help="number of exchange shells (default 2)")
+    ap.add_argument("--planes", metavar="[X,Y,Z]", help="split shells into in-plane / between-plane")
+    ap.add_argument("--group", choices=("parent", "lattice"), default="parent",
+                    help="strain point = parent directory (default) or lattice lengths")
+    ap.add_argument("--cutoff", type=float, default=CUTOFF, help=f"Å (default {CUTOFF})")
+    ap.add_argument("--shell-gap", type=float, default=SHELL_GAP, help=f"Å (default {SHELL_GAP})")
+    ap.add_argument("--plane-tol", type=float, default=PLANE_TOL, help=f"Å (default {PLANE_TOL})")
+    args = ap.parse_args()
+
+    try:
+        normal = parse_vector(args.planes) if args.planes else None
+    except ValueError as e:
+        print(f"❌ --planes: {e}")
+        sys.exit(1)
+    labels = column_labels(args.shells, normal is not None)
+
+    cache, sweeps = {}, []
+    for rd in args.result_dirs:
+        try:
+            sweeps.append((rd, collect(rd, args, normal, cache)))
+        except (OSError, ValueError) as e:
+            print(f"❌ {rd}: {e}")
+            sys.exit(1)
+    blocks = [(np.array(g[2]), np.array(g[3])) for _, groups in sweeps for g in groups]
+    if not blocks:
+        print("❌ No orderings with energies and MAGMOM found")
+        sys.exit(1)
+    beta, stderr, rank, _ = fit_all(blocks)
+
+    start, bad = 0, 0
+    for rd, groups in sweeps:
+        sl = slice(start, start + len(groups))
+        start += len(groups)
+        out = Path(rd) / "exchange.dat"
+        write_exchange(out, labels, groups, beta[sl], stderr[sl], rank[sl])
+        for g, (key, _, rows, _, _) in enumerate(groups):
+            if np.isnan(beta[sl][g, 1:]).all():
+                bad += 1
+                print(f"  ⚠️  {key}: {len(rows)} ordering(s) do not determine {', '.join(labels)}")
+        print(f"📋 {len(groups)} strain point(s), {len(cache)} pair table(s) → {out}")
+    sys.exit(1 if bad == len(blocks) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+magnetic_retention.py
+Check whether the intended magnetic ordering survived in every calculation of
+one or more parsed sweeps.
+
+The final per-atom moments come from the arrays results_store.py writes next
+to energies.dat; the intended pattern is the MAGMOM of each calculation's
+INCAR, or one MAGMOM / coplanar_atoms.txt file (from coplanar_magnetic_*.py)
+applied to all of them.  P/N placeholders count as +1/−1.
+
+For each calculation it reports, in one vectorized pass over an N×atoms
+array:
+- retention : Σ sᵢmᵢ / Σ|mᵢ| over intended magnetic sites (1 = pattern kept;
+              a global spin flip is the same state and counts as kept)
+- collapsed : intended magnetic sites whose |m| fell below the collapse limit
+- flipped   : sites whose sign disagrees with the pattern (after the global
+              orientation is fixed)
+
+Calculations without a magnetization block (no moments at all, e.g. an
+ISPIN = 1 or unfinished run) are reported as no_data, not as collapsed.
+
+Usage
+-----
+magnetic_retention.py RESULT_DIR [RESULT_DIR ...] [--base DIR] [--pattern FILE]
+                      [--collapse 0.2] [--min-retention 0.9]
+
+Outputs
+-------
+• RESULT_DIR/magnetic_retention.dat – one row per calculation
+"""
+import argparse
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "util"))
+from results_store import load  # noqa: E402
+
+PLACEHOLDERS = {"P": 1.0, "N": -1.0}
+MAGNETIC_TOL = 1e-3
+
+# ─────────────────────────────────── patterns ────────────────────────────────
+def parse_magmom(text):
+    """Expand a MAGMOM value ('2*3.0 -3 P N ...') into a list of floats."""
+    vals = []
+    for tok in text.split():
+        count, _, val = tok.rpartition("*")
+        n = int(count) if count else 1
+        v = PLACEHOLDERS[val.upper()] if val.upper() in PLACEHOLDERS else float(val)
+        vals += [v] * n
+    return vals
+
+
+def read_pattern(path):
+    """Return the intended moments from an INCAR, MAGMOM file or coplanar_atoms.txt."""
+    path = Path(path)
+    text = path.read_text()
+    if path.name.startswith("coplanar_atoms"):
+        idx, vals = [], []
+        for line in text.splitlines():
+            parts = line.split()
+            if parts and parts[0].isdigit():
+                idx.append(int(parts[0]) - 1)
+                vals.append(parse_magmom(parts[3])[0])
+        out = np.zeros(max(idx) + 1 if idx else 0)
+        out[idx] = vals
+        return out
+    m = re.search(r"^\s*MAGMOM\s*=\s*([^#!\n]*)", text, re.M | re.I)
+    return np.array(parse_magmom(m.group(1))) if m else None
+
+
+def intended_moments(directories, natoms, base, pattern=None):
+    """Return an N×A array of intended moments (NaN rows where unknown)."""
+    M0 = np.full((len(directories), natoms), np.nan)
+    if pattern is not None:
+        fixed = read_pattern(pattern)
+        if fixed is None:
+            raise ValueError(f"{pattern}: no MAGMOM found")
+        M0[:, :len(fixed)] = fixed[:natoms]
+        return M0
+    cache = {}
+    for i, d in enumerate(directories):
+        incar = Path(base) / str(d) / "INCAR"
+        if not incar.is_file():
+            continue
+        text = incar.read_text()
+        if text not in cache:
+            m = re.search(r"^\s*MAGMOM\s*=\s*([^#!\n]*)", text, re.M | re.I)
+            cache[text] = np.array(parse_magmom(m.group(1))) if m else None
+        v = cache[text]
+        if v is not None:
+            M0[i, :min(len(v), natoms)] = v[:natoms]
+    return M0
+
+# ─────────────────────────────────── analysis ────────────────────────────────
+def analyze(M0, M, collapse=0.2):
+    """Compare intended (M0) and final (M) moments, both N×A. Returns dict of length-N arrays."""
+    measured = ~np.isnan(M).all(1)
+    site = (np.abs(np.nan_to_num(M0)) > MAGNETIC_TOL) & measured[:, None]
+    s0 = np.sign(np.nan_to_num(M0)) * site
+    m = np.where(site, np.nan_to_num(M), 0.0)
+
+    num = (s0 * m).sum(1)
+    den = np.abs(m).sum(1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ret = np.where(den > 0, num / den, 0.0)
+    ret[~measured] = np.nan
+    orient = np.where(ret < 0, -1.0, 1.0)[:, None]     # global flip is equivalent
+    ret = np.abs(ret)
+
+    collapsed = site & (np.abs(m) < collapse)
+    flipped = site & ~collapsed & (np.sign(m * orient) != s0)
+    n_site = site.sum(1)
+    mean_abs = np.where(n_site > 0, np.abs(m).sum(1) / np.maximum(n_site, 1), 0.0)
+    return {
+        "n_sites": n_site,
+        "retention": ret,
+        "n_collapsed": collapsed.sum(1),
+        "n_flipped": flipped.sum(1),
+        "mean_abs_m": mean_abs,
+        "net_m": np.nansum(M, axis=1),
+        "known": ~np.isnan(M0).all(1),
+        "measured": measured,
+    }
+
+
+def verdict(r, i, min_retention):
+    if not r["measured"][i]:
+        return "no_data"
+    if not r["known"][i] or r["n_sites"][i] == 0:
+        return "no_pattern"
+    if r["n_collapsed"][i] * 2 >= r["n_sites"][i]:
+        return "collapsed"
+    if r["n_flipped"][i] or r["n_collapsed"][i]:
+        return "changed"
+    return "retained" if r["retention"][i] >= min_retention else "degraded"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("result_dirs", nargs="+")
+    ap.add_argument("--base", default=".", help="directory the calculation paths are relative to")
+    ap.add_argument("--pattern", help="MAGMOM/INCAR/coplanar_atoms.txt used for every calculation")
+    ap.add_argument("--collapse", type=float, default=0.2, help="|m| (μB) below which a site collapsed")
+    ap.add_argument("--min-retention", type=float, default=0.9)
+    args = ap.parse_args()
+
+    bad = 0
+    for rd in args.result_dirs:
+        try:
+            res = load(rd)
+        except (OSError, ValueError) as e:
+            print(f"❌ {rd}: {e} (run results_store.py build first)")
+            continue
+        cols = res["meta"]["moment_columns"]
+        if "tot" not in cols:
+            print(f"⚠️  {rd}: no magnetization data")
+            continue
+        M = np.asarray(res["moments"][:, :, cols.index("tot")], dtype=float)
+        dirs = res["directory"]
+        try:
+            M0 = intended_moments(dirs, M.shape[1], args.base, args.pattern)
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        r = analyze(M0, M, args.collapse)
+
+        out = Path(rd) / "magnetic_retention.dat"
+        with open(out, "w") as f:
+            f.write("Directory\tVerdict\tRetention\tSites\tCollapsed\tFlipped\tMean|m|\tNet_m\n")
+            for i, d in enumerate(dirs):
+                v = verdict(r, i, args.min_retention)
+                f.write(f"{d}\t{v}\t{r['retention'][i]:.4f}\t{r['n_sites'][i]}\t"
+                        f"{r['n_collapsed'][i]}\t{r['n_flipped'][i]}\t"
+                        f"{r['mean_abs_m'][i]:.4f}\t{r['net_m'][i]:.4f}\n")
+                if v == "no_data":
+                    print(f"⚠️  {rd}/{d}: no magnetization data (ISPIN = 2 run missing or unfinished?)")
+                elif v not in ("retained", "no_pattern"):
+                    bad += 1
+                    print(f"❌ {rd}/{d}: {v} (retention {r['retention'][i]:.2f}, "
+                          f"{r['n_collapsed'][i]} collapsed, {r['n_flipped'][i]} flipped)")
+        print(f"📋 {len(dirs)} calculations checked → {out}")
+    sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+descriptors.py
+Octahedral structure descriptors (B–O bonds, B–O–B angles, tilts and
+rotations) of relaxed structures, one table row per structure.
+
+Every B cation with at least six ligands within the cutoff defines an
+octahedron from its six nearest ligands.  Per structure the table holds
+averages over all octahedra:
+
+    d_BO, d_min, d_max   B–O bond lengths (Å)
+    Delta                distortion index (1/6) Σ ((d − d̄)/d̄)², averaged
+    BOB_eq, BOB_ap       B–O–B angles through ligands shared by exactly two
+                         octahedra, split by whether B–B lies in the ab plane
+                         (equatorial) or along its normal (apical)
+    tilt                 angle of the apical bonds from the ab-plane normal
+    rotation             (180° − equatorial B–O–B projected onto ab) / 2
+
+All quantities come from one neighbour list (util/neighbours.py) and are
+computed with array operations, so a 10k-atom supercell takes a fraction of
+a second.  Descriptors that do not apply (no octahedra, no corner sharing)
+are written as nan.
+
+Usage
+-----
+descriptors.py structures FILE ... [--center B] [--ligand O] [--cutoff 3.0] [-o TABLE]
+descriptors.py sweep [OUTDIR ...] [--center B] [--ligand O] [-j N]
+
+sweep reads the energies.dat that parse_data.sh wrote in each output folder
+(FUNC_CALC/, or every one found below OUTDIR), takes the CONTCAR of every
+listed calculation (POSCAR if there is none), and writes descriptors.tsv
+beside it with the energy and lattice lengths of each strain point.
+
+--center defaults to the non-ligand species with the shortest bonds to the
+ligand (the B site of a perovskite).
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "util"))
+from neighbours import neighbour_list  # noqa: E402
+from vasp_io import read_poscar  # noqa: E402
+
+CUTOFF = 3.0                       # Å, B–O search radius
+COLUMNS = ["N", "A(Å)", "B(Å)", "C(Å)", "n_oct", "d_BO(Å)", "d_min(Å)", "d_max(Å)", "Delta",
+           "BOB_eq(deg)", "BOB_ap(deg)", "tilt(deg)", "rotation(deg)"]
+
+# ─────────────────────────────────── descriptors ─────────────────────────────
+def _angle(u, v):
+    """Angles (degrees) between matching rows of U and V."""
+    cos = np.einsum("ij,ij->i", u, v) / (np.linalg.norm(u, axis=1) * np.linalg.norm(v, axis=1))
+    return np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+
+
+def _mean(x):
+    return float(x.mean()) if len(x) else float("nan")
+
+
+def find_center(pos, ligand, cutoff=CUTOFF):
+    """Non-ligand species with the shortest median distance to its nearest ligand."""
+    elems = pos.elements
+    nl = neighbour_list(pos.frac, pos.lattice, cutoff)
+    nl = nl.select((elems[nl.i] != ligand) & (elems[nl.j] == ligand))
+    best, best_d = None, np.inf
+    for s in dict.fromkeys(elems):
+        if s == ligand:
+            continue
+        sel = elems[nl.i] == s
+        if not sel.any():
+            continue
+        nearest = np.full(pos.natoms, np.inf)
+        np.minimum.at(nearest, nl.i[sel], nl.dist[sel])
+        d = np.median(nearest[np.isfinite(nearest)])
+        if d < best_d:
+            best, best_d = s, d
+    if best is None:
+        raise ValueError(f"no atom has a {ligand} neighbour within {cutoff} Å")
+    return best
+
+
+def octahedral(pos, center=None, ligand="O", cutoff=CUTOFF):
+    """Descriptor dict of one structure (keys as COLUMNS)."""
+    elems = pos.elements
+    center = center or find_center(pos, ligand, cutoff)
+    lengths = np.linalg.norm(pos.lattice, axis=1)
+    row = dict(zip(COLUMNS, [pos.natoms, *map(float, lengths), 0] + [float("nan")] * (len(COLUMNS) - 5)))
+
+    nl = neighbour_list(pos.frac, pos.lattice, cutoff)
+    nl = nl.select((elems[nl.i] == center) & (elems[nl.j] == ligand)).sorted()
+    counts = nl.counts(pos.natoms)
+    starts = np.cumsum(counts) - counts
+    rank = np.arange(len(nl)) - starts[nl.i]
+    bonds = nl.select((rank < 6) & (counts[nl.i] >= 6))          # six nearest per centre, in order
+    n_oct = row["n_oct"] = len(bonds) // 6
+    if n_oct == 0:
+        return row
+
+    d = bonds.dist.reshape(n_oct, 6)
+    dbar = d.mean(axis=1)
+    row["d_BO(Å)"] = float(dbar.mean())
+    row["d_min(Å)"] = float(d.min())
+    row["d_max(Å)"] = float(d.max())
+    row["Delta"] = float((((d - dbar[:, None]) / dbar[:, None]) ** 2).mean(axis=1).mean())
+
+    normal = np.cross(pos.lattice[0], pos.lattice[1])
+    normal /= np.linalg.norm(normal)
+    vec = bonds.vec.reshape(n_oct, 6, 3)
+    cos_n = np.abs(vec @ normal) / d
+    apical = np.argsort(-cos_n, axis=1)[:, :2]                     # two bonds closest to the normal
+    row["tilt(deg)"] = float(np.degrees(np.arccos(np.clip(
+        np.take_along_axis(cos_n, apical, axis=1), -1.0, 1.0))).mean())
+
+    # Corner-sharing ligands: exactly two octahedra.  Ligands are paired by
+    # sorting bonds on the ligand index; both bond vectors point B → O.
+    order = np.argsort(bonds.j, kind="stable")
+    lig = bonds.j[order]
+    shared = np.bincount(lig, minlength=pos.natoms) == 2
+    first = order[np.flatnonzero(shared[lig] & np.r_[True, lig[1:] != lig[:-1]])]
+    second = order[np.flatnonzero(shared[lig] & np.r_[False, lig[1:] == lig[:-1]])]
+    if len(first):
+        v1, v2 = bonds.vec[first], bonds.vec[second]
+        bob = _angle(v1, v2)
+        bb = v1 - v2                                              # B₁ → B₂ through the ligand
+        is_ap = np.abs(bb @ normal) / np.linalg.norm(bb, axis=1) > np.sqrt(0.5)
+        row["BOB_eq(deg)"] = _mean(bob[~is_ap])
+        row["BOB_ap(deg)"] = _mean(bob[is_ap])
+        flat = lambda v: v - np.outer(v @ normal, normal)          # noqa: E731
+        eq = ~is_ap
+        if eq.any():
+            row["rotation(deg)"] = float(((180.0 - _angle(flat(v1[eq]), flat(v2[eq]))) / 2).mean())
+    return row
+
+
+def describe(path, center=None, ligand="O", cutoff=CUTOFF):
+    return octahedral(read_poscar(path), center, ligand, cutoff)
+
+# ─────────────────────────────────── tables ──────────────────────────────────
+def _fmt(x):
+    return str(x) if isinstance(x, (int, np.integer)) else f"{x:.6f}"
+
+
+def structure_file(calc_dir):
+    contcar = Path(calc_dir) / "CONTCAR"
+    if contcar.is_file() and contcar.stat().st_size > 0:
+        return contcar
+    return Path(calc_dir) / "POSCAR"
+
+
+def read_energies(dat):
+    """[(Directory, Energy)] of an energies.dat."""
+    lines = Path(dat).read_text().splitlines()
+    header = lines[0].split("\t") if lines else []
+    if "Directory" not in header or "Energy(eV)" not in header:
+        return []
+    i_dir, i_e = header.index("Directory"), header.index("Energy(eV)")
+    rows = []
+    for line in lines[1:]:
+        parts = line.split("\t")
+        if len(parts) > max(i_dir, i_e):
+            rows.append((parts[i_dir], parts[i_e]))
+    return rows
+
+
+def _task(item):
+    path, center, ligand, cutoff = item
+    try:
+        return describe(path, center, ligand, cutoff), None
+    except (OSError, ValueError, IndexError) as e:
+        return None, f"{path}: {e}"
+
+
+def run_all(paths, center, ligand, cutoff, jobs=None):
+    """[(row or None, error or None)] for every path, in order."""
+    items = [(p, center, ligand, cutoff) for p in paths]
+    if len(items) < 32 or jobs == 1:
+        return [_task(it) for it in items]
+    with ProcessPoolExecutor(jobs) as pool:
+        return list(pool.map(_task, items, chunksize=max(1, len(items) // (4 * (jobs or os.cpu_count() or 1)))))
+
+
+def write_table(path, first, rows):
+    """Tab-separated table with FIRST (list of leading column names) + COLUMNS."""
+    lines = ["\t".join(first + COLUMNS)]
+    lines += ["\t".join(lead + [_fmt(r[c]) for c in COLUMNS]) for lead, r in rows]
+    text = "\n".join(lines) + "\n"
+    if path in (None, "-"):
+        sys.stdout.write(text)
+        return
+    tmp = Path(f"{path}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+def energies_files(targets):
+    for t in targets:
+        t = Path(t)
+        if (t / "energies.dat").is_file():
+            yield t / "energies.dat"
+        else:
+            yield from sorted(t.rglob("energies.dat"))
+
+
+def sweep(dat, args):
+    """Write descriptors.tsv beside one energies.dat; return (rows, errors)."""
+    base = dat.parent.parent                    # parse_data.sh ran here
+    entries = read_energies(dat)
+    results = run_all([structure_file(base / d) for d, _ in entries],
+                      args.center, args.ligand, args.cutoff, args.jobs)
+    rows, errors = [], []
+    for (d, e), (row, err) in zip(entries, results):
+        if row is None:
+            errors.append(err)
+        else:
+            rows.append(([d, e], row))
+    write_table(dat.parent / "descriptors.tsv", ["Directory", "Energy(eV)"], rows)
+    return rows, errors
+
+# ─────────────────────────────────── CLI ─────────────────────────────────────
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("structures", help="descriptors of POSCAR/CONTCAR files")
+    p.add_argument("files", nargs="+")
+    p.add_argument("-o", "--output", help="table file (default: stdout)")
+    p = sub.add_parser("sweep", help="descriptors.tsv for parse_data.sh output folders")
+    p.add_argument("targets", nargs="*", default=["."])
+    for p in sub.choices.values():
+        p.add_argument("--center", help="octahedral cation (default: auto)")
+        p.add_argument("--ligand", default="O")
+        p.add_argument("--cutoff", type=float, default=CUTOFF, help=f"Å (default {CUTOFF})")
+        p.add_argument("-j", "--jobs", type=int, help="worker processes (default: all cores)")
+    args = ap.parse_args()
+
+    failed = 0
+    if args.cmd == "structures":
+        results = run_all(args.files, args.center, args.ligand, args.cutoff, args.jobs)
+        rows = []
+        for f, (row, err) in zip(args.files, results):
+            if row is None:
+                print(f"❌ {err}", file=sys.stderr)
+                failed += 1
+            else:
+                rows.append(([f], row))
+        write_table(args.output, ["File"], rows)
+    else:
+        dats = list(energies_files(args.targets))
+        if not dats:
+            print("❌ No energies.dat found (run parse_data.sh first)")
+            sys.exit(1)
+        for dat in dats:
+            rows, errors = sweep(dat, args)
+            for err in errors:
+                print(f"  ⚠️  {err}")
+            failed += len(errors)
+            print(f"✅ {dat.parent / 'descriptors.tsv'}: {len(rows)} structure(s)")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
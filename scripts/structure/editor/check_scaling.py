@@ -4,6 +4,8 @@ check_scaling.py  –  Validate lattice scaling of POSCAR_scaled_* files.
 
 • Expects an original POSCAR in the current directory.
 • Verifies each POSCAR_scaled_* file (flat, not inside subdirs).
+• A file seeded by seed_from_relaxed.py (c taken from relaxed neighbours) is
+  checked through the FILE.unseeded it keeps, plus a and b of the seeded file.
 • Prints a report and exits with code 0 if all match, 1 otherwise.
 """
 import os
@@ -35,6 +37,8 @@ def main():
     for fname in sorted(os.listdir()):
         if not fname.startswith("POSCAR_scaled_") or not os.path.isfile(fname):
             continue
+        if fname.endswith(".unseeded"):
+            continue
 
         m = pat.match(fname)
         if not m:
@@ -51,8 +55,18 @@ def main():
 
         lengths = np.linalg.norm(lat, axis=1)
         expected = ref_len * np.array([sx, sy, sz])
+        unseeded = f"{fname}.unseeded"
+        if os.path.isfile(unseeded):
+            intended = np.linalg.norm(read_lattice(unseeded), axis=1)
+            if np.any(np.abs(lengths[:2] - intended[:2]) >= TOL):
+                print(f"❌ {fname} – seeding changed the in-plane lattice")
+                fail += 1
+                continue
+            print(f"\nChecking {fname} (seeded, c = {lengths[2]:.6f} Å; scaling from {unseeded}):")
+            lengths = intended
+        else:
+            print(f"\nChecking {fname}:")
 
-        print(f"\nChecking {fname}:")
         for i, (orig_len, scale, exp_len, got_len) in enumerate(zip(ref_len, [sx, sy, sz], expected, lengths), 1):
             print(f"  Vector {i}: original length = {orig_len:.6f} Å, scale factor = {scale}, expected length = {exp_len:.6f} Å, actual length = {got_len:.6f} Å")
 
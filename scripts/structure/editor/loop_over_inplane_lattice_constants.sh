@@ -1,4 +1,9 @@
 #!/bin/bash
+# Optional seeding: with SEED_FROM=DIR (relaxed calculations, e.g. the previous
+# in-plane sweep) every new POSCAR gets its atoms and its c vector from the
+# relaxed neighbours via seed_from_relaxed.py; SEED_ELASTIC=FILE adds the
+# elastic response for points outside their range.  The unseeded POSCAR is
+# kept as POSCAR.unseeded, which the scaling checks read.
 
 og_dir=$(pwd)
 
@@ -62,5 +67,13 @@ for num in "${numbers[@]}"; do
     cd "$new_dir" || { echo "❌ Failed to enter $new_dir"; exit 1; }
     bash ~/scripts/structure/editor/loop_scale_factor_changer.sh "$num" "$num" 1
     cd "$og_dir" || exit
+
+    if [ -n "$SEED_FROM" ]; then
+        echo "🌱 Seeding $new_dir from relaxed structures in $SEED_FROM"
+        seed_args=(--from "$SEED_FROM")
+        [ -n "$SEED_ELASTIC" ] && seed_args+=(--elastic "$SEED_ELASTIC")
+        python3 ~/scripts/structure/editor/seed_from_relaxed.py "$new_dir"/POSCAR_scaled*/ "${seed_args[@]}" \
+            || echo "⚠️  Seeding failed for some structures in $new_dir"
+    fi
 done
 
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+seed_from_relaxed.py
+Start new strain points from already relaxed neighbours instead of the
+unrelaxed template.
+
+Every TARGET is a strained POSCAR as poscar_scaler.py, ca_ratio_volume_constant.py
+or setup_varied_scale_factors.sh wrote it; its in-plane lattice (a, b) is the
+strain and is kept.  The relaxed CONTCARs below the --from directories with
+the same composition are placed on the in-plane coordinate √|a×b|, and from
+the nearest --use of them a polynomial of degree --order gives, at the
+target's strain,
+
+    fractional coordinates   (unwrapped against the target, so no jumps)
+    the third lattice vector c = p·a + q·b + h·n̂   (p, q, h fitted)
+
+so internal relaxations and the free out-of-plane parameter carry over.
+Outside the range of the sources, or with a single source, h comes from the
+nearest source and the elastic response ε_zz = −(C13 ε_xx + C23 ε_yy) / C33
+when --elastic gives a stiffness tensor (ELASTIC_TENSOR, an IBRION=6 OUTCAR, or
+elastic_tensors.npz from elastic_analysis.py, averaged); otherwise it is
+extrapolated from the fit, or copied from the single source.  Sources at the
+same strain (e.g. several POSCAR_z_* of one scale) are reduced to the one with
+the lowest OUTCAR energy.
+
+The scale-factor line of the target is kept and the unseeded file is kept as
+POSCAR.unseeded; check_scaling.py and validate_inputs.py check the intended
+factors against that copy and only a and b against the seeded file.
+--keep-c seeds only the fractional coordinates, for sweeps where c is
+scanned explicitly.
+
+Usage
+-----
+seed_from_relaxed.py TARGET ... --from DIR ... [--use 3] [--order 1] [--keep-c]
+                     [--elastic FILE] [--dry-run]
+"""
+import argparse
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "util"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "elastic"))
+from calc_catalog import SKIP_DIRS  # noqa: E402
+from elastic_analysis import read_elastic_tensor, read_outcar_moduli  # noqa: E402
+from vasp_io import Poscar, format_poscar, read_outcar_energy, read_poscar  # noqa: E402
+
+SAME_STRAIN = 1e-4     # Å, in-plane coordinates closer than this are one strain point
+
+# ─────────────────────────────────── geometry ────────────────────────────────
+def inplane(lattice):
+    """√|a×b| (Å), the strain coordinate."""
+    return float(np.sqrt(np.linalg.norm(np.cross(lattice[0], lattice[1]))))
+
+
+def c_params(lattice):
+    """(p, q, h) with c = p·a + q·b + h·n̂, n̂ the unit normal of the ab plane."""
+    n = np.cross(lattice[0], lattice[1])
+    n /= np.linalg.norm(n)
+    h = lattice[2] @ n
+    p, q = np.linalg.lstsq(lattice[:2].T, lattice[2] - h * n, rcond=None)[0]
+    return np.array([p, q, h])
+
+
+def c_vector(lattice, pqh):
+    n = np.cross(lattice[0], lattice[1])
+    n /= np.linalg.norm(n)
+    return pqh[0] * lattice[0] + pqh[1] * lattice[1] + pqh[2] * n
+
+
+def read_stiffness(path):
+    """6×6 Voigt stiffness (GPa) from ELASTIC_TENSOR, OUTCAR or elastic_tensors.npz."""
+    path = Path(path)
+    if path.suffix == ".npz":
+        return np.load(path)["C"].reshape(-1, 6, 6).mean(axis=0)
+    if path.name.startswith("OUTCAR"):
+        C = read_outcar_moduli(path)
+        if C is None:
+            raise ValueError(f"{path}: no TOTAL ELASTIC MODULI block")
+        return C
+    return read_elastic_tensor(path)
+
+# ─────────────────────────────────── sources ─────────────────────────────────
+def contcars(root):
+    """Sorted CONTCARs below ROOT, outside calc_catalog.SKIP_DIRS (iteration snapshots)."""
+    found = []
+    for d, dirs, files in os.walk(root):
+        dirs[:] = [x for x in dirs if x not in SKIP_DIRS]
+        if "CONTCAR" in files:
+            found.append(Path(d) / "CONTCAR")
+    return sorted(found)
+
+
+def find_sources(roots, symbols, counts):
+    """[(in-plane coordinate, Poscar, path)] of relaxed structures with this composition."""
+    by_x = {}
+    for root in roots:
+        for contcar in contcars(root):
+            if contcar.stat().st_size == 0:
+                continue
+            try:
+                p = read_poscar(contcar)
+            except (OSError, ValueError, IndexError):
+                continue
+            if list(p.symbols) != list(symbols) or list(p.counts) != list(counts):
+                continue
+            outcar = contcar.with_name("OUTCAR")
+            energy = read_outcar_energy(outcar) if outcar.is_file() else None
+            key = round(inplane(p.lattice) / SAME_STRAIN)
+            best = by_x.get(key)
+            if best is None or (energy is not None and (best[0] is None or energy < best[0])):
+                by_x[key] = (energy, p, contcar)
+    return sorted(((inplane(p.lattice), p, c) for _, p, c in by_x.values()), key=lambda s: s[0])
+
+
+def weights(x, target, order):
+    """Weights of the sources in a least-squares polynomial of degree ≤ ORDER evaluated at TARGET."""
+    deg = min(order, len(x) - 1)
+    x0, scale = x.mean(), (np.ptp(x) or 1.0)
+    V = np.vander((x - x0) / scale, deg + 1)
+    return (np.vander(np.atleast_1d((target - x0) / scale), deg + 1) @ np.linalg.pinv(V))[0]
+
+# ─────────────────────────────────── seeding ─────────────────────────────────
+def seed(target, sources, use=3, order=1, stiffness=None, keep_c=False):
+    """Seeded Poscar for TARGET (a Poscar) and a short description of what was done."""
+    xt = inplane(target.lattice)
+    near = sorted(sources, key=lambda s: abs(s[0] - xt))[:use]
+    near.sort(key=lambda s: s[0])
+    x = np.array([s[0] for s in near])
+    frac = np.stack([s[1].frac - np.round(s[1].frac - target.frac) for s in near])
+    pqh = np.stack([c_params(s[1].lattice) for s in near])
+    w = weights(x, xt, order)
+    new = target.copy()
+    new.frac = np.tensordot(w, frac, axes=1) % 1.0
+    inside = x[0] - SAME_STRAIN <= xt <= x[-1] + SAME_STRAIN
+    how = f"fit of {len(near)}" if len(near) > 1 and inside else (
+        f"extrapolated from {len(near)}" if len(near) > 1 else "copied from 1")
+
+    if not keep_c:
+        c = np.tensordot(w, pqh, axes=1)
+        if stiffness is not None and not (inside and len(near) > 1):
+            k = int(np.argmin(np.abs(x - xt)))
+            lat_s = near[k][1].lattice
+            exx = np.linalg.norm(target.lattice[0]) / np.linalg.norm(lat_s[0]) - 1
+            eyy = np.linalg.norm(target.lattice[1]) / np.linalg.norm(lat_s[1]) - 1
+            ezz = -(stiffness[0, 2] * exx + stiffness[1, 2] * eyy) / stiffness[2, 2]
+            c = np.array([*pqh[k][:2], pqh[k][2] * (1 + ezz)])
+            how += f", c from elastic response (ε_zz = {ezz:+.4f})"
+        new.lattice = target.lattice.copy()
+        new.lattice[2] = c_vector(target.lattice, c)
+    return new, how
+
+
+def write_seeded(path, new, raw_lines):
+    """Write NEW to PATH keeping the original scale-factor line of the file."""
+    scale = [float(x) for x in raw_lines[1].split()]
+    if len(scale) == 3:
+        raw = new.lattice / np.array(scale)
+    elif scale[0] > 0:
+        raw = new.lattice / scale[0]
+    else:                                            # target volume: write explicit lengths
+        raw, raw_lines = new.lattice, [raw_lines[0], "1.0"]
+    lines = format_poscar(Poscar(new.comment, raw, new.symbols, new.counts, new.frac,
+                                 new.selective)).splitlines()
+    lines[1] = raw_lines[1]
+    tmp = Path(f"{path}.tmp")
+    tmp.write_text("\n".join(lines) + "\n")
+    os.replace(tmp, path)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("targets", nargs="+", help="POSCAR files or directories holding one")
+    ap.add_argument("--from", dest="roots", nargs="+", required=True,
+                    help="directories searched for relaxed CONTCARs")
+    ap.add_argument("--use", type=int, default=3, help="nearest sources used (default 3)")
+    ap.add_argument("--order", type=int, default=1, help="polynomial degree (default 1)")
+    ap.add_argument("--elastic", help="ELASTIC_TENSOR, OUTCAR or elastic_tensors.npz")
+    ap.add_argument("--keep-c", action="store_true", help="seed fractional coordinates only")
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+
+    try:
+        stiffness = read_stiffness(args.elastic) if args.elastic else None
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ --elastic: {e}")
+        sys.exit(1)
+
+    cache, seeded, failed = {}, 0, 0
+    for t in args.targets:
+        path = Path(t) / "POSCAR" if Path(t).is_dir() else Path(t)
+        try:
+            raw = path.read_text().splitlines()
+            target = read_poscar(path)
+            key = (tuple(target.symbols), tuple(target.counts))
+            if key not in cache:
+                cache[key] = find_sources(args.roots, *key)
+            sources = [s for s in cache[key] if s[2].resolve().parent != path.resolve().parent]
+            if not sources:
+                print(f"  ⚠️  {path}: no relaxed {''.join(f'{s}{n}' for s, n in zip(*key))} found, unchanged")
+                continue
+            new, how = seed(target, sources, args.use, args.order, stiffness, args.keep_c)
+        except (OSError, ValueError, IndexError) as e:
+            print(f"❌ {path}: {e}")
+            failed += 1
+            continue
+        shift = np.linalg.norm(((new.frac - target.frac + 0.5) % 1.0 - 0.5) @ new.lattice, axis=1).max()
+        dc = np.linalg.norm(new.lattice[2]) - np.linalg.norm(target.lattice[2])
+        print(f"✅ {path}: {how}; max shift {shift:.3f} Å, Δc {dc:+.4f} Å")
+        if not args.dry_run:
+            backup = path.with_name(f"{path.name}.unseeded")
+            if not backup.exists():
+                shutil.copyfile(path, backup)
+            write_seeded(path, new, raw)
+        seeded += 1
+    print(f"📋 {seeded} structure(s) seeded" + (" (dry run)" if args.dry_run else ""))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
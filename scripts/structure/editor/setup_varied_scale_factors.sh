@@ -11,6 +11,10 @@ xz_coupled=false
 yz_coupled=false
 xyz_coupled=false
 
+# Relaxed sweep to seed internal coordinates from (--seed DIR)
+seed_from=""
+new_dirs=()
+
 print_help() {
   echo "Usage: $0 [OPTIONS]"
   echo ""
@@ -22,6 +26,7 @@ print_help() {
   echo "  -xz start:stop:step   X and Z coupled (same values)"
   echo "  -yz start:stop:step   Y and Z coupled (same values)"
   echo "  -xyz start:stop:step  X, Y, and Z coupled (same values)"
+  echo "  --seed DIR            Seed atomic positions from relaxed CONTCARs below DIR"
   echo "  -i, --interactive     Run in interactive mode"
   echo "  -h, --help           Show this help"
   echo ""
@@ -248,6 +253,10 @@ else
         mapfile -t x_vals < <(generate_range "$xyz_start" "$xyz_stop" "$xyz_step")
         shift 2
         ;;
+      --seed)
+        seed_from="$2"
+        shift 2
+        ;;
       -i|--interactive)
         interactive_mode
         shift
@@ -280,8 +289,9 @@ run_calculation() {
   cp "$parent_dir/POSCAR" ./POSCAR
   cp "$parent_dir/POTCAR" ./POTCAR
   python ~/scripts/structure/editor/change_scaling_factors.py "$x" "$y" "$z"
-  echo -e "102\n2\n0.03" | vaspkit > /dev/null 2>&1
+  python3 ~/scripts/util/kpoints.py mesh --spacing 0.03 --quiet
   cp "$parent_dir/INCAR" ./INCAR
+  new_dirs+=("$new_dir")
   
   cd "$parent_dir" || exit 1
 }
@@ -323,4 +333,10 @@ else
   done
 fi
 
+# Start every new point from the relaxed positions of its nearest strains;
+# c stays as set by the z factor, which this sweep scans explicitly.
+if [[ -n "$seed_from" && ${#new_dirs[@]} -gt 0 ]]; then
+  python3 ~/scripts/structure/editor/seed_from_relaxed.py "${new_dirs[@]}" --from "$seed_from" --keep-c
+fi
+
 echo "Initial subdirectory setup completed!"
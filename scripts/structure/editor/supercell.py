@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+supercell.py
+Build supercells by array tiling: diagonal (--dim X Y Z) or any integer
+transformation matrix (--dim with 9 numbers, rows = new lattice vectors in
+units of the old ones).
+
+Atoms keep their species blocks: each unit-cell atom is followed by its
+images, in the same order phonopy uses for SPOSCAR, so a MAGMOM with one
+entry per atom (or three per atom for non-collinear runs) expands by
+repeating every entry det(M) times.  P/N placeholders are kept as written.
+
+Usage
+-----
+supercell.py [TARGET ...] --dim X Y Z [--incar base_INCAR]
+supercell.py POSCAR --dim M11 M12 ... M33 -o SPOSCAR
+
+TARGET may be a POSCAR file or a directory holding one (default: POSCAR_*/).
+For directories the unit cell is kept as POSCAR.unit (and reused on
+re-runs), the supercell becomes POSCAR and, with --incar, INCAR is written
+from the base INCAR with the expanded MAGMOM.
+"""
+import argparse
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "util"))
+from vasp_io import Poscar, read_poscar, write_poscar, format_poscar  # noqa: E402
+
+EPS = 1e-8
+MAGMOM_RE = re.compile(r"^\s*MAGMOM\s*=\s*([^#!\n]*)", re.M | re.I)
+
+# ─────────────────────────────────── tiling ──────────────────────────────────
+def transformation(dim):
+    M = np.array(dim, dtype=float)
+    M = np.diag(M) if M.size == 3 else M.reshape(3, 3)
+    if not np.allclose(M, np.round(M)):
+        raise ValueError("transformation matrix must be integer")
+    M = np.round(M).astype(int)
+    if round(np.linalg.det(M)) < 1:
+        raise ValueError("transformation matrix must have a positive determinant")
+    return M
+
+
+def make_supercell(p, M):
+    """Return the supercell Poscar for integer matrix M (new lattice = M @ lattice)."""
+    M = np.asarray(M)
+    n = int(round(np.linalg.det(M)))
+    corners = np.array([[i, j, k] for i in (0, 1) for j in (0, 1) for k in (0, 1)]) @ M
+    lo, hi = corners.min(0), corners.max(0)
+    grid = np.stack(np.meshgrid(*[np.arange(a, b) for a, b in zip(lo, hi)],
+                                indexing="ij"), -1).reshape(-1, 3)
+
+    base = p.frac % 1.0                                        # CONTCARs hold -0.001, 1.0000001
+    base[np.abs(base - 1.0) < EPS] = 0.0
+    Minv = np.linalg.inv(M)
+    new = (base[:, None, :] + grid[None, :, :]) @ Minv         # atoms × images × 3
+    inside = np.all((new >= -EPS) & (new < 1 - EPS), axis=2)
+    counts = inside.sum(1)
+    if np.any(counts != n):
+        raise RuntimeError(f"found {counts.min()}–{counts.max()} images per atom, expected {n}")
+
+    frac = new[inside] % 1.0                                   # atom-major order
+    frac[np.abs(frac - 1.0) < EPS] = 0.0
+    sel = None if p.selective is None else np.repeat(p.selective, n, axis=0)
+    comment = f"{p.comment} supercell {' '.join(map(str, M.ravel()))}".strip()
+    return Poscar(comment, M @ p.lattice, list(p.symbols),
+                  [c * n for c in p.counts], frac, sel)
+
+# ─────────────────────────────────── MAGMOM ──────────────────────────────────
+def expand_tokens(text):
+    """'2*3.0 -3 P' → ['3.0', '3.0', '-3', 'P']."""
+    out = []
+    for tok in text.split():
+        count, _, val = tok.rpartition("*")
+        out += [val] * (int(count) if count else 1)
+    return out
+
+
+def compress_tokens(vals):
+    """Inverse of expand_tokens: run-length encode equal neighbours as n*v."""
+    out, i = [], 0
+    while i < len(vals):
+        j = i
+        while j < len(vals) and vals[j] == vals[i]:
+            j += 1
+        out.append(vals[i] if j - i == 1 else f"{j - i}*{vals[i]}")
+        i = j
+    return " ".join(out)
+
+
+def tile_magmom(text, natoms, n):
+    """Expand a MAGMOM value for a cell with NATOMS atoms by factor N; None on mismatch."""
+    vals = expand_tokens(text)
+    if len(vals) == natoms:
+        return compress_tokens(list(np.repeat(vals, n)))
+    if len(vals) == 3 * natoms:                                  # non-collinear
+        per_atom = np.array(vals, dtype=object).reshape(natoms, 3)
+        return compress_tokens(list(np.repeat(per_atom, n, axis=0).ravel()))
+    return None
+
+
+def write_incar(base_text, magmom, dest):
+    if MAGMOM_RE.search(base_text):
+        text = MAGMOM_RE.sub(lambda m: f"MAGMOM = {magmom}" + m.group(1)[len(m.group(1).rstrip()):],
+                             base_text, count=1)
+    else:
+        text = base_text.rstrip("\n") + f"\nMAGMOM = {magmom}\n"
+    Path(dest).write_text(text)
+
+# ─────────────────────────────────── driver ──────────────────────────────────
+def process_dir(d, M, base_incar=None):
+    d = Path(d)
+    unit = d / "POSCAR.unit"
+    if not unit.is_file():
+        (d / "POSCAR").rename(unit)
+    p = read_poscar(unit)
+    sc = make_supercell(p, M)
+    write_poscar(d / "POSCAR", sc)
+    msg = f"{p.natoms} → {sc.natoms} atoms"
+    if base_incar is not None:
+        text = Path(base_incar).read_text()
+        m = MAGMOM_RE.search(text)
+        tiled = tile_magmom(m.group(1), p.natoms, sc.natoms // p.natoms) if m else None
+        if tiled is not None:
+            write_incar(text, tiled, d / "INCAR")
+        else:
+            Path(d / "INCAR").write_text(text)
+            if m:
+                msg += f"; ⚠️  MAGMOM has {len(expand_tokens(m.group(1)))} entries for {p.natoms} atoms, kept as is"
+    return msg
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("targets", nargs="*", help="POSCAR files or directories (default: POSCAR_*/)")
+    ap.add_argument("--dim", nargs="+", type=float, required=True, help="X Y Z or 9 matrix elements")
+    ap.add_argument("--incar", help="base INCAR whose MAGMOM is expanded into each directory's INCAR")
+    ap.add_argument("-o", "--output", help="output file for a single POSCAR target (default: stdout)")
+    args = ap.parse_args()
+
+    if len(args.dim) not in (3, 9):
+        ap.error("--dim takes 3 or 9 numbers")
+    try:
+        M = transformation(args.dim)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    targets = args.targets or sorted(str(d) for d in Path(".").glob("POSCAR_*") if d.is_dir())
+    if not targets:
+        print("❌ No POSCAR_* directories found")
+        sys.exit(1)
+
+    failed = 0
+    for t in targets:
+        try:
+            if Path(t).is_dir():
+                print(f"🔧 {t}: {process_dir(t, M, args.incar)}")
+            else:
+                sc = make_supercell(read_poscar(t), M)
+                if args.output:
+                    write_poscar(args.output, sc)
+                else:
+                    sys.stdout.write(format_poscar(sc))
+        except (OSError, ValueError, IndexError, RuntimeError) as e:
+            print(f"❌ {t}: {e}")
+            failed += 1
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -115,51 +115,16 @@ done
 echo "📋 Summary written to: $summary_file"
 
 #==============================================================================
-# STABILITY INFORMATION EXTRACTION
+# STABILITY ANALYSIS
 #==============================================================================
 
-echo "🔍 Extracting stability information..."
-stability_file="STABILITY_INFO"
-
-# Change to target directory to run grep command
-cd "$TARGET_DIR"
-
-# Run grep command to extract eigenvalues information from start pattern to end pattern
-# First, create a temporary file to process each file individually
-temp_file=$(mktemp)
-> "$stability_file"  # Clear the output file
-
-for file in *_ELASTIC_INFO; do
-    if [[ -f "$file" ]]; then
-        echo "################################################################################" >> "$stability_file"
-        echo "# FILE: $file" >> "$stability_file"
-        echo "################################################################################" >> "$stability_file"
-        echo "" >> "$stability_file"
-        
-        # Extract from "Eigenvalues of the stiffness matrix" to "This Structure" but stop before "Written ELASTIC_TENSOR"
-        sed -n '/Eigenvalues of the stiffness matrix (in GPa):/,/This Structure/p' "$file" | \
-        sed '/Written ELASTIC_TENSOR File/,$d' >> "$stability_file"
-        
-        echo "" >> "$stability_file"
-        echo "################################################################################" >> "$stability_file"
-        echo "" >> "$stability_file"
-        echo "" >> "$stability_file"  # Extra blank lines between files
-    fi
-done
-
-#==============================================================================
-# FINAL OUTPUT AND CLEANUP
-#==============================================================================
-
-if [[ -s "$stability_file" ]]; then
-    echo "✅ Stability information extracted to: $TARGET_DIR/$stability_file"
+# Parse every ELASTIC_TENSOR into a 6x6 array and evaluate Born stability,
+# Voigt/Reuss/Hill moduli and anisotropy for the whole sweep in one pass
+echo "🔍 Analysing elastic tensors..."
+if python3 ~/scripts/structure/elastic/elastic_analysis.py "$SOURCE_DIR" -o "$TARGET_DIR"; then
+    echo "✅ Stability table written to: $TARGET_DIR/elastic_summary.dat"
 else
-    echo "⚠️  No stability information found in the copied files"
-    echo "# No eigenvalues information found in any ELASTIC_INFO files" > "$stability_file"
-    echo "# This may indicate the calculations haven't completed or" >> "$stability_file"
-    echo "# the files don't contain stability analysis results" >> "$stability_file"
+    echo "⚠️  No elastic tensors could be analysed"
+    echo "# This may indicate the calculations haven't completed or"
+    echo "# vaspkit post-processing (analysis.sh) has not been run yet"
 fi
-
-rm -f "$temp_file"  # Clean up temp file
-
-cd - > /dev/null  # Return to original directory
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+elastic_analysis.py
+Collect every elastic tensor below a directory (vaspkit ELASTIC_TENSOR or the
+"TOTAL ELASTIC MODULI" block of an IBRION=6 OUTCAR), stack them into an N×6×6
+array and evaluate stability and polycrystalline moduli for the whole sweep in
+one vectorized pass.
+
+Usage
+-----
+elastic_analysis.py [ROOT] [-o OUTDIR] [--prefer-outcar]
+
+Where:
+- ROOT: directory tree to search (default: current directory)
+- OUTDIR: where the result table is written (default: elastic_results)
+- --prefer-outcar: use the OUTCAR block even when an ELASTIC_TENSOR exists
+
+Outputs
+-------
+• elastic_summary.dat  – one row per calculation: scale factors, minimum
+                         eigenvalue, Born stability (n/a for singular tensors,
+                         whose moduli are nan), Voigt/Reuss/Hill K and G,
+                         Young's modulus, Poisson ratio, anisotropy, Cij
+• elastic_tensors.npz  – directories, stacked 6×6 tensors (GPa), eigenvalues
+"""
+import argparse
+import mmap
+import os
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# VASP prints the OUTCAR tensor in XX YY ZZ XY YZ ZX order; Voigt is xx yy zz yz zx xy
+OUTCAR_TO_VOIGT = [0, 1, 2, 4, 5, 3]
+OUTCAR_MARKER = b"TOTAL ELASTIC MODULI (kBar)"
+SCALE_PAT = re.compile(r"POSCAR_scaled_([\d\.]+)_([\d\.]+)_([\d\.]+)")
+STABILITY_TOL = 1e-6  # GPa, eigenvalues below this count as unstable
+SINGULAR_TOL = 1e-10  # |det| of C scaled to unit max entry below this is singular
+
+# ─────────────────────────────────── readers ─────────────────────────────────
+def read_elastic_tensor(path):
+    """Return the 6×6 stiffness matrix (GPa) from a vaspkit ELASTIC_TENSOR file.
+
+    The block of six numeric rows after the stiffness header (a line naming
+    the stiffness or elastic tensor, C_ij) is taken; a compliance block
+    further down is ignored.  Without such a header the first block is used.
+    """
+    blocks, current, anchored = [], None, None
+    for line in Path(path).read_text().splitlines():
+        parts = line.split()
+        try:
+            row = [float(x) for x in parts] if len(parts) == 6 else None
+        except ValueError:
+            row = None
+        if row is not None:
+            if current is None:
+                current = []
+                blocks.append(current)
+            current.append(row)
+            continue
+        current = None
+        low = line.lower()
+        if anchored is None and "compliance" not in low and (
+                "stiffness" in low or "c_ij" in low or "elastic" in low):
+            anchored = len(blocks)                      # the next block is the stiffness
+    full = [b for b in blocks if len(b) >= 6]
+    if anchored is not None:
+        full = [b for b in blocks[anchored:] if len(b) >= 6] or full
+    if not full:
+        raise ValueError(f"{path}: no block of six numeric rows")
+    return np.array(full[0][:6])
+
+
+def read_outcar_moduli(path):
+    """Return the last TOTAL ELASTIC MODULI block of an OUTCAR as 6×6 Voigt (GPa)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = mm.rfind(OUTCAR_MARKER)
+            if pos < 0:
+                return None
+            mm.seek(pos)
+            mm.readline()               # title
+            mm.readline()               # Direction XX YY ...
+            mm.readline()               # dashes
+            rows = [mm.readline().split()[1:7] for _ in range(6)]
+    C = np.array(rows, dtype=float) / 10.0     # kBar → GPa
+    return C[np.ix_(OUTCAR_TO_VOIGT, OUTCAR_TO_VOIGT)]
+
+
+def discover(root, prefer_outcar=False):
+    """Walk ROOT once and return {directory: source file} for every tensor found."""
+    found = {}
+    for dirpath, _, files in os.walk(root):
+        names = set(files)
+        if "ELASTIC_TENSOR" in names and not prefer_outcar:
+            found[dirpath] = os.path.join(dirpath, "ELASTIC_TENSOR")
+        elif "OUTCAR" in names:
+            found[dirpath] = os.path.join(dirpath, "OUTCAR")
+        elif "ELASTIC_TENSOR" in names:
+            found[dirpath] = os.path.join(dirpath, "ELASTIC_TENSOR")
+    return found
+
+
+def load_tensors(root, prefer_outcar=False):
+    """Return (sorted directory list, N×6×6 stack) for every parsable tensor."""
+    dirs, mats = [], []
+    for d, src in sorted(discover(root, prefer_outcar).items()):
+        try:
+            if src.endswith("OUTCAR"):
+                C = read_outcar_moduli(src)
+                if C is None:
+                    continue
+            else:
+                C = read_elastic_tensor(src)
+        except (OSError, ValueError, IndexError) as e:
+            print(f"⚠️  {src}: {e}", file=sys.stderr)
+            continue
+        dirs.append(os.path.relpath(d, root))
+        mats.append(C)
+    return dirs, np.array(mats).reshape(-1, 6, 6)
+
+# ─────────────────────────────────── analysis ────────────────────────────────
+def analyze(C):
+    """Evaluate stability and moduli for a stack of stiffness matrices.
+
+    C is N×6×6 in GPa.  Returns a dict of length-N arrays.  Tensors that are
+    singular or contain non-finite entries are marked invalid; their moduli
+    are NaN and they count as unstable.
+    """
+    C = 0.5 * (C + np.swapaxes(C, 1, 2))
+    finite = np.isfinite(C).all(axis=(1, 2))
+    C = np.where(finite[:, None, None], C, np.eye(6))
+    scale = np.abs(C).max(axis=(1, 2))
+    scale[scale == 0] = 1.0
+    valid = finite & (np.abs(np.linalg.det(C / scale[:, None, None])) > SINGULAR_TOL)
+    eig = np.linalg.eigvalsh(C)
+    eig[~finite] = np.nan
+    S = np.full_like(C, np.nan)
+    S[valid] = np.linalg.inv(C[valid])
+
+    d = np.diagonal(C, axis1=1, axis2=2)
+    s = np.diagonal(S, axis1=1, axis2=2)
+    c_off = C[:, 0, 1] + C[:, 1, 2] + C[:, 2, 0]
+    s_off = S[:, 0, 1] + S[:, 1, 2] + S[:, 2, 0]
+
+    KV = (d[:, :3].sum(1) + 2 * c_off) / 9
+    GV = (d[:, :3].sum(1) - c_off + 3 * d[:, 3:].sum(1)) / 15
+    KR = 1 / (s[:, :3].sum(1) + 2 * s_off)
+    GR = 15 / (4 * s[:, :3].sum(1) - 4 * s_off + 3 * s[:, 3:].sum(1))
+    KH, GH = (KV + KR) / 2, (GV + GR) / 2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        E = 9 * KH * GH / (3 * KH + GH)
+        nu = (3 * KH - 2 * GH) / (2 * (3 * KH + GH))
+        AU = 5 * GV / GR + KV / KR - 6
+        zener = 2 * C[:, 3, 3] / (C[:, 0, 0] - C[:, 0, 1])
+
+    moduli = {
+        "K_V": KV, "K_R": KR, "K_H": KH,
+        "G_V": GV, "G_R": GR, "G_H": GH,
+        "E_H": E, "nu_H": nu,
+        "A_U": AU, "A_Zener": zener,
+    }
+    for v in moduli.values():
+        v[~valid] = np.nan
+    return {
+        "eigenvalues": eig,
+        "min_eig": eig[:, 0],
+        "stable": valid & (eig[:, 0] > STABILITY_TOL),
+        "valid": valid,
+        **moduli,
+    }
+
+
+def scale_factors(dirs):
+    """Return N×3 scale factors parsed from POSCAR_scaled_* path components."""
+    out = np.full((len(dirs), 3), np.nan)
+    for i, d in enumerate(dirs):
+        m = SCALE_PAT.search(d)
+        if m:
+            out[i] = [float(x) for x in m.groups()]
+    return out
+
+# ─────────────────────────────────── output ──────────────────────────────────
+CIJ = [(0, 0), (0, 1), (0, 2), (1, 1), (1, 2), (2, 2), (3, 3), (4, 4), (5, 5)]
+COLUMNS = ["min_eig", "K_V", "K_R", "K_H", "G_V", "G_R", "G_H",
+           "E_H", "nu_H", "A_U", "A_Zener"]
+
+
+def write_summary(path, dirs, C, res):
+    """Write one tab-separated row per tensor."""
+    sf = scale_factors(dirs)
+    header = (["Directory", "sx", "sy", "sz", "Stable"] + COLUMNS
+              + [f"C{i+1}{j+1}" for i, j in CIJ])
+    with open(path, "w") as f:
+        f.write("\t".join(header) + "\n")
+        for n, d in enumerate(dirs):
+            row = [d] + [f"{x:g}" for x in sf[n]]
+            row.append("n/a" if not res["valid"][n] else "yes" if res["stable"][n] else "no")
+            row += [f"{res[k][n]:.4f}" for k in COLUMNS]
+            row += [f"{C[n, i, j]:.4f}" for i, j in CIJ]
+            f.write("\t".join(row) + "\n")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("root", nargs="?", default=".")
+    ap.add_argument("-o", "--outdir", default="elastic_results")
+    ap.add_argument("--prefer-outcar", action="store_true")
+    args = ap.parse_args()
+
+    dirs, C = load_tensors(args.root, args.prefer_outcar)
+    if not dirs:
+        print(f"❌ No elastic tensors found below {args.root}")
+        sys.exit(1)
+
+    res = analyze(C)
+    out = Path(args.outdir)
+    out.mkdir(parents=True, exist_ok=True)
+    write_summary(out / "elastic_summary.dat", dirs, C, res)
+    np.savez(out / "elastic_tensors.npz", directories=np.array(dirs),
+             C=C, eigenvalues=res["eigenvalues"])
+
+    n_stable = int(res["stable"].sum())
+    n_invalid = int((~res["valid"]).sum())
+    print(f"✅ {len(dirs)} tensors analysed: {n_stable} stable, "
+          f"{len(dirs) - n_stable - n_invalid} unstable"
+          + (f", {n_invalid} singular (NaN rows)" if n_invalid else ""))
+    for d, ok, valid, m in zip(dirs, res["stable"], res["valid"], res["min_eig"]):
+        if not valid:
+            print(f"   ⚠️  {d}  (singular or non-finite tensor)")
+        elif not ok:
+            print(f"   ❌ {d}  (min eigenvalue {m:.3f} GPa)")
+    print(f"📋 Summary written to: {out / 'elastic_summary.dat'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+elastic_fit.py
+Stress–strain elastic constants without vaspkit.
+
+setup  – write strained POSCARs for a crystal class into
+         pattern_K/strain_X/POSCAR (the layout elastic_vaspkit.sh and
+         distribute_inputs.sh already understand) plus strain_set.json
+fit    – read the final stress of every strained OUTCAR and fit the
+         symmetry-independent Cij by least squares.  Several elastic roots
+         (e.g. every POSCAR_scaled_*/elastic of a sweep) that share a strain
+         set are solved together with one pseudo-inverse.
+
+Usage
+-----
+elastic_fit.py setup POSCAR [--class cubic] [--strains -0.01 -0.005 0 0.005 0.01] [-d DIR]
+elastic_fit.py fit ROOT [ROOT ...] [-o elastic_fit.dat]
+
+Crystal classes: cubic, hexagonal, tetragonal, orthorhombic, triclinic.
+Cubic needs one strain pattern, hexagonal/tetragonal two, orthorhombic three
+and triclinic six.
+
+Outputs (fit)
+-------------
+• ROOT/ELASTIC_TENSOR – 6×6 Cij in GPa, readable by elastic_analysis.py
+• elastic_fit.dat      – independent constants and RMS stress residual per root
+"""
+import argparse
+import json
+import sys
+from itertools import combinations_with_replacement
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "util"))
+from vasp_io import read_poscar, write_poscar, read_outcar_stress  # noqa: E402
+
+DEFAULT_STRAINS = [-0.015, -0.010, -0.005, 0.0, 0.005, 0.010, 0.015]
+
+# Voigt strain patterns (engineering shear) per class
+PATTERNS = {
+    "cubic":        [(1, 0, 0, 1, 0, 0)],
+    "hexagonal":    [(1, 0, 0, 1, 0, 0), (0, 0, 1, 0, 0, 1)],
+    "tetragonal":   [(1, 0, 0, 1, 0, 0), (0, 0, 1, 0, 0, 1)],
+    "orthorhombic": [(1, 0, 0, 1, 0, 0), (0, 1, 0, 0, 1, 0), (0, 0, 1, 0, 0, 1)],
+    "triclinic":    [tuple(int(i == k) for i in range(6)) for k in range(6)],
+}
+
+# Independent constants: name → list of (i, j, weight) Voigt entries (0-based)
+def _sym(*pairs):
+    return [(i - 1, j - 1, w) for i, j, w in pairs]
+
+BASIS = {
+    "cubic": {
+        "C11": _sym((1, 1, 1), (2, 2, 1), (3, 3, 1)),
+        "C12": _sym((1, 2, 1), (1, 3, 1), (2, 3, 1)),
+        "C44": _sym((4, 4, 1), (5, 5, 1), (6, 6, 1)),
+    },
+    "hexagonal": {
+        "C11": _sym((1, 1, 1), (2, 2, 1), (6, 6, 0.5)),
+        "C12": _sym((1, 2, 1), (6, 6, -0.5)),
+        "C13": _sym((1, 3, 1), (2, 3, 1)),
+        "C33": _sym((3, 3, 1)),
+        "C44": _sym((4, 4, 1), (5, 5, 1)),
+    },
+    "tetragonal": {
+        "C11": _sym((1, 1, 1), (2, 2, 1)),
+        "C12": _sym((1, 2, 1)),
+        "C13": _sym((1, 3, 1), (2, 3, 1)),
+        "C33": _sym((3, 3, 1)),
+        "C44": _sym((4, 4, 1), (5, 5, 1)),
+        "C66": _sym((6, 6, 1)),
+    },
+    "orthorhombic": {
+        f"C{i}{j}": _sym((i, j, 1))
+        for i, j in [(1, 1), (2, 2), (3, 3), (1, 2), (1, 3), (2, 3), (4, 4), (5, 5), (6, 6)]
+    },
+    "triclinic": {
+        f"C{i}{j}": _sym((i, j, 1)) for i, j in combinations_with_replacement(range(1, 7), 2)
+    },
+}
+
+# ─────────────────────────────────── strain set ──────────────────────────────
+def voigt_to_tensor(e):
+    """Voigt strain (engineering shear) → symmetric 3×3 strain tensor."""
+    xx, yy, zz, yz, zx, xy = e
+    return np.array([[xx, xy / 2, zx / 2],
+                     [xy / 2, yy, yz / 2],
+                     [zx / 2, yz / 2, zz]])
+
+
+def strain_set(crystal_class, magnitudes):
+    """Return a list of (pattern index, magnitude, Voigt strain) tuples.
+
+    The unstrained reference is shared by all patterns, so it is only
+    generated once.
+    """
+    out = []
+    for k, pat in enumerate(PATTERNS[crystal_class]):
+        for m in magnitudes:
+            if m == 0 and k > 0:
+                continue
+            out.append((k, float(m), m * np.array(pat, dtype=float)))
+    return out
+
+
+def setup(poscar, crystal_class, magnitudes, root):
+    ref = read_poscar(poscar)
+    root = Path(root)
+    entries = []
+    for k, m, e in strain_set(crystal_class, magnitudes):
+        d = root / f"pattern_{k + 1}" / f"strain_{m:+.4f}"
+        d.mkdir(parents=True, exist_ok=True)
+        s = ref.copy()
+        s.lattice = ref.lattice @ (np.eye(3) + voigt_to_tensor(e))
+        s.comment = f"{ref.comment} | strain " + " ".join(f"{x:g}" for x in e)
+        write_poscar(d / "POSCAR", s)
+        entries.append({"dir": str(d.relative_to(root)), "voigt": e.tolist()})
+    manifest = {"class": crystal_class, "reference": str(Path(poscar).resolve()),
+                "strains": entries}
+    (root / "strain_set.json").write_text(json.dumps(manifest, indent=1))
+    print(f"✅ Wrote {len(entries)} strained POSCARs for {crystal_class} into {root}/")
+
+# ─────────────────────────────────── fitting ─────────────────────────────────
+def basis_matrices(crystal_class):
+    names = list(BASIS[crystal_class])
+    B = np.zeros((len(names), 6, 6))
+    for k, name in enumerate(names):
+        for i, j, w in BASIS[crystal_class][name]:
+            B[k, i, j] = B[k, j, i] = w
+    return names, B
+
+
+def design_matrix(crystal_class, strains):
+    """Rows: 6 stress components per strain; columns: Cij, then 6 residual stresses."""
+    names, B = basis_matrices(crystal_class)
+    E = np.asarray(strains)                         # M×6
+    A_c = np.einsum("kij,mj->mik", B, E)           # M×6×K
+    A_0 = np.broadcast_to(np.eye(6), (len(E), 6, 6))
+    return names, np.concatenate([A_c, A_0], axis=2).reshape(6 * len(E), -1)
+
+
+def expand(crystal_class, c):
+    """Independent constants (N×K) → full N×6×6 tensors."""
+    _, B = basis_matrices(crystal_class)
+    return np.einsum("nk,kij->nij", c, B)
+
+
+def collect(root):
+    """Return (manifest, M×6 strains, M×6 stresses) for one elastic root, or None."""
+    root = Path(root)
+    mf = root / "strain_set.json"
+    if not mf.is_file():
+        print(f"⚠️  {root}: no strain_set.json, skipped", file=sys.stderr)
+        return None
+    manifest = json.loads(mf.read_text())
+    strains, stresses = [], []
+    for ent in manifest["strains"]:
+        outcar = root / ent["dir"] / "OUTCAR"
+        sig = read_outcar_stress(outcar) if outcar.is_file() else None
+        if sig is None:
+            print(f"⚠️  {outcar}: no stress found", file=sys.stderr)
+            continue
+        strains.append(ent["voigt"])
+        stresses.append(sig)
+    return manifest, np.array(strains), np.array(stresses)
+
+
+def fit_groups(roots):
+    """Group roots by (class, strain set) and solve each group in one lstsq call."""
+    groups = {}
+    for r in roots:
+        got = collect(r)
+        if got is None or len(got[1]) == 0:
+            continue
+        manifest, E, S = got
+        key = (manifest["class"], E.round(8).tobytes())
+        groups.setdefault(key, []).append((r, E, S))
+
+    results = []
+    for (crystal_class, _), members in groups.items():
+        E = members[0][1]
+        names, A = design_matrix(crystal_class, E)
+        Y = np.stack([m[2].reshape(-1) for m in members], axis=1)   # 6M×N
+        if A.shape[0] < A.shape[1] or np.linalg.matrix_rank(A) < A.shape[1]:
+            print(f"❌ {crystal_class}: strain set does not determine all constants",
+                  file=sys.stderr)
+            continue
+        X, *_ = np.linalg.lstsq(A, Y, rcond=None)                    # P×N
+        resid = Y - A @ X
+        rms = np.sqrt((resid ** 2).mean(axis=0))
+        K = len(names)
+        C = expand(crystal_class, X[:K].T)
+        for n, (r, _, _) in enumerate(members):
+            results.append({"root": str(r), "class": crystal_class,
+                            "constants": dict(zip(names, X[:K, n])),
+                            "C": C[n], "rms": rms[n], "points": len(E)})
+    return results
+
+
+def write_tensor(path, C):
+    with open(path, "w") as f:
+        f.write("# Elastic tensor C_ij (GPa), stress-strain fit by elastic_fit.py\n")
+        for row in C:
+            f.write("  ".join(f"{x:12.4f}" for x in row) + "\n")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("setup")
+    p.add_argument("poscar")
+    p.add_argument("--class", dest="crystal_class", default="cubic", choices=PATTERNS)
+    p.add_argument("--strains", type=float, nargs="+", default=DEFAULT_STRAINS)
+    p.add_argument("-d", "--dir", default=".")
+    p = sub.add_parser("fit")
+    p.add_argument("roots", nargs="+")
+    p.add_argument("-o", "--output", default="elastic_fit.dat")
+    args = ap.parse_args()
+
+    if args.cmd == "setup":
+        setup(args.poscar, args.crystal_class, args.strains, args.dir)
+        return
+
+    results = fit_groups(args.roots)
+    if not results:
+        print("❌ No elastic roots could be fitted")
+        sys.exit(1)
+    with open(args.output, "w") as f:
+        f.write("Root\tClass\tPoints\tRMS_resid(GPa)\tConstants(GPa)\n")
+        for r in results:
+            write_tensor(Path(r["root"]) / "ELASTIC_TENSOR", r["C"])
+            consts = " ".join(f"{k}={v:.3f}" for k, v in r["constants"].items())
+            f.write(f"{r['root']}\t{r['class']}\t{r['points']}\t{r['rms']:.4f}\t{consts}\n")
+            print(f"✅ {r['root']}: {consts}  (rms {r['rms']:.3f} GPa)")
+    print(f"📋 Fit table written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
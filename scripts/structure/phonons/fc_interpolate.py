@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+fc_interpolate.py
+Force constants at intermediate strains, interpolated from phonon
+calculations that were actually run at a few bracketing strains.
+
+Each SOURCE is a finished phonon directory holding the unit-cell POSCAR and
+either FORCE_CONSTANTS (phonopy --fc / --writefc) or FORCE_SETS
+(phonopy -f).  Sources are placed on a strain coordinate (in-plane lattice
+length a by default) and every file entry is fitted with a polynomial in that
+coordinate.  The fit evaluated at a target is a fixed weighted sum of the
+sources, Φ(x) = Σ_k w_k(x) Φ_k, so any symmetry the sources share (space
+group, index permutation, acoustic sum rule) holds for the result as well;
+FORCE_SETS keep the common displacement set and phonopy symmetrizes the
+force constants it builds from them.
+
+The error is estimated by leave-one-out: every interior source is predicted
+from the others and compared with its own file.  A target is flagged as
+needing a real calculation when it lies outside the sources, when the
+leave-one-out error of the sources around it exceeds --tol, or when there
+are too few sources to estimate the error at all.  A flagged target gets its
+file under a side name (FORCE_CONSTANTS.interp / FORCE_SETS.interp), so a
+phonopy run there does not pick it up silently; --force writes it under the
+real name anyway.
+
+Usage
+-----
+fc_interpolate.py SOURCE ... --target DIR ... [--order 2] [--coord a|b|c|volume] [--tol 0.05] [--force]
+fc_interpolate.py SOURCE ... --check          # leave-one-out report only
+
+Outputs
+-------
+• TARGET/FORCE_CONSTANTS or TARGET/FORCE_SETS (same kind as the sources;
+  KIND.interp for flagged targets without --force)
+• TARGET/fc_interpolation.txt – sources, weights and error estimate
+Exit status 2 when any target is flagged.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "util"))
+from vasp_io import read_poscar  # noqa: E402
+
+KINDS = ("FORCE_CONSTANTS", "FORCE_SETS")
+TOL = 0.05             # relative Frobenius error that still counts as good enough
+
+# ─────────────────────────────────── phonopy files ───────────────────────────
+def read_force_constants(path):
+    """(N1×N2×3×3 array, (N1, N2)) from a phonopy FORCE_CONSTANTS file."""
+    tok = Path(path).read_text().split()
+    n1 = int(tok[0])
+    head = 2 if len(tok) > 1 and (len(tok) - 2) % 11 == 0 and "." not in tok[1] else 1
+    n2 = int(tok[1]) if head == 2 else n1
+    blocks = np.array(tok[head:], dtype=float).reshape(-1, 11)
+    if len(blocks) != n1 * n2:
+        raise ValueError(f"{path}: expected {n1 * n2} blocks, found {len(blocks)}")
+    return blocks[:, 2:].reshape(n1, n2, 3, 3), (n1, n2)
+
+
+def write_force_constants(path, fc):
+    n1, n2 = fc.shape[:2]
+    lines = [f"{n1:4d} {n2:4d}"]
+    for i in range(n1):
+        for j in range(n2):
+            lines.append(f"{i + 1:4d} {j + 1:4d}")
+            lines += ["".join(f"{x:22.15f}" for x in row) for row in fc[i, j]]
+    _replace(path, "\n".join(lines) + "\n")
+
+
+def read_force_sets(path):
+    """(atoms, displacements n×3, forces n×N×3) from a type-1 phonopy FORCE_SETS file."""
+    tok = Path(path).read_text().split()
+    natoms, ndisp = int(tok[0]), int(tok[1])
+    rows = np.array(tok[2:], dtype=float).reshape(ndisp, 4 + 3 * natoms)
+    return rows[:, 0].astype(int), rows[:, 1:4], rows[:, 4:].reshape(ndisp, natoms, 3)
+
+
+def write_force_sets(path, atoms, disp, forces):
+    lines = [f"{forces.shape[1]}", f"{len(atoms)}", ""]
+    for a, d, f in zip(atoms, disp, forces):
+        lines.append(f"{a}")
+        lines.append("".join(f"{x:20.16f}" for x in d))
+        lines += ["".join(f"{x:16.10f}" for x in row) for row in f]
+        lines.append("")
+    _replace(path, "\n".join(lines))
+
+
+def _replace(path, text):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+# ─────────────────────────────────── sources ─────────────────────────────────
+def coordinate(poscar, coord):
+    lat = read_poscar(poscar).lattice
+    if coord == "volume":
+        return abs(np.linalg.det(lat))
+    return float(np.linalg.norm(lat["abc".index(coord)]))
+
+
+def load_sources(dirs, coord):
+    """(kind, coordinates, stacked data, displacement set, names) of the sources sorted by coordinate."""
+    kinds = {next((k for k in KINDS if (Path(d) / k).is_file()), None) for d in dirs}
+    if None in kinds:
+        missing = [d for d in dirs if not any((Path(d) / k).is_file() for k in KINDS)]
+        raise ValueError(f"no FORCE_CONSTANTS or FORCE_SETS in {', '.join(missing)}")
+    if len(kinds) > 1:
+        raise ValueError("sources mix FORCE_CONSTANTS and FORCE_SETS")
+    kind = kinds.pop()
+    x = np.array([coordinate(Path(d) / "POSCAR", coord) for d in dirs])
+    order = np.argsort(x)
+    if np.any(np.diff(x[order]) <= 1e-8):
+        raise ValueError("two sources have the same strain coordinate")
+    data, extra = [], None
+    for k in order:
+        path = Path(dirs[k]) / kind
+        if kind == "FORCE_CONSTANTS":
+            fc, _ = read_force_constants(path)
+            data.append(fc)
+        else:
+            atoms, disp, forces = read_force_sets(path)
+            if extra is not None and (not np.array_equal(atoms, extra[0])
+                                      or not np.allclose(disp, extra[1], atol=1e-6)):
+                raise ValueError(f"{path}: displacement set differs from the other sources")
+            extra = (atoms, disp)
+            data.append(forces)
+    if len({d.shape for d in data}) > 1:
+        raise ValueError("sources have different numbers of atoms or blocks")
+    return kind, x[order], np.stack(data), extra, [dirs[k] for k in order]
+
+# ─────────────────────────────────── interpolation ───────────────────────────
+def weights(x, target, order):
+    """w with Σ_k w_k Φ_k = polynomial fit of degree ≤ ORDER through (x_k, Φ_k) at TARGET."""
+    deg = min(order, len(x) - 1)
+    scale = np.ptp(x) or 1.0
+    t = (np.asarray(x) - x[0]) / scale
+    V = np.vander(t, deg + 1)
+    return np.vander(np.atleast_1d((target - x[0]) / scale), deg + 1) @ np.linalg.pinv(V)
+
+
+def leave_one_out(x, data, order):
+    """Relative Frobenius error of every interior source predicted from the others (NaN at the ends)."""
+    err = np.full(len(x), np.nan)
+    flat = data.reshape(len(x), -1)
+    for k in range(1, len(x) - 1):
+        keep = np.arange(len(x)) != k
+        pred = weights(x[keep], x[k], order) @ flat[keep]
+        err[k] = np.linalg.norm(pred - flat[k]) / np.linalg.norm(flat[k])
+    return err
+
+
+def estimate(x, err, target):
+    """Error estimate at TARGET: worst leave-one-out error of the sources around it."""
+    i = int(np.searchsorted(x, target))
+    near = err[max(0, i - 2):i + 2]
+    near = near[~np.isnan(near)]
+    return float(near.max()) if len(near) else float("nan")
+
+
+def interpolate(sources, targets, order=2, coord="a", tol=TOL, force=False):
+    """Write interpolated files into every target (flagged ones as KIND.interp unless FORCE).
+
+    Returns (kind, source coordinates, leave-one-out errors, source names,
+    [(target, coordinate, error estimate, flag, file written)]).
+    """
+    kind, x, data, extra, names = load_sources(sources, coord)
+    err = leave_one_out(x, data, order)
+    flat = data.reshape(len(x), -1)
+    report = []
+    for t in targets:
+        xt = coordinate(Path(t) / "POSCAR", coord)
+        w = weights(x, xt, order)[0]
+        out = (w @ flat).reshape(data.shape[1:])
+        e = estimate(x, err, xt)
+        if not x[0] <= xt <= x[-1]:
+            flag = "extrapolated"
+        elif np.isnan(e):
+            flag = "unverified"
+        elif e > tol:
+            flag = "inaccurate"
+        else:
+            flag = "ok"
+        dest = Path(t) / (kind if flag == "ok" or force else f"{kind}.interp")
+        if kind == "FORCE_CONSTANTS":
+            write_force_constants(dest, out)
+        else:
+            write_force_sets(dest, extra[0], extra[1], out)
+        lines = [f"# {kind} interpolated at {coord} = {xt:.6f} (order {min(order, len(x) - 1)})",
+                 f"# error estimate {e:.4f} (tol {tol}) → {flag}, written to {dest.name}",
+                 "# source\tcoordinate\tweight\tloo_error"]
+        lines += [f"{n}\t{xi:.6f}\t{wi:.6f}\t{ei:.4f}" for n, xi, wi, ei in zip(names, x, w, err)]
+        _replace(Path(t) / "fc_interpolation.txt", "\n".join(lines) + "\n")
+        report.append((t, xt, e, flag, dest.name))
+    return kind, x, err, names, report
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("sources", nargs="+", help="phonon directories with POSCAR + FORCE_CONSTANTS/FORCE_SETS")
+    ap.add_argument("--target", nargs="+", default=[], help="directories with the POSCAR to interpolate to")
+    ap.add_argument("--check", action="store_true", help="only report the leave-one-out errors")
+    ap.add_argument("--order", type=int, default=2, help="polynomial degree (default 2)")
+    ap.add_argument("--coord", choices=("a", "b", "c", "volume"), default="a",
+                    help="strain coordinate (default: lattice length a)")
+    ap.add_argument("--tol", type=float, default=TOL, help=f"relative error limit (default {TOL})")
+    ap.add_argument("--force", action="store_true",
+                    help="write flagged targets under the real file name too")
+    args = ap.parse_args()
+    if not args.target and not args.check:
+        ap.error("give --target DIR ... or --check")
+
+    try:
+        kind, x, err, names, report = interpolate(args.sources, args.target, args.order,
+                                                  args.coord, args.tol, args.force)
+    except (OSError, ValueError, IndexError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(f"📋 {len(names)} source(s) with {kind}, {args.coord} = {x[0]:.4f} … {x[-1]:.4f}")
+    for n, xi, ei in zip(names, x, err):
+        print(f"  {n}: {args.coord} = {xi:.4f}  leave-one-out error "
+              + ("n/a (end point)" if np.isnan(ei) else f"{ei:.2%}"))
+    flagged = 0
+    for t, xt, e, flag, name in report:
+        mark = "✅" if flag == "ok" else "⚠️ "
+        est = "n/a" if np.isnan(e) else f"{e:.2%}"
+        print(f"{mark} {t}: {args.coord} = {xt:.4f}, error ≈ {est} → {flag}, {name}"
+              + ("" if flag == "ok" else " (run the displacement calculations)"))
+        flagged += flag != "ok"
+    sys.exit(2 if flagged else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -88,6 +88,7 @@ module intel/19.1.1  impi/19.0.9
 module load vasp/6.3.0
 
 export OMP_NUM_THREADS=1
+source ~/scripts/util/events.sh
 
 ROOT="\$PWD"
 DIRS=($(printf '"%s" ' "${DIRS[@]}"))
@@ -103,7 +104,7 @@ for DIR in "\${DIRS[@]}"; do
     continue
   fi
 
-  ibrun vasp_std || exit \$?
+  ev_run vasp "\$PWD" ibrun vasp_std || exit \$?
   touch COMPLETED
   cd "\$ROOT"
 done
@@ -124,7 +125,7 @@ if [ \${#PHONOPY_FILES[@]} -gt 0 ]; then
   printf '  %s\n' "\${PHONOPY_FILES[@]}"
   
   # Run phonopy command
-  phonopy -f "\${PHONOPY_FILES[@]}"
+  ev_run phonopy "\$ROOT" phonopy -f "\${PHONOPY_FILES[@]}"
   
   if [ \$? -eq 0 ]; then
     echo "✅ Phonopy completed successfully"
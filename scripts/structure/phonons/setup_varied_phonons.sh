@@ -30,15 +30,8 @@ for subdir in "$base_dir"/*/; do
     # Only look for actual directories, not tar.gz files
     echo "  Finding energy minima in ${subdir}vary_inplane_lattice_scale_*"
 
-    # Capture stderr for diagnostics and stdout for actual results
-    python_output=$(python3 ~/scripts/util/energy_minima.py "${subdir}vary_inplane_lattice_scale_*" 2>&1)
-    python_exit_code=$?
-
-    # Separate stdout from stderr
-    mapfile -t minima_dirs < <(python3 ~/scripts/util/energy_minima.py "${subdir}vary_inplane_lattice_scale_*" 2>/dev/null)
-
-    # Show diagnostic messages
-    python3 ~/scripts/util/energy_minima.py "${subdir}vary_inplane_lattice_scale_*" >/dev/null
+    # One call: minima on stdout, diagnostics on stderr
+    mapfile -t minima_dirs < <(python3 ~/scripts/util/vtools.py minima "${subdir}vary_inplane_lattice_scale_*")
 
     if [[ ${#minima_dirs[@]} -eq 0 ]]; then
         echo "  No minima found for $subdir_name, skipping..."
@@ -1,17 +1,10 @@
 #!/bin/bash
 
-# Loop over all directories matching * (add to this for more specificity)
-for dir in POSCAR*/; do
-    # Check if it's a directory
-    if [ -d "$dir" ]; then
-        echo "🔍 Entering directory: $dir"
-        cd "$dir" || continue
-
-	echo -e "303" | vaspkit
-	mv KPATH.in QPOINTS
-         
-        echo "✅ Finished with $dir"
-        cd ..  # Go back to the parent directory
-    fi
-done
-
+# Write QPOINTS (high-symmetry path of each cell) into every POSCAR*/ directory
+# in one process (add to the pattern for more specificity)
+dirs=(POSCAR*/)
+if [[ ! -d "${dirs[0]}" ]]; then
+    echo "❌ No POSCAR*/ directories here"
+    exit 1
+fi
+python3 ~/scripts/util/kpoints.py path "${dirs[@]}" -o QPOINTS
@@ -3,10 +3,13 @@
 # Usage: bash repeat_relax.sh [tolerance] (ISIF1,IBRION1) (ISIF2,IBRION2) ... (ISIF_final,IBRION_final)
 # Example: bash repeat_relax.sh 1e-6 (3,2) (1,3)
 
+source ~/scripts/util/events.sh
+
 MAX_ITER=50
 ITER=0
 LOG_FILE="relaxation.log"
 OUTPUT_DIR="relaxation_outputs"
+stored_outcar=""   # iteration OUTCAR already in the trajectory (removed once superseded)
 STAGE=1
 TOLERANCE="1e-6"  # Default tolerance
 
@@ -93,22 +96,8 @@ update_incar() {
     local isif=$1
     local ibrion=$2
 
-    # Create temporary INCAR
-    cp INCAR.original INCAR.tmp
-
-    # Update or add ISIF
-    if grep -q "^[[:space:]]*ISIF" INCAR.tmp; then
-        sed -i "s/^[[:space:]]*ISIF[[:space:]]*=.*/ISIF   = $isif/" INCAR.tmp
-    else
-        echo "ISIF   = $isif" >> INCAR.tmp
-    fi
-
-    # Update or add IBRION
-    if grep -q "^[[:space:]]*IBRION" INCAR.tmp; then
-        sed -i "s/^[[:space:]]*IBRION[[:space:]]*=.*/IBRION = $ibrion/" INCAR.tmp
-    else
-        echo "IBRION = $ibrion" >> INCAR.tmp
-    fi
+    # Update or add ISIF and IBRION (comments and layout are kept)
+    python3 ~/scripts/util/incar.py set INCAR.original "ISIF=$isif" "IBRION=$ibrion" -o INCAR.tmp
 
     # Replace INCAR with updated version
     mv INCAR.tmp INCAR
@@ -116,6 +105,11 @@ update_incar() {
 
 # Initialize logging and directories
 mkdir -p "$OUTPUT_DIR"
+# Every invocation restarts at iteration 1, so an earlier run's trajectory is
+# kept under its own name instead of being appended to.
+if [[ -s "$OUTPUT_DIR/trajectory.vtrj" ]]; then
+    mv "$OUTPUT_DIR/trajectory.vtrj" "$OUTPUT_DIR/trajectory.$(date +%Y%m%d_%H%M%S).vtrj"
+fi
 {
     echo "VASP Multi-Stage Relaxation Log - $(date)"
     echo "Tolerance: $TOLERANCE"
@@ -156,7 +150,7 @@ for stage_idx in "${!STAGES[@]}"; do
             ((stage_iter++))
 
             # Run VASP
-            $VASP_CMD > vasp.out 2>&1
+            ev_run vasp "$PWD" $VASP_CMD > vasp.out 2>&1
             if [[ $? -ne 0 ]]; then
                 echo "$ITER VASP failed" >> "$LOG_FILE"
                 break
@@ -172,6 +166,11 @@ for stage_idx in "${!STAGES[@]}"; do
             iter_dir="$OUTPUT_DIR/iter_$ITER"
             mkdir -p "$iter_dir"
             cp {POSCAR,CONTCAR,OUTCAR,OSZICAR,INCAR} "$iter_dir/" 2>/dev/null
+            # Ionic steps go to the trajectory store; only the newest OUTCAR copy is kept
+            if python3 ~/scripts/structure/relax/trajectory.py append "$OUTPUT_DIR/trajectory.vtrj" OUTCAR --iter "$ITER" > /dev/null; then
+                [[ -n "$stored_outcar" ]] && rm -f "$stored_outcar"
+                stored_outcar="$iter_dir/OUTCAR"
+            fi
 
             # Extract energy
             energy=$(grep "free  energy   TOTEN" OUTCAR | tail -1 | awk '{print $5}')
@@ -205,7 +204,7 @@ for stage_idx in "${!STAGES[@]}"; do
         ((ITER++))
 
         # Run VASP
-        $VASP_CMD > vasp.out 2>&1
+        ev_run vasp "$PWD" $VASP_CMD > vasp.out 2>&1
         if [[ $? -ne 0 ]]; then
             echo "$ITER VASP failed" >> "$LOG_FILE"
             break
@@ -221,6 +220,11 @@ for stage_idx in "${!STAGES[@]}"; do
         iter_dir="$OUTPUT_DIR/iter_$ITER"
         mkdir -p "$iter_dir"
         cp {POSCAR,CONTCAR,OUTCAR,OSZICAR,INCAR} "$iter_dir/" 2>/dev/null
+        # Ionic steps go to the trajectory store; only the newest OUTCAR copy is kept
+        if python3 ~/scripts/structure/relax/trajectory.py append "$OUTPUT_DIR/trajectory.vtrj" OUTCAR --iter "$ITER" > /dev/null; then
+            [[ -n "$stored_outcar" ]] && rm -f "$stored_outcar"
+            stored_outcar="$iter_dir/OUTCAR"
+        fi
 
         # Extract energy
         energy=$(grep "free  energy   TOTEN" OUTCAR | tail -1 | awk '{print $5}')
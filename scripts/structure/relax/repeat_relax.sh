@@ -1,9 +1,11 @@
 #!/bin/bash
 # VASP relaxation script with proper convergence breaking
+source ~/scripts/util/events.sh
 MAX_ITER=50
 ITER=0
 LOG_FILE="relaxation.log"
 OUTPUT_DIR="relaxation_outputs"
+stored_outcar=""   # iteration OUTCAR already in the trajectory (removed once superseded)
 result="false"  # Initialize result variable
 
 # Check for previous run and restore if found
@@ -22,6 +24,15 @@ if [[ -f "$LOG_FILE" && -d "$OUTPUT_DIR" ]]; then
         if [[ -f "$last_iter_dir/CONTCAR" ]]; then
             cp "$last_iter_dir/CONTCAR" POSCAR
             ITER=$last_iter
+            # The OUTCAR copy kept from before the restart is deleted once the
+            # next iteration is stored, provided the trajectory holds it
+            # (append stores it now if the earlier run did not get to it)
+            if [[ -f "$last_iter_dir/OUTCAR" ]]; then
+                python3 ~/scripts/structure/relax/trajectory.py append "$OUTPUT_DIR/trajectory.vtrj" \
+                    "$last_iter_dir/OUTCAR" --iter "$last_iter" > /dev/null
+                rc=$?
+                (( rc == 0 || rc == 3 )) && stored_outcar="$last_iter_dir/OUTCAR"
+            fi
         fi
     fi
 fi
@@ -42,8 +53,10 @@ while (( ITER < MAX_ITER )); do
     ((ITER++))
     
     # Run VASP
-    echo -e "102\n2\n0.03" | vaspkit
-    ibrun vasp_std > relax.out 2>&1
+    ev_start kpoints
+    python3 ~/scripts/util/kpoints.py mesh --spacing 0.03 --quiet   # rewritten only if the mesh changed
+    ev_end kpoints "$PWD" $?
+    ev_run vasp "$PWD" ibrun vasp_std > relax.out 2>&1
     if [[ $? -ne 0 ]]; then
         echo "$ITER VASP failed" >> "$LOG_FILE"
         break
@@ -59,6 +72,11 @@ while (( ITER < MAX_ITER )); do
     iter_dir="$OUTPUT_DIR/iter_$ITER"
     mkdir -p "$iter_dir"
     cp {POSCAR,CONTCAR,OUTCAR,OSZICAR} "$iter_dir/"
+    # Ionic steps go to the trajectory store; only the newest OUTCAR copy is kept
+    if python3 ~/scripts/structure/relax/trajectory.py append "$OUTPUT_DIR/trajectory.vtrj" OUTCAR --iter "$ITER" > /dev/null; then
+        [[ -n "$stored_outcar" ]] && rm -f "$stored_outcar"
+        stored_outcar="$iter_dir/OUTCAR"
+    fi
     
     # Extract energy
     energy=$(grep "free  energy   TOTEN" OUTCAR | tail -1 | awk '{print $5}')
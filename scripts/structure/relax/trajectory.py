@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+trajectory.py
+Append-only binary store of relaxation trajectories.
+
+Every ionic step of an OUTCAR (energy, lattice, Cartesian positions, forces
+and stress) becomes one fixed-size record in a single .vtrj file per
+relaxation, so repeat-relax loops keep the whole history without copying
+each iteration's OUTCAR.  Records are streamed out of the OUTCAR one step at
+a time and the file is read back as a numpy memmap, so convergence analysis
+over hundreds of steps never parses text.
+
+Usage
+-----
+trajectory.py append TRAJ OUTCAR --iter N [--structure POSCAR]
+trajectory.py show   TRAJ
+
+append exits 0 when the steps were stored, 3 when the trajectory already
+holds iteration N or a later one (nothing written), 1 on errors.  Callers
+delete an iteration's OUTCAR copy only after exit 0.
+
+File layout
+-----------
+b"VTRJ0001" | uint32 header length | JSON header (natoms, symbols, counts),
+padded to 8 bytes | records.  One record:
+
+    iter int32, step int32, energy f8 (eV), lattice 3×3 f8 (Å),
+    pos N×3 f4 (Å), forces N×3 f4 (eV/Å), stress 6 f8 (GPa, Voigt, tension +)
+
+A crash mid-append leaves at most one partial record at the end; readers
+ignore it and the next append overwrites it.
+"""
+import argparse
+import json
+import os
+import re
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "util"))
+from vasp_io import read_poscar  # noqa: E402
+
+MAGIC = b"VTRJ0001"
+NIONS_RE = re.compile(rb"NIONS\s*=\s*(\d+)")
+EXIT_PRESENT = 3       # append: iteration already stored
+
+# ─────────────────────────────────── format ──────────────────────────────────
+def record_dtype(natoms):
+    return np.dtype([("iter", "<i4"), ("step", "<i4"), ("energy", "<f8"),
+                     ("lattice", "<f8", (3, 3)), ("pos", "<f4", (natoms, 3)),
+                     ("forces", "<f4", (natoms, 3)), ("stress", "<f8", (6,))])
+
+
+def read_header(f):
+    if f.read(8) != MAGIC:
+        raise ValueError("not a trajectory file")
+    (n,) = struct.unpack("<I", f.read(4))
+    return json.loads(f.read(n)), f.tell()
+
+
+def header_bytes(meta):
+    raw = json.dumps(meta).encode()
+    raw += b" " * (-(12 + len(raw)) % 8)
+    return MAGIC + struct.pack("<I", len(raw)) + raw
+
+
+def layout(path):
+    """Return (header dict, offset of the first record, number of whole records)."""
+    with open(path, "rb") as f:
+        meta, offset = read_header(f)
+    size = record_dtype(meta["natoms"]).itemsize
+    return meta, offset, (os.path.getsize(path) - offset) // size
+
+
+def load(path):
+    """Return (header dict, record memmap) of a trajectory file."""
+    meta, offset, count = layout(path)
+    dt = record_dtype(meta["natoms"])
+    if count == 0:
+        return meta, np.zeros(0, dtype=dt)
+    return meta, np.memmap(path, dtype=dt, mode="r", offset=offset, shape=(count,))
+
+
+def final_steps(rec):
+    """Index of the last ionic step of every iteration."""
+    if len(rec) == 0:
+        return np.zeros(0, dtype=int)
+    it = np.asarray(rec["iter"])
+    return np.flatnonzero(np.append(it[1:] != it[:-1], True))
+
+
+def max_force(rec):
+    """Largest per-atom force norm of every record (eV/Å)."""
+    f = np.asarray(rec["forces"], dtype=np.float64)
+    return np.sqrt((f * f).sum(-1)).max(-1) if f.size else np.zeros(len(rec))
+
+# ─────────────────────────────────── OUTCAR ──────────────────────────────────
+def floats(line, n):
+    return [float(x) for x in line.split()[:n]]
+
+
+def iter_steps(outcar, natoms=None, lattice=None):
+    """Yield (energy, lattice, pos, forces, stress) per ionic step, streaming the file.
+
+    The lattice is the last 'direct lattice vectors' block seen (LATTICE when
+    the OUTCAR has none), the stress the last 'in kB' line before the energy.
+    """
+    stress = np.full(6, np.nan)
+    pos = forces = None
+    with open(outcar, "rb") as f:
+        for line in f:
+            if natoms is None and b"NIONS" in line:
+                m = NIONS_RE.search(line)
+                if m:
+                    natoms = int(m.group(1))
+            elif b"direct lattice vectors" in line:
+                lattice = np.array([floats(next(f), 3) for _ in range(3)])
+            elif b"TOTAL-FORCE" in line and b"POSITION" in line:
+                next(f)                                          # dashes
+                rows = []
+                while natoms is None or len(rows) < natoms:
+                    parts = next(f).split()
+                    if len(parts) < 6 or parts[0].startswith(b"-"):
+                        break
+                    rows.append([float(x) for x in parts[:6]])
+                natoms = len(rows) if natoms is None else natoms
+                block = np.array(rows)
+                pos, forces = block[:, :3], block[:, 3:]
+            elif b"  in kB " in line:
+                xx, yy, zz, xy, yz, zx = (float(x) for x in line.split()[2:8])
+                stress = -0.1 * np.array([xx, yy, zz, yz, zx, xy])
+            elif b"free  energy   TOTEN" in line and pos is not None:
+                energy = float(line.split(b"=")[1].split()[0])
+                yield energy, lattice, pos, forces, stress
+                pos = forces = None
+                stress = np.full(6, np.nan)
+
+
+def append(traj, outcar, iteration, structure=None):
+    """Append every ionic step of OUTCAR as iteration ITERATION.
+
+    Returns the number of steps written, or None when the trajectory already
+    holds this iteration (re-run after a restart).  On error the file is cut
+    back to its previous length, so an iteration is stored whole or not at all.
+    """
+    traj = Path(traj)
+    p = read_poscar(structure) if structure and Path(structure).is_file() else None
+    lattice = p.lattice if p is not None else np.full((3, 3), np.nan)
+
+    if traj.exists() and traj.stat().st_size:
+        meta, offset, count = layout(traj)
+        natoms = meta["natoms"]
+        dt = record_dtype(natoms)
+        if count:
+            with open(traj, "rb") as f:
+                f.seek(offset + (count - 1) * dt.itemsize)
+                if np.frombuffer(f.read(4), "<i4")[0] >= iteration:
+                    return None
+        start = offset + count * dt.itemsize
+    else:
+        natoms = p.natoms if p is not None else None
+        start = None
+
+    n, end = 0, start
+    with open(traj, "r+b" if start is not None else "wb") as f:
+        try:
+            for energy, lat, pos, forces, stress in iter_steps(outcar, natoms, lattice):
+                if end is None:                                    # new file: header first
+                    natoms = len(pos)
+                    meta = {"natoms": natoms,
+                            "symbols": list(p.symbols) if p is not None else [],
+                            "counts": [int(c) for c in p.counts] if p is not None else [],
+                            "outcar": str(Path(outcar).resolve().parent)}
+                    f.write(header_bytes(meta))
+                    start = end = f.tell()
+                    dt = record_dtype(natoms)
+                if len(pos) != natoms:
+                    raise ValueError(f"{outcar}: {len(pos)} atoms, trajectory has {natoms}")
+                r = np.zeros(1, dtype=dt)
+                r["iter"], r["step"], r["energy"] = iteration, n + 1, energy
+                r["lattice"], r["pos"], r["forces"], r["stress"] = lat, pos, forces, stress
+                f.seek(end)
+                f.write(r.tobytes())
+                end += dt.itemsize
+                n += 1
+        except BaseException:
+            f.truncate(start or 0)
+            raise
+        f.truncate(end or 0)                                       # drop a torn record
+    return n
+
+# ─────────────────────────────────── CLI ─────────────────────────────────────
+def show(path):
+    meta, rec = load(path)
+    formula = " ".join(f"{s}{c}" for s, c in zip(meta.get("symbols", []), meta.get("counts", [])))
+    print(f"📋 {path}: {len(rec)} ionic steps, {meta['natoms']} atoms {formula}")
+    if not len(rec):
+        return
+    idx = final_steps(rec)
+    first = np.concatenate([[0], idx[:-1] + 1])
+    fmax = max_force(rec)
+    vol = np.abs(np.linalg.det(np.asarray(rec["lattice"][idx])))
+    press = -np.asarray(rec["stress"][idx][:, :3]).mean(1)
+    print(f"{'Iter':>5}{'Steps':>7}{'Energy(eV)':>16}{'dE(eV)':>12}{'Fmax(eV/Å)':>12}{'V(Å³)':>12}{'P(GPa)':>9}")
+    prev = None
+    for k, (i, j) in enumerate(zip(first, idx)):
+        e = rec["energy"][j]
+        de = "" if prev is None else f"{e - prev:.3e}"
+        print(f"{rec['iter'][j]:>5}{j - i + 1:>7}{e:>16.6f}{de:>12}{fmax[j]:>12.4f}{vol[k]:>12.3f}{press[k]:>9.3f}")
+        prev = e
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("append", help="append the ionic steps of an OUTCAR")
+    p.add_argument("traj")
+    p.add_argument("outcar")
+    p.add_argument("--iter", type=int, required=True, help="iteration number of this OUTCAR")
+    p.add_argument("--structure", help="POSCAR for species and a fallback lattice (default: beside OUTCAR)")
+    p = sub.add_parser("show", help="per-iteration summary")
+    p.add_argument("traj")
+    args = ap.parse_args()
+
+    try:
+        if args.cmd == "append":
+            structure = args.structure or Path(args.outcar).with_name("POSCAR")
+            n = append(args.traj, args.outcar, args.iter, structure)
+            if n is None:
+                print(f"♻️  iteration {args.iter} already in {args.traj}, nothing stored")
+                sys.exit(EXIT_PRESENT)
+            elif n == 0:
+                print(f"❌ No ionic steps in {args.outcar}")
+                sys.exit(1)
+            else:
+                print(f"✅ {n} ionic step(s) of iteration {args.iter} → {args.traj}")
+            return
+        show(args.traj)
+    except (OSError, ValueError, StopIteration) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
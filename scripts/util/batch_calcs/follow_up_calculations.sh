@@ -4,13 +4,20 @@ set -euo pipefail
 
 echo "🛠️   VASP Follow-up Calculation Setup"
 
-# Find calculation directories containing POSCAR_* subdirectories
+# Calculations come from the catalog (util/calc_catalog.py, rescanned
+# incrementally) instead of listing the tree: every catalogued OLD/POSCAR_*
+# directly below the current directory.
+declare -A CALC_POSCARS
+here=$(pwd -P)                                  # catalog paths are resolved
+while IFS= read -r -d '' path; do
+    rel="${path#"$here"/}"
+    [[ "$rel" =~ ^([^/]+)/(POSCAR_[^/]+)$ ]] || continue
+    CALC_POSCARS["${BASH_REMATCH[1]}"]+="${BASH_REMATCH[2]} "
+done < <(python3 ~/scripts/util/calc_catalog.py query --scan --under . -0 || true)
 CALC_DIRS=()
-for d in */; do
-    if [[ -d "$d" ]] && ls "$d"POSCAR_* >/dev/null 2>&1; then
-        CALC_DIRS+=("${d%/}")
-    fi
-done
+if (( ${#CALC_POSCARS[@]} > 0 )); then
+    mapfile -t CALC_DIRS < <(printf '%s\n' "${!CALC_POSCARS[@]}" | sort)
+fi
 
 if [[ ${#CALC_DIRS[@]} -eq 0 ]]; then
     echo "❌ No calculation directories with POSCAR_* found"
@@ -40,7 +47,7 @@ if [[ -d "$NEW_DIR" ]]; then
 fi
 
 # Get POSCAR directories
-POSCAR_DIRS=($(ls -d "$OLD_CALC"/POSCAR_* 2>/dev/null | xargs -n1 basename))
+mapfile -t POSCAR_DIRS < <(printf '%s\n' ${CALC_POSCARS[$OLD_CALC]} | sort)
 if [[ ${#POSCAR_DIRS[@]} -eq 0 ]]; then
     echo "❌ No POSCAR_* found in $OLD_CALC"
     exit 1
@@ -354,11 +361,14 @@ for param_set in "${PARAM_SETS[@]}"; do
         if [[ -n "$param_mods" ]]; then
             # Handle multiple parameter modifications
             IFS='|' read -ra modifications <<< "$param_mods"
-            for mod in "${modifications[@]}"; do
-                IFS='=' read -r param_key param_val <<< "$mod"
-                sed -i "s/^[[:space:]]*${param_key}[[:space:]]*=.*/${param_key} = ${param_val}/" "$dest/INCAR"
-                echo "    ✓ INCAR ($param_key = $param_val)"
-            done
+            if python3 ~/scripts/util/incar.py set "$dest/INCAR" "${modifications[@]}"; then
+                for mod in "${modifications[@]}"; do
+                    echo "    ✓ INCAR (${mod%%=*} = ${mod#*=})"
+                done
+            else
+                echo "    ✗ INCAR (could not set ${modifications[*]})"
+                echo "    ✗ INCAR modification failed in $dest" >> "$LOGFILE"
+            fi
         else
             echo "    ✓ INCAR (no modifications)"
         fi
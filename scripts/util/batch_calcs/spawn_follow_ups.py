@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+spawn_follow_ups.py
+Non-interactive, bulk version of follow_up_calculations.sh: create the
+follow-up directories of every selected calculation in one pass.
+
+Calculations are selected from the catalog (calc_catalog.py, rescanned
+incrementally first) with the same filters as 'calc_catalog.py query', and
+optionally reduced to the local energy minima of each energies.dat.  Every
+selected OLD/<calc> gets
+
+    <NEW>_from_<OLD>/<set>/<calc>/   INCAR     source INCAR (or --incar) + overrides
+                                     POSCAR    the source CONTCAR when it exists
+                                     POTCAR, KPOINTS, --files ...   copied
+                                     WAVECAR, CHGCAR (--link)       linked
+
+which is the layout follow_up_calculations.sh produces.  <set> is
+"default", or TAG_V[_TAG_V...] for each combination of --set values.
+
+Linked files are symlinks to the source, except when the follow-up INCAR
+would write the same file again (LWAVE / LCHARG not .FALSE.): VASP would
+then overwrite the source through the link, so those are copied instead.
+File operations run in a thread pool; existing destinations are skipped
+unless --force.
+
+Usage
+-----
+spawn_follow_ups.py NEW [--root DIR] [--status converged] [--func F] [--calc C]
+                    [--kind relax|static] [--under DIR] [--sx MIN MAX] [--sy ...] [--sz ...]
+                    [--ca MIN MAX] [--minima]
+                    [--set TAG=V1[,V2,...] ...] [--incar BASE]
+                    [--files NAME ...] [--link WAVECAR CHGCAR] [--no-contcar]
+                    [--jobs 16] [--force] [--dry-run]
+
+Example: static runs with LORBIT = 11 on every converged PBE relaxation
+    spawn_follow_ups.py static --func PBE --kind relax --status converged \\
+        --set NSW=0 IBRION=-1 LORBIT=11 --link CHGCAR
+"""
+import argparse
+import itertools
+import os
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import calc_catalog  # noqa: E402
+from incar import Incar, layered, parse_assignments, safe_name  # noqa: E402
+
+WORKERS = 16
+COPIED = ("POTCAR", "KPOINTS")
+WRITTEN_BY = {"WAVECAR": "LWAVE", "CHGCAR": "LCHARG"}    # file → INCAR tag that rewrites it
+
+# ─────────────────────────────────── selection ───────────────────────────────
+def local_minima(energies_dat):
+    """Directories at local energy minima of one energies.dat (as energy_minima.py).
+
+    The global minimum is used when there are fewer than three points or no
+    interior minimum.  Read without pandas so selection works anywhere.
+    """
+    rows = []
+    lines = Path(energies_dat).read_text().splitlines()
+    header = lines[0].split("\t") if lines else []
+    if "Directory" not in header or "Energy(eV)" not in header:
+        return []
+    i_dir, i_e = header.index("Directory"), header.index("Energy(eV)")
+    for line in lines[1:]:
+        parts = line.split("\t")
+        try:
+            rows.append((parts[i_dir], float(parts[i_e])))
+        except (IndexError, ValueError):
+            continue
+    if not rows:
+        return []
+    e = [x for _, x in rows]
+    found = [rows[i][0] for i in range(1, len(e) - 1) if e[i] < e[i - 1] and e[i] < e[i + 1]]
+    return found or [min(rows, key=lambda r: r[1])[0]]
+
+
+def minima_paths(root):
+    """Absolute paths of the minimum calculations of every energies.dat below ROOT.
+
+    parse_data.sh writes energies.dat into an output folder beside the
+    calculation directories it lists, so names resolve against its parent's parent.
+    """
+    out = set()
+    for dat in Path(root).rglob("energies.dat"):
+        for name in local_minima(dat):
+            out.add(os.path.normpath(dat.parent.parent / name))
+    return out
+
+
+def select_calcs(root, args):
+    """Absolute source directories matching the filters, in catalog order."""
+    conn, croot = calc_catalog.open_covering(root)
+    under = os.path.relpath(os.path.abspath(args.under), croot) if args.under else None
+    rows = calc_catalog.select(conn, args.func, args.calc, args.status, args.kind, under,
+                               ca=args.ca, sx=args.sx, sy=args.sy, sz=args.sz)
+    conn.close()
+    paths = [os.path.normpath(croot / r["path"]) for r in rows]
+    root = os.path.abspath(root)
+    paths = [p for p in paths if p == root or p.startswith(root + os.sep)]
+    if args.minima:
+        keep = minima_paths(root)
+        paths = [p for p in paths if p in keep]
+    return paths
+
+# ─────────────────────────────────── spawning ────────────────────────────────
+def parameter_sets(assignments):
+    """[(set name, {TAG: value})] for the Cartesian product of TAG=V1,V2 lists."""
+    axes = {t: v.split(",") for t, v in parse_assignments(assignments).items()}
+    varied = [t for t, vals in axes.items() if len(vals) > 1]
+    sets = []
+    for combo in itertools.product(*axes.values()):
+        values = dict(zip(axes, combo))
+        name = "_".join(f"{t}_{safe_name(values[t])}" for t in varied) or "default"
+        sets.append((name, values))
+    return sets
+
+
+def destination(src, new, set_name):
+    src = Path(src)
+    old = src.parent
+    return old.parent / f"{new}_from_{old.name}" / set_name / src.name
+
+
+def link_or_copy(src, dest, incar):
+    """Symlink SRC unless the follow-up writes DEST itself; return the mode used."""
+    tag = WRITTEN_BY.get(dest.name)
+    if tag is None or incar.get(tag, True) is False:
+        os.symlink(os.path.relpath(src, dest.parent), dest)
+        return "link"
+    shutil.copyfile(src, dest)
+    return "copy"
+
+
+def spawn_one(src, dest, incar, args):
+    """Create one follow-up directory; return a log line."""
+    src = Path(src)
+    if (dest / "INCAR").exists() and not args.force:
+        return f"skip\t{src}\t{dest}"
+    dest.mkdir(parents=True, exist_ok=True)
+    for f in dest.iterdir():
+        if f.is_symlink() or f.name in ("POSCAR", "INCAR"):
+            f.unlink()
+
+    contcar = src / "CONTCAR"
+    use_contcar = not args.no_contcar and contcar.is_file() and contcar.stat().st_size > 0
+    shutil.copyfile(contcar if use_contcar else src / "POSCAR", dest / "POSCAR")
+    incar.write(dest / "INCAR")
+    for name in (*COPIED, *args.files):
+        if (src / name).is_file():
+            shutil.copyfile(src / name, dest / name)
+    modes = []
+    for name in args.link:
+        if (src / name).is_file() and (src / name).stat().st_size > 0:
+            modes.append(f"{name}:{link_or_copy((src / name).resolve(), dest / name, incar)}")
+    return "\t".join(["new", str(src), str(dest), "CONTCAR" if use_contcar else "POSCAR", *modes])
+
+
+def spawn(paths, args):
+    """Create every follow-up; return (created, skipped)."""
+    sets = parameter_sets(args.set)
+    base = Incar.read(args.incar) if args.incar else None
+    jobs = []
+    for src in paths:
+        src_incar = base if base is not None else Incar.read(Path(src) / "INCAR")
+        for name, overrides in sets:
+            jobs.append((src, destination(src, args.new, name), layered(src_incar, overrides)))
+    if args.dry_run:
+        for src, dest, _ in jobs:
+            print(f"  {src} → {dest}")
+        return len(jobs), 0
+
+    with ThreadPoolExecutor(args.jobs) as pool:
+        lines = list(pool.map(lambda j: spawn_one(*j, args), jobs))
+
+    by_log = {}
+    for (src, dest, _), line in zip(jobs, lines):
+        by_log.setdefault(dest.parents[1] / "copy_log.txt", []).append(line)
+    for log, entries in by_log.items():
+        with open(log, "a") as f:
+            f.write("\n".join(entries) + "\n")
+    skipped = sum(line.startswith("skip") for line in lines)
+    return len(lines) - skipped, skipped
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("new", help="name of the follow-up calculation (NEW in NEW_from_OLD)")
+    ap.add_argument("--root", default=".", help="only calculations below this directory")
+    for opt in ("func", "calc", "status", "kind", "under"):
+        ap.add_argument(f"--{opt}")
+    for col in ("ca", "sx", "sy", "sz"):
+        ap.add_argument(f"--{col}", type=float, nargs=2, metavar=("MIN", "MAX"))
+    ap.add_argument("--minima", action="store_true", help="only local minima of each energies.dat")
+    ap.add_argument("--set", nargs="+", default=[], metavar="TAG=V1,V2",
+                    help="INCAR overrides; comma lists span parameter sets")
+    ap.add_argument("--incar", help="base INCAR (default: each source's own)")
+    ap.add_argument("--files", nargs="+", default=[], help="extra files to copy")
+    ap.add_argument("--link", nargs="+", default=[], help="files to link, e.g. WAVECAR CHGCAR")
+    ap.add_argument("--no-contcar", action="store_true", help="keep the source POSCAR")
+    ap.add_argument("--jobs", type=int, default=WORKERS)
+    ap.add_argument("--force", action="store_true", help="rewrite existing follow-ups")
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+
+    try:
+        paths = select_calcs(args.root, args)
+        if not paths:
+            print("❌ No calculations match the selection")
+            sys.exit(1)
+        print(f"📋 {len(paths)} calculation(s) selected")
+        made, skipped = spawn(paths, args)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if args.dry_run:
+        print(f"🔧 {made} follow-up director{'y' if made == 1 else 'ies'} would be created")
+    else:
+        print(f"✅ {made} follow-up director{'y' if made == 1 else 'ies'} created"
+              + (f", {skipped} already present (--force to rewrite)" if skipped else ""))
+
+
+if __name__ == "__main__":
+    main()
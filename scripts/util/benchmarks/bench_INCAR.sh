@@ -6,6 +6,8 @@
 # files unchanged, and modifies the INCAR file with the specified parameter values.
 #
 # Usage: Run this script in a directory containing POSCAR, POTCAR, INCAR, and KPOINTS files.
+#        LINK_MODE=hardlink links POTCAR/KPOINTS from the .input_store instead of copying
+#        (POSCAR is always copied).
 
 set -e  # Exit on any error
 
@@ -151,52 +153,6 @@ get_user_input() {
     fi
 }
 
-# Function to modify INCAR file with new tag value
-modify_incar() {
-    local original_incar=$1
-    local output_incar=$2
-    local tag=$3
-    local value=$4
-    local tag_found=false
-    
-    # Create header for new INCAR
-    {
-        echo "# INCAR file for VASP convergence test"
-        echo "# Generated automatically - modify original INCAR if needed"
-        echo
-    } > "$output_incar"
-    
-    # Process original INCAR line by line
-    while IFS= read -r line || [[ -n "$line" ]]; do
-        # Skip empty lines initially - we'll add them back
-        if [[ -z "$(echo "$line" | xargs)" ]]; then
-            echo >> "$output_incar"
-            continue
-        fi
-        
-        # Handle comments
-        if [[ "$line" =~ ^[[:space:]]*[#!] ]]; then
-            echo "$line" >> "$output_incar"
-            continue
-        fi
-        
-        # Check if line contains our tag
-        if [[ "$line" =~ ^[[:space:]]*${tag}[[:space:]]*= ]]; then
-            echo "$tag = $value" >> "$output_incar"
-            tag_found=true
-        else
-            echo "$line" >> "$output_incar"
-        fi
-    done < "$original_incar"
-    
-    # If tag wasn't found, add it at the end
-    if [[ "$tag_found" == false ]]; then
-        echo "$tag = $value" >> "$output_incar"
-    fi
-    
-    return 0
-}
-
 # Function to create test directories
 create_test_directories() {
     local tag=$1
@@ -216,6 +172,15 @@ create_test_directories() {
     
     print_color $BLUE "\nCreating test subdirectories for $tag..."
     echo "----------------------------------------"
+
+    # Write every ${tag}_<value>/INCAR in one pass (comments and layout of
+    # the original INCAR are kept, the tag is appended if it is missing)
+    local value_list
+    value_list=$(IFS=,; echo "${values[*]}")
+    if ! python3 ~/scripts/util/incar.py grid INCAR "$tag=$value_list" -d "$main_path" > /dev/null; then
+        print_color $RED "✗ Failed to write INCARs in $main_dir/"
+        return 1
+    fi
     
     for value in "${values[@]}"; do
         local dir_name="${tag}_${value}"
@@ -223,9 +188,12 @@ create_test_directories() {
         
         # Create directory
         if mkdir -p "$dir_path"; then
-            # Copy POSCAR, POTCAR, and KPOINTS unchanged
+            # Copy POSCAR, POTCAR, and KPOINTS unchanged (POTCAR and KPOINTS
+            # are linked in one pass below when LINK_MODE is set; POSCAR is
+            # always copied because the relaxation loops overwrite it)
             local success=true
             for file in "POSCAR" "POTCAR" "KPOINTS"; do
+                [[ -n "${LINK_MODE:-}" && "$file" != POSCAR ]] && continue
                 if ! cp "$file" "$dir_path/"; then
                     print_color $RED "✗ Failed to copy $file to $dir_name/"
                     success=false
@@ -233,9 +201,9 @@ create_test_directories() {
                 fi
             done
             
-            # Modify and copy INCAR
+            # INCAR was written by incar.py grid above
             if [[ "$success" == true ]]; then
-                if modify_incar "INCAR" "$dir_path/INCAR" "$tag" "$value"; then
+                if [[ -f "$dir_path/INCAR" ]]; then
                     CREATED_DIRS+=("$main_dir/$dir_name")
                     print_color $GREEN "✓ Created $main_dir/$dir_name/ with $tag = $value"
                 else
@@ -246,6 +214,11 @@ create_test_directories() {
             print_color $RED "✗ Error creating directory $main_dir/$dir_name"
         fi
     done
+
+    if [[ -n "${LINK_MODE:-}" && ${#CREATED_DIRS[@]} -gt 0 ]]; then
+        python3 ~/scripts/util/input_store.py link POTCAR KPOINTS \
+            -t "${CREATED_DIRS[@]/#/$WORKING_DIR/}" --mode "$LINK_MODE"
+    fi
 }
 
 # Function to print summary
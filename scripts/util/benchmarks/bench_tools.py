@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+bench_tools.py
+Micro-benchmarks for the Python parsers and structure tools on synthetic inputs.
+
+Inputs are generated once (seeded, so every run sees the same files) and
+cached in the data directory: POSCARs up to 100k atoms, multi-GB OUTCARs
+made of repeated ionic steps and trees of energies.dat folders.  Every case
+runs in its own interpreter so import cost and peak memory do not leak
+between cases.
+
+Usage
+-----
+bench_tools.py gen  [--preset quick|default|full] [--data DIR]
+bench_tools.py run  [--preset ...] [--data DIR] [--cases NAME ...] [--repeat N]
+                    [--save] [--threshold 0.25]
+bench_tools.py list
+
+Outputs
+-------
+• table of min/median time, Python heap peak and process max RSS per case
+• DIR/bench_history.tsv – one row per case and run (appended)
+• DIR/baseline_<preset>.json – reference results written by --save
+
+Without --save, `run` compares against the stored baseline and flags every
+case whose time or heap peak grew by more than --threshold (exit status 1).
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+SCRIPTS = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(SCRIPTS / "util"))
+sys.path.insert(0, str(SCRIPTS / "magnetism"))
+sys.path.insert(0, str(SCRIPTS / "structure" / "editor"))
+sys.path.insert(0, str(SCRIPTS / "structure" / "relax"))
+sys.path.insert(0, str(SCRIPTS / "structure" / "analysis"))
+
+DEFAULT_DATA = Path.home() / ".cache" / "vasp_bench"
+
+PRESETS = {
+    "quick":   {"atoms": 2_000,   "outcar_mb": 16,    "outcar_atoms": 64,  "dirs": 50,   "points": 30},
+    "default": {"atoms": 20_000,  "outcar_mb": 256,   "outcar_atoms": 128, "dirs": 500,  "points": 40},
+    "full":    {"atoms": 100_000, "outcar_mb": 2_048, "outcar_atoms": 256, "dirs": 5000, "points": 40},
+}
+
+# ─────────────────────────────────── generators ──────────────────────────────
+def cells_per_side(natoms):
+    """Edge length k of the k×k×k rocksalt-like supercell (8 atoms per cell) closest to natoms."""
+    return max(1, round((natoms / 8) ** (1 / 3)))
+
+
+def synthetic_structure(natoms, seed=0):
+    """Return (lattice, frac, symbols, counts) of a slightly rattled two-species crystal."""
+    k = cells_per_side(natoms)
+    a = 4.2
+    basis_a = np.array([[0, 0, 0], [0, .5, .5], [.5, 0, .5], [.5, .5, 0]])
+    basis_b = basis_a + 0.5
+    grid = np.stack(np.meshgrid(*[np.arange(k)] * 3, indexing="ij"), -1).reshape(-1, 3)
+    rng = np.random.default_rng(seed)
+    sites = []
+    for basis in (basis_a, basis_b):
+        frac = ((grid[:, None, :] + basis[None, :, :]) / k).reshape(-1, 3) % 1.0
+        sites.append(frac + rng.normal(0, 0.003 / (a * k), frac.shape))
+    lattice = np.eye(3) * a * k
+    n = len(sites[0])
+    return lattice, np.vstack(sites) % 1.0, ["Fe", "O"], [n, n]
+
+
+def write_synthetic_poscar(path, natoms, cartesian=False, selective=False, seed=0):
+    lattice, frac, symbols, counts = synthetic_structure(natoms, seed)
+    coords = frac @ lattice if cartesian else frac
+    out = ["synthetic benchmark cell", "1.0"]
+    out += [" ".join(f"{x:21.16f}" for x in row) for row in lattice]
+    out += ["   " + "   ".join(symbols), "   " + "   ".join(map(str, counts))]
+    if selective:
+        out.append("Selective dynamics")
+    out.append("Cartesian" if cartesian else "Direct")
+    flags = "   T   T   T" if selective else ""
+    body = "\n".join(f"{x:20.16f}{y:20.16f}{z:20.16f}{flags}" for x, y, z in coords)
+    tmp = Path(f"{path}.tmp")
+    tmp.write_text("\n".join(out) + "\n" + body + "\n")
+    os.replace(tmp, path)
+
+
+def outcar_step(natoms, step, rng):
+    """One ionic step as VASP prints it: forces, stress, energy, magnetization."""
+    pos = rng.random((natoms, 3)) * 10
+    frc = rng.normal(0, 0.05, (natoms, 3))
+    mag = rng.normal(2.0, 0.5, natoms) * np.where(np.arange(natoms) % 2, -1, 1)
+    out = [" POSITION                                       TOTAL-FORCE (eV/Angst)",
+           " -----------------------------------------------------------------------------------"]
+    out += [f" {p[0]:12.5f}{p[1]:12.5f}{p[2]:12.5f}   {f[0]:13.6f}{f[1]:13.6f}{f[2]:13.6f}"
+            for p, f in zip(pos, frc)]
+    out += [" -----------------------------------------------------------------------------------",
+            "  FORCE on cell =-STRESS in cart. coord.  units (eV):",
+            "  in kB  " + "".join(f"{x:12.5f}" for x in rng.normal(0, 5, 6)),
+            "  FREE ENERGIE OF THE ION-ELECTRON SYSTEM (eV)",
+            "  ---------------------------------------------------",
+            f"  free  energy   TOTEN  =     {-7.5 * natoms - 0.001 * step:16.8f} eV",
+            "",
+            " magnetization (x)",
+            " ",
+            "# of ion       s       p       d       tot",
+            "------------------------------------------"]
+    out += [f"{i:5d}       {0.01 * m:6.3f}  {0.02 * m:6.3f}  {0.97 * m:6.3f}  {m:6.3f}"
+            for i, m in enumerate(mag, 1)]
+    out += ["--------------------------------------------------",
+            f"tot          0.000   0.000   0.000  {mag.sum():7.3f}", "", ""]
+    return ("\n".join(out) + "\n").encode()
+
+
+def write_synthetic_outcar(path, target_mb, natoms, seed=0):
+    """Repeat a handful of distinct ionic steps until the file reaches target_mb."""
+    rng = np.random.default_rng(seed)
+    steps = [outcar_step(natoms, i, rng) for i in range(8)]
+    target = target_mb * 1024 * 1024
+    tmp = Path(f"{path}.tmp")
+    written, i = 0, 0
+    with open(tmp, "wb", buffering=8 * 1024 * 1024) as f:
+        f.write(b" vasp.6.4.2 synthetic benchmark OUTCAR\n\n")
+        while written < target:
+            block = steps[i % len(steps)]
+            f.write(block)
+            written += len(block)
+            i += 1
+        f.write(b"  reached required accuracy - stopping structural energy minimisation\n"
+                b" General timing and accounting informations for this job:\n")
+    os.replace(tmp, path)
+
+
+def write_energy_tree(root, ndirs, npoints, seed=0):
+    """ndirs folders, each with an energies.dat scan of npoints strained cells."""
+    rng = np.random.default_rng(seed)
+    tmp = Path(f"{root}.tmp")
+    tmp.mkdir(parents=True, exist_ok=True)
+    x = np.linspace(-1, 1, npoints)
+    for d in range(ndirs):
+        folder = tmp / f"scan_{d:05d}"
+        folder.mkdir(exist_ok=True)
+        e = -100 + 2 * (x - rng.uniform(-.5, .5)) ** 2 + 0.3 * np.sin(6 * x + d) + rng.normal(0, .01, npoints)
+        rows = ["Directory\tA(Å)\tB(Å)\tC(Å)\tEnergy(eV)"]
+        rows += [f"calc_{j:03d}\t{4 + .01 * j:.6f}\t{4 + .01 * j:.6f}\t{4 + .01 * j:.6f}\t{v:.8f}"
+                 for j, v in enumerate(e)]
+        (folder / "energies.dat").write_text("\n".join(rows) + "\n")
+    os.replace(tmp, root)
+
+
+def inputs(data, cfg):
+    """Paths of the synthetic inputs for one preset (generated on first use)."""
+    data = Path(data)
+    return {
+        "poscar": data / f"POSCAR_{cfg['atoms']}",
+        "poscar_cart": data / f"POSCAR_{cfg['atoms']}_cart_sd",
+        "outcar": data / f"OUTCAR_{cfg['outcar_mb']}MB_{cfg['outcar_atoms']}",
+        "tree": data / f"energies_{cfg['dirs']}x{cfg['points']}",
+    }
+
+
+def generate(data, cfg):
+    data = Path(data)
+    data.mkdir(parents=True, exist_ok=True)
+    paths = inputs(data, cfg)
+    jobs = [
+        ("poscar", lambda p: write_synthetic_poscar(p, cfg["atoms"])),
+        ("poscar_cart", lambda p: write_synthetic_poscar(p, cfg["atoms"], cartesian=True, selective=True)),
+        ("outcar", lambda p: write_synthetic_outcar(p, cfg["outcar_mb"], cfg["outcar_atoms"])),
+        ("tree", lambda p: write_energy_tree(p, cfg["dirs"], cfg["points"])),
+    ]
+    for key, make in jobs:
+        path = paths[key]
+        if path.exists():
+            print(f"♻️  {path.name} (cached)")
+            continue
+        t = time.perf_counter()
+        make(path)
+        print(f"📦 {path.name} ({time.perf_counter() - t:.1f}s)")
+    return paths
+
+# ─────────────────────────────────── cases ───────────────────────────────────
+# Each case takes the input paths and returns a zero-argument callable; the
+# set-up work (reading inputs the case does not measure) happens outside it.
+def case_poscar_read(p):
+    from vasp_io import read_poscar
+    return lambda: read_poscar(p["poscar"])
+
+
+def case_poscar_read_cart_sd(p):
+    from vasp_io import read_poscar
+    return lambda: read_poscar(p["poscar_cart"])
+
+
+def case_poscar_format(p):
+    from vasp_io import read_poscar, format_poscar
+    pos = read_poscar(p["poscar"])
+    return lambda: format_poscar(pos)
+
+
+def case_coplanar_read(p):
+    from coplanar_magnetic_ordering import read_poscar
+    return lambda: read_poscar(p["poscar"])
+
+
+def case_coplanar_planes(p):
+    from coplanar_magnetic_ordering import read_poscar, group_planes
+    lattice, frac, elems = read_poscar(p["poscar"])
+    n_hat = np.array([0.0, 0.0, 1.0])
+    proj = (frac @ lattice) @ n_hat
+    mask = elems == "Fe"
+    return lambda: group_planes(proj, mask, 0.02)
+
+
+def case_supercell(p):
+    from vasp_io import read_poscar
+    from supercell import make_supercell
+    pos = read_poscar(p["poscar"])
+    keep = np.concatenate([np.arange(c) + s for c, s in
+                           zip([pos.counts[0] // 8] * 2, [0, pos.counts[0]])])
+    unit = pos.copy()
+    unit.frac, unit.counts = pos.frac[keep], [pos.counts[0] // 8] * 2
+    M = np.diag([2, 2, 2])
+    return lambda: make_supercell(unit, M)
+
+
+def case_neighbour_list(p):
+    from vasp_io import read_poscar
+    from neighbours import neighbour_list
+    pos = read_poscar(p["poscar"])
+    return lambda: neighbour_list(pos.frac, pos.lattice, 3.0)
+
+
+def case_octahedral_descriptors(p):
+    from vasp_io import read_poscar
+    from descriptors import octahedral
+    pos = read_poscar(p["poscar"])
+    return lambda: octahedral(pos, center="Fe")
+
+
+def case_incar_parse(p):
+    from vasp_io import read_poscar
+    from incar import Incar, validate
+    pos = read_poscar(p["poscar"])
+    magmom = " ".join(["3.0", "-3.0"] * (pos.natoms // 2))
+    text = ("SYSTEM = bench\nISPIN = 2\nENCUT = 520 # cut-off\nISMEAR = 0; SIGMA = 0.05\n"
+            f"MAGMOM = {magmom}\nLORBIT = 11\n")
+    return lambda: validate(Incar(text), natoms=pos.natoms, nspecies=len(pos.counts))
+
+
+def case_outcar_energy(p):
+    from vasp_io import read_outcar_energy
+    return lambda: read_outcar_energy(p["outcar"])
+
+
+def case_outcar_stress(p):
+    from vasp_io import read_outcar_stress
+    return lambda: read_outcar_stress(p["outcar"])
+
+
+def case_outcar_magnetization(p):
+    from vasp_io import read_outcar_magnetization
+    return lambda: read_outcar_magnetization(p["outcar"])
+
+
+def case_outcar_finished(p):
+    from vasp_io import outcar_finished
+    return lambda: outcar_finished(p["outcar"])
+
+
+def case_trajectory_append(p):
+    import tempfile
+    from trajectory import append
+    traj = Path(tempfile.mkdtemp()) / "bench.vtrj"
+
+    def run():
+        traj.unlink(missing_ok=True)
+        return append(traj, p["outcar"], 1)
+    return run
+
+
+def case_energy_minima(p):
+    from energy_minima import find_local_minima
+    import pandas, scipy.signal  # noqa: F401  (fail in set-up, not in the timed call)
+
+    def run():
+        with open(os.devnull, "w") as null, contextlib.redirect_stderr(null):
+            return find_local_minima(str(p["tree"] / "*"))
+    return run
+
+
+CASES = {name[5:]: fn for name, fn in globals().items() if name.startswith("case_")}
+
+# ─────────────────────────────────── measurement ─────────────────────────────
+def measure(name, data, cfg, repeat):
+    """Run one case in this process; return its result record."""
+    t = time.perf_counter()
+    fn = CASES[name](inputs(data, cfg))
+    setup = time.perf_counter() - t
+    fn()                                                    # warm-up (page cache, lazy imports)
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"case": name, "min": min(times), "median": statistics.median(times),
+            "setup": setup, "peak_mb": peak / 2**20, "rss_mb": rss_kb / 1024, "repeat": repeat}
+
+
+def run_case(name, data, preset, repeat):
+    """Run a case in a fresh interpreter; return the record or {'case', 'error'}."""
+    cmd = [sys.executable, __file__, "_case", name, "--data", str(data),
+           "--preset", preset, "--repeat", str(repeat)]
+    res = subprocess.run(cmd, capture_output=True, text=True)
+    if res.returncode != 0:
+        err = (res.stderr.strip().splitlines() or ["failed"])[-1]
+        return {"case": name, "error": err}
+    return json.loads(res.stdout.strip().splitlines()[-1])
+
+# ─────────────────────────────────── baselines ───────────────────────────────
+def fmt_time(sec):
+    if sec >= 1:
+        return f"{sec:.2f}s"
+    if sec >= 1e-3:
+        return f"{sec * 1e3:.1f}ms"
+    return f"{sec * 1e6:.0f}µs"
+
+
+def compare(rec, base, threshold):
+    """Return regression notes for one record against its baseline record."""
+    notes = []
+    if not base or "error" in rec or "error" in base:
+        return notes
+    if rec["min"] > base["min"] * (1 + threshold) and rec["min"] - base["min"] > 1e-4:
+        notes.append(f"time ×{rec['min'] / base['min']:.2f}")
+    if rec["peak_mb"] > base["peak_mb"] * (1 + threshold) and rec["peak_mb"] - base["peak_mb"] > 1:
+        notes.append(f"heap ×{rec['peak_mb'] / max(base['peak_mb'], 1e-9):.2f}")
+    return notes
+
+
+def append_history(path, preset, records):
+    new = not path.exists()
+    stamp = datetime.now().isoformat(timespec="seconds")
+    with open(path, "a") as f:
+        if new:
+            f.write("date\tpreset\tcase\tmin_s\tmedian_s\tpeak_mb\trss_mb\n")
+        for r in records:
+            if "error" not in r:
+                f.write(f"{stamp}\t{preset}\t{r['case']}\t{r['min']:.6g}\t{r['median']:.6g}"
+                        f"\t{r['peak_mb']:.3f}\t{r['rss_mb']:.1f}\n")
+
+
+def cmd_run(args):
+    cfg = PRESETS[args.preset]
+    data = Path(args.data)
+    generate(data, cfg)
+    names = args.cases or list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        print(f"❌ Unknown case(s): {' '.join(unknown)}")
+        return 1
+
+    base_path = data / f"baseline_{args.preset}.json"
+    baseline = json.loads(base_path.read_text()) if base_path.exists() else {}
+    print(f"\n📋 preset {args.preset}: {cfg}")
+    print(f"{'Case':<22}{'min':>10}{'median':>10}{'heap':>10}{'rss':>10}  vs baseline")
+    records, regressions = [], 0
+    for name in names:
+        rec = run_case(name, data, args.preset, args.repeat)
+        records.append(rec)
+        if "error" in rec:
+            print(f"{name:<22}{'skipped':>10}  ⚠️  {rec['error']}")
+            continue
+        base = baseline.get("cases", {}).get(name)
+        notes = compare(rec, base, args.threshold)
+        regressions += bool(notes)
+        if notes:
+            verdict = "❌ " + ", ".join(notes)
+        elif base and "error" not in base:
+            verdict = f"✅ ×{rec['min'] / base['min']:.2f}"
+        else:
+            verdict = "–"
+        print(f"{name:<22}{fmt_time(rec['min']):>10}{fmt_time(rec['median']):>10}"
+              f"{rec['peak_mb']:>8.1f}MB{rec['rss_mb']:>8.0f}MB  {verdict}")
+
+    append_history(data / "bench_history.tsv", args.preset, records)
+    if args.save:
+        keep = {r["case"]: r for r in records if "error" not in r}
+        cases = {**baseline.get("cases", {}), **keep}
+        doc = {"preset": args.preset, "config": cfg, "python": sys.version.split()[0],
+               "numpy": np.__version__, "saved": datetime.now().isoformat(timespec="seconds"),
+               "cases": cases}
+        tmp = base_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(doc, indent=1) + "\n")
+        os.replace(tmp, base_path)
+        print(f"\n✅ Baseline saved: {base_path}")
+        return 0
+    if regressions:
+        print(f"\n❌ {regressions} case(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    def common(p):
+        p.add_argument("--preset", choices=PRESETS, default="default")
+        p.add_argument("--data", default=str(DEFAULT_DATA), help=f"input/baseline directory (default {DEFAULT_DATA})")
+
+    common(sub.add_parser("gen", help="generate (or reuse) the synthetic inputs"))
+    p = sub.add_parser("run", help="run the cases and compare with the baseline")
+    common(p)
+    p.add_argument("--cases", nargs="+", help="subset of cases (see `list`)")
+    p.add_argument("--repeat", type=int, default=5, help="timed repetitions per case (default 5)")
+    p.add_argument("--save", action="store_true", help="store these results as the new baseline")
+    p.add_argument("--threshold", type=float, default=0.25, help="allowed slow-down fraction (default 0.25)")
+    sub.add_parser("list", help="list the benchmark cases")
+    p = sub.add_parser("_case")                             # child process entry point
+    common(p)
+    p.add_argument("name")
+    p.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    if args.cmd == "list":
+        for name, fn in CASES.items():
+            print(name)
+        return
+    if args.cmd == "gen":
+        generate(args.data, PRESETS[args.preset])
+        return
+    if args.cmd == "_case":
+        print(json.dumps(measure(args.name, args.data, PRESETS[args.preset], max(1, args.repeat))))
+        return
+    sys.exit(cmd_run(args))
+
+
+if __name__ == "__main__":
+    main()
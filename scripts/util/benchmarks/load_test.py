@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+load_test.py
+End-to-end orchestration load test on the fake VASP/SLURM simulators.
+
+Drives a whole scale-factor campaign through the real scripts, in a sandbox
+HOME whose ~/scripts points at this checkout and with the shims of
+util/simulator/fake_slurm.py first on PATH:
+
+  setup      setup_varied_scale_factors.sh   (scale_X/POSCAR_z_Z directories)
+  jobscripts write_chain_vasp_jobscript.sh   (one chain per scale_X, CHGCAR+WAVECAR forwarded)
+  submit     submit_multiple.sh              (fake sbatch, jobs queued)
+  run        fake_slurm.py drain             (fake vasp per directory + parse_data.sh -x)
+  follow_up  follow_up_calculations.sh       (CONTCAR → POSCAR copy of every scale_X,
+                                              with the campaign INCAR as its base)
+
+For every stage it reports wall time, child CPU time, processes started,
+read/write system calls and bytes (from /proc, descendants included) and
+inodes created; with --strace also the file-system calls (open, stat,
+getdents, ...) counted by strace -c.
+
+Usage
+-----
+load_test.py [--dirs 10000] [--work DIR] [--stages setup jobscripts ...]
+             [--max-running 8] [--vasp-seconds 0] [--strace] [--fresh]
+
+Outputs
+-------
+• per-stage table on stdout and WORK/load_test.tsv
+• WORK/logs/<stage>.log – output of each stage
+• events.py report of WORK/events.jsonl (harvest, vasp, copy, queue ...)
+"""
+import argparse
+import math
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SCRIPTS = Path(__file__).resolve().parents[2]
+SIMULATOR = SCRIPTS / "util" / "simulator"
+sys.path.insert(0, str(SIMULATOR))
+from fake_slurm import write_shims  # noqa: E402
+
+STAGES = ["setup", "jobscripts", "submit", "run", "follow_up"]
+FS_CALLS = {
+    "open": ("open", "openat", "openat2", "creat"),
+    "stat": ("stat", "lstat", "fstat", "newfstatat", "statx", "access", "faccessat", "faccessat2"),
+    "readdir": ("getdents", "getdents64"),
+    "create": ("mkdir", "mkdirat", "rename", "renameat", "renameat2", "link", "symlink", "symlinkat"),
+    "unlink": ("unlink", "unlinkat", "rmdir"),
+    "exec": ("execve", "execveat"),
+    "fork": ("clone", "clone3", "fork", "vfork"),
+}
+
+# ─────────────────────────────────── campaign ────────────────────────────────
+POSCAR = """FeO rocksalt (load test)
+1.0
+   4.2800000000   0.0000000000   0.0000000000
+   0.0000000000   4.2800000000   0.0000000000
+   0.0000000000   0.0000000000   4.2800000000
+   Fe   O
+   4   4
+Direct
+   0.0 0.0 0.0
+   0.0 0.5 0.5
+   0.5 0.0 0.5
+   0.5 0.5 0.0
+   0.5 0.5 0.5
+   0.5 0.0 0.0
+   0.0 0.5 0.0
+   0.0 0.0 0.5
+"""
+
+INCAR = """SYSTEM = FeO load test
+ENCUT = 520
+ISMEAR = 0; SIGMA = 0.05
+ISPIN = 2
+MAGMOM = 4*4.0 4*0.0
+EDIFF = 1E-6
+"""
+
+
+def grid_ranges(ndirs):
+    """x and z ranges (start:stop:step) whose product gives about ndirs directories."""
+    nx = max(1, math.isqrt(ndirs))
+    nz = max(1, math.ceil(ndirs / nx))
+
+    def rng(n):
+        if n == 1:
+            return "1.0:1.0:1.0"
+        step = 0.2 / (n - 1)
+        return f"0.9:1.1:{step:.10g}"
+    return rng(nx), rng(nz), nx, nz
+
+
+def stage_commands(args, nz):
+    """Shell command and stdin of every stage (run in the campaign directory)."""
+    x_range, z_range, _, _ = grid_ranges(args.dirs)
+    chain_answers = f"2\\n0\\n{nz - 1}\\n1\\n16\\nnormal\\n01:00:00\\ny\\ny\\n\\n"
+    return {
+        "setup": (f"bash ~/scripts/structure/editor/setup_varied_scale_factors.sh -x {x_range} -z {z_range}", ""),
+        "jobscripts": ("for d in scale_*/; do (cd \"$d\" && printf '" + chain_answers + "' "
+                       "| bash ~/scripts/jobs/write_chain_vasp_jobscript.sh && "
+                       "mv chain_vasp_jobscript.sh jobscript) || exit 1; done", ""),
+        "submit": ("bash ~/scripts/jobs/submit_multiple.sh", "YES\n"),
+        "run": (f"python3 {SIMULATOR / 'fake_slurm.py'} drain --max-running {args.max_running}", ""),
+        "follow_up": ("i=0; for d in scale_*/; do i=$((i+1)); cp INCAR \"$d\"; "
+                      "printf '%s\\nfollow\\nY\\nn\\ny\\n\\n' $i "
+                      "| bash ~/scripts/util/batch_calcs/follow_up_calculations.sh || exit 1; done", ""),
+    }
+
+# ─────────────────────────────────── counters ────────────────────────────────
+def proc_io():
+    out = {}
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                k, v = line.split(":")
+                out[k] = int(v)
+    except OSError:
+        pass
+    return out
+
+
+def forks_total():
+    try:
+        with open("/proc/stat") as f:
+            for line in f:
+                if line.startswith("processes "):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def free_inodes(path):
+    st = os.statvfs(path)
+    return st.f_ffree if st.f_files else None
+
+
+def snapshot(path):
+    ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {"t": time.perf_counter(), "cpu": ru.ru_utime + ru.ru_stime, "forks": forks_total(),
+            "inodes": free_inodes(path), **proc_io()}
+
+
+def strace_counts(path):
+    """Parse `strace -c` output into {syscall: calls}."""
+    counts = {}
+    for line in Path(path).read_text().splitlines():
+        parts = line.split()
+        if len(parts) >= 5 and parts[0][0].isdigit() and not parts[-1].startswith("total"):
+            try:
+                counts[parts[-1]] = int(parts[3])
+            except ValueError:
+                continue
+    return counts
+
+# ─────────────────────────────────── driver ──────────────────────────────────
+def sandbox(work):
+    """HOME with scripts → this checkout, shims on PATH, private event log and queue."""
+    home = work / "home"
+    home.mkdir(parents=True, exist_ok=True)
+    link = home / "scripts"
+    if not link.exists():
+        link.symlink_to(SCRIPTS)
+    write_shims(work / "bin")
+    env = dict(os.environ, HOME=str(home), PATH=f"{work / 'bin'}:{os.environ.get('PATH', '')}",
+               VASP_EVENTS=str(work / "events.jsonl"), FAKE_SLURM_DIR=str(work / "slurm"),
+               FAKE_SBATCH="queue")
+    env.pop("SLURM_JOB_ID", None)
+    return env
+
+
+def run_stage(name, cmd, stdin, cwd, env, logs, use_strace):
+    trace = logs / f"{name}.strace"
+    argv = ["bash", "-c", cmd]
+    if use_strace:
+        argv = ["strace", "-f", "-c", "-qq", "-o", str(trace), *argv]
+    before = snapshot(cwd)
+    with open(logs / f"{name}.log", "w") as log:
+        rc = subprocess.run(argv, cwd=cwd, env=env, input=stdin, text=True,
+                            stdout=log, stderr=subprocess.STDOUT).returncode
+    after = snapshot(cwd)
+    rec = {"stage": name, "status": rc, "wall": after["t"] - before["t"],
+           "cpu": after["cpu"] - before["cpu"], "procs": after["forks"] - before["forks"]}
+    for k in ("syscr", "syscw", "rchar", "wchar"):
+        rec[k] = after.get(k, 0) - before.get(k, 0)
+    rec["inodes"] = (before["inodes"] - after["inodes"]) if before["inodes"] is not None else None
+    if use_strace and trace.exists():
+        calls = strace_counts(trace)
+        for group, names in FS_CALLS.items():
+            rec[group] = sum(calls.get(n, 0) for n in names)
+    return rec
+
+
+def human(n):
+    for unit in ("B", "K", "M", "G", "T"):
+        if abs(n) < 1024 or unit == "T":
+            return f"{n:.1f}{unit}"
+        n /= 1024
+
+
+def print_table(records, ndirs, use_strace):
+    head = f"{'Stage':<11}{'rc':>3}{'wall':>9}{'cpu':>9}{'procs':>8}{'rd calls':>10}{'wr calls':>10}" \
+           f"{'read':>9}{'written':>9}{'inodes':>8}{'ms/dir':>8}"
+    if use_strace:
+        head += "".join(f"{g:>9}" for g in FS_CALLS)
+    print(head)
+    for r in records:
+        inodes = "n/a" if r["inodes"] is None else str(r["inodes"])
+        line = (f"{r['stage']:<11}{r['status']:>3}{r['wall']:>8.1f}s{r['cpu']:>8.1f}s{r['procs']:>8}"
+                f"{r['syscr']:>10}{r['syscw']:>10}{human(r['rchar']):>9}{human(r['wchar']):>9}"
+                f"{inodes:>8}{1000 * r['wall'] / max(ndirs, 1):>8.2f}")
+        if use_strace:
+            line += "".join(f"{r.get(g, 0):>9}" for g in FS_CALLS)
+        print(line)
+
+
+def write_tsv(path, records):
+    cols = ["stage", "status", "wall", "cpu", "procs", "syscr", "syscw", "rchar", "wchar", "inodes",
+            *FS_CALLS]
+    with open(path, "w") as f:
+        f.write("\t".join(cols) + "\n")
+        for r in records:
+            f.write("\t".join("" if r.get(c) is None else (f"{r[c]:.3f}" if isinstance(r[c], float)
+                                                           else str(r[c])) for c in cols) + "\n")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--dirs", type=int, default=10_000, help="number of calculation directories (default 10000)")
+    ap.add_argument("--work", help="work directory (default ./load_test_<dirs>)")
+    ap.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    ap.add_argument("--max-running", type=int, default=os.cpu_count() or 4, help="concurrent fake jobs")
+    ap.add_argument("--vasp-seconds", type=float, default=0.0, help="modelled run time per fake VASP call")
+    ap.add_argument("--strace", action="store_true", help="count file-system calls with strace -f -c")
+    ap.add_argument("--fresh", action="store_true", help="delete WORK first")
+    args = ap.parse_args()
+
+    if args.strace and shutil.which("strace") is None:
+        print("❌ --strace needs strace on PATH")
+        sys.exit(1)
+    work = Path(args.work or f"load_test_{args.dirs}").resolve()
+    if args.fresh and work.exists():
+        shutil.rmtree(work)
+    campaign, logs = work / "campaign", work / "logs"
+    if "setup" in args.stages and campaign.exists():
+        print(f"❌ {campaign} exists; use --fresh or leave out the setup stage")
+        sys.exit(1)
+    campaign.mkdir(parents=True, exist_ok=True)
+    logs.mkdir(exist_ok=True)
+    if "setup" in args.stages:
+        (campaign / "POSCAR").write_text(POSCAR)
+        (campaign / "POTCAR").write_text("  PAW_PBE Fe 06Sep2000\n  PAW_PBE O 08Apr2002\n")
+        (campaign / "INCAR").write_text(INCAR)
+
+    env = sandbox(work)
+    env["FAKE_VASP_SECONDS"] = str(args.vasp_seconds)
+    env["FAKE_VASP_V0"] = env.get("FAKE_VASP_V0", "9.8")
+    _, _, nx, nz = grid_ranges(args.dirs)
+    commands = stage_commands(args, nz)
+    print(f"📋 {nx} × {nz} = {nx * nz} directories in {campaign}")
+
+    records = []
+    for name in STAGES:
+        if name not in args.stages:
+            continue
+        cmd, stdin = commands[name]
+        print(f"▶ {name} ...", flush=True)
+        rec = run_stage(name, cmd, stdin, campaign, env, logs, args.strace)
+        records.append(rec)
+        if rec["status"] != 0:
+            print(f"❌ {name} exited with {rec['status']} (see {logs / (name + '.log')})")
+            break
+
+    print()
+    print_table(records, nx * nz, args.strace)
+    write_tsv(work / "load_test.tsv", records)
+    print(f"\n✅ Results: {work / 'load_test.tsv'}")
+    if (work / "events.jsonl").exists():
+        print()
+        subprocess.run([sys.executable, str(SCRIPTS / "util" / "events.py"), "report",
+                        str(work / "events.jsonl")])
+    sys.exit(1 if any(r["status"] for r in records) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+calc_catalog.py
+Persistent SQLite index of every calculation directory below a project root.
+
+A calculation directory is any directory holding an INCAR or OUTCAR next to a
+POSCAR.  For each one the catalog stores its path, FUNC/CALC labels (the two
+parent directory names, as parse_data.sh uses them), scale factors parsed from
+POSCAR_scaled_X_Y_Z / scale_X/POSCAR_z_Z names, lattice lengths and c/a, a hash
+of the inputs, the run status and the harvested final energy.
+
+Re-scanning is incremental: the tree is walked with scandir (no stat per
+entry) and only directories whose OUTCAR, CONTCAR or one of the hashed inputs
+(INCAR, KPOINTS, POSCAR, POTCAR) changed since the last scan are re-read.
+
+Other tools select their calculations here instead of walking the tree:
+open_covering() rescans the catalog that covers a directory and select()
+filters it (collect_calcs.py, spawn_follow_ups.py, follow_up_calculations.sh
+through 'query --scan').
+
+Usage
+-----
+calc_catalog.py scan  [ROOT] [--db PATH] [--full]
+calc_catalog.py query [--func F] [--calc C] [--status S] [--kind relax|static]
+                      [--ca MIN MAX] [--sx MIN MAX] [--sy MIN MAX] [--sz MIN MAX]
+                      [--under DIR] [--label NAME] [--scan] [--table] [-0]
+
+Example: all converged PBE relaxations with c/a in 1.0–1.05
+    calc_catalog.py query --func PBE --kind relax --status converged --ca 1.0 1.05
+
+The database defaults to ROOT/.calc_catalog.sqlite; query looks for it in the
+current directory and its parents (--scan rescans it first, creating one in
+the current directory if there is none).  --under takes a directory path.
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from vasp_io import read_poscar, read_outcar_energy, outcar_finished  # noqa: E402
+
+DB_NAME = ".calc_catalog.sqlite"
+INPUTS = ("INCAR", "KPOINTS", "POSCAR", "POTCAR")
+WATCHED = ("OUTCAR", "CONTCAR") + INPUTS                # everything harvest() reads
+SKIP_DIRS = {"relaxation_outputs", "vasprun", ".git", "__pycache__", ".input_store"}
+COLLECTED = ".collect_manifest.tsv"     # marks a collect_calcs.py copy, not live calculations
+
+SCALED_PAT = re.compile(r"POSCAR_scaled_([\d\.]+)_([\d\.]+)_([\d\.]+)$")
+Z_PAT = re.compile(r"POSCAR_z_([\d\.]+)$")
+SCALE_PAT = re.compile(r"scale_([\d\.]+)$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS calcs (
+    path        TEXT PRIMARY KEY,
+    func        TEXT,
+    calc        TEXT,
+    label       TEXT,
+    sx REAL, sy REAL, sz REAL,
+    a REAL, b REAL, c REAL, ca REAL,
+    volume      REAL,
+    natoms      INTEGER,
+    formula     TEXT,
+    kind        TEXT,
+    input_hash  TEXT,
+    status      TEXT,
+    energy      REAL,
+    outcar_size INTEGER,
+    sig         TEXT,
+    scanned_at  REAL
+);
+CREATE INDEX IF NOT EXISTS idx_func_calc ON calcs(func, calc, status);
+CREATE INDEX IF NOT EXISTS idx_status    ON calcs(status, kind);
+CREATE INDEX IF NOT EXISTS idx_ca        ON calcs(ca);
+CREATE INDEX IF NOT EXISTS idx_scale     ON calcs(sx, sy, sz);
+"""
+COLUMNS = ["path", "func", "calc", "label", "sx", "sy", "sz", "a", "b", "c", "ca",
+           "volume", "natoms", "formula", "kind", "input_hash", "status", "energy",
+           "outcar_size", "sig", "scanned_at"]
+
+# ─────────────────────────────────── helpers ─────────────────────────────────
+def open_catalog(db):
+    conn = sqlite3.connect(db)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def find_catalog(start="."):
+    """Return the nearest DB_NAME in START or its parents, or None."""
+    p = Path(start).resolve()
+    for d in [p, *p.parents]:
+        if (d / DB_NAME).is_file():
+            return d / DB_NAME
+    return None
+
+
+def incar_tags(path):
+    """Minimal KEY = VALUE reader (comments and ';' separated tags)."""
+    tags = {}
+    try:
+        text = Path(path).read_text(errors="replace")
+    except OSError:
+        return tags
+    for line in text.splitlines():
+        line = re.split(r"[#!]", line, 1)[0]
+        for part in line.split(";"):
+            if "=" in part:
+                k, v = part.split("=", 1)
+                tags[k.strip().upper()] = v.strip()
+    return tags
+
+
+def scale_factors(parts):
+    """Return (label, sx, sy, sz) from the path components of a calculation."""
+    label = parts[-1] if parts else ""
+    m = SCALED_PAT.search(label)
+    if m:
+        return (label, *map(float, m.groups()))
+    m = Z_PAT.search(label)
+    if m:
+        parent = SCALE_PAT.search(parts[-2]) if len(parts) > 1 else None
+        s = float(parent.group(1)) if parent else None
+        return label, s, s, float(m.group(1))
+    return label, None, None, None
+
+
+def _contains(path, needle):
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm.rfind(needle) >= 0
+    except OSError:
+        return False
+
+
+def calc_status(d, kind):
+    outcar = os.path.join(d, "OUTCAR")
+    if not os.path.isfile(outcar):
+        return "pending"
+    if not outcar_finished(outcar):
+        return "incomplete"
+    needle = b"reached required accuracy" if kind == "relax" else b"EDIFF is reached"
+    return "converged" if _contains(outcar, needle) else "unconverged"
+
+
+def input_hash(d):
+    h = hashlib.sha1()
+    for name in INPUTS:
+        p = os.path.join(d, name)
+        h.update(name.encode())
+        try:
+            with open(p, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+        except OSError:
+            h.update(b"-")
+    return h.hexdigest()
+
+# ─────────────────────────────────── scanning ────────────────────────────────
+def walk_calcs(root):
+    """Yield (directory, file names) for every calculation directory below ROOT.
+
+    Trees collected by collect_calcs.py (holding its manifest) are not entered.
+    """
+    stack = [root]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        files = {e.name for e in entries if e.is_file()}
+        if COLLECTED in files:
+            continue
+        if "POSCAR" in files and ("INCAR" in files or "OUTCAR" in files):
+            yield d, files
+        stack.extend(e.path for e in entries
+                     if e.is_dir(follow_symlinks=False) and e.name not in SKIP_DIRS)
+
+
+def signature(d, files):
+    sig = []
+    for name in WATCHED:
+        if name in files:
+            st = os.stat(os.path.join(d, name))
+            sig.append(f"{st.st_size}:{st.st_mtime_ns}")
+        else:
+            sig.append("-")
+    return "|".join(sig)
+
+
+def harvest(root, d, files, sig):
+    rel = os.path.relpath(d, root)
+    parts = Path(rel).parts
+    label, sx, sy, sz = scale_factors(parts)
+    tags = incar_tags(os.path.join(d, "INCAR"))
+    nsw = int(re.sub(r"[^\d-]", "", tags.get("NSW", "0")) or 0)
+    kind = "relax" if nsw > 0 and tags.get("IBRION", "").strip() not in ("-1",) else "static"
+    status = calc_status(d, kind)
+
+    row = dict.fromkeys(COLUMNS)
+    row.update(path=rel, label=label, sx=sx, sy=sy, sz=sz, kind=kind, status=status,
+               func=parts[-3] if len(parts) >= 3 else None,
+               calc=parts[-2] if len(parts) >= 2 else None,
+               input_hash=input_hash(d), sig=sig, scanned_at=time.time())
+
+    struct = "CONTCAR" if kind == "relax" and status == "converged" and "CONTCAR" in files else "POSCAR"
+    try:
+        p = read_poscar(os.path.join(d, struct))
+        a, b, c = (float(x) for x in (p.lattice ** 2).sum(1) ** 0.5)
+        row.update(a=a, b=b, c=c, ca=c / a, volume=float(p.volume), natoms=p.natoms,
+                   formula="".join(f"{s}{n}" for s, n in zip(p.symbols, p.counts)))
+    except (OSError, ValueError, IndexError) as e:
+        print(f"⚠️  {rel}/{struct}: {e}", file=sys.stderr)
+
+    if "OUTCAR" in files:
+        row["outcar_size"] = os.path.getsize(os.path.join(d, "OUTCAR"))
+        if status in ("converged", "unconverged"):
+            row["energy"] = read_outcar_energy(os.path.join(d, "OUTCAR"))
+    return row
+
+
+def scan(root, db, full=False):
+    """Bring the catalog up to date with ROOT; return (added/updated, unchanged, removed)."""
+    root = os.path.abspath(root)
+    conn = open_catalog(db)
+    known = {r["path"]: r["sig"] for r in conn.execute("SELECT path, sig FROM calcs")}
+    seen, changed, same = set(), [], 0
+
+    for d, files in walk_calcs(root):
+        rel = os.path.relpath(d, root)
+        seen.add(rel)
+        sig = signature(d, files)
+        if not full and known.get(rel) == sig:
+            same += 1
+            continue
+        changed.append(harvest(root, d, files, sig))
+
+    gone = [p for p in known if p not in seen]
+    with conn:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO calcs ({','.join(COLUMNS)}) "
+            f"VALUES ({','.join('?' * len(COLUMNS))})",
+            [[r[c] for c in COLUMNS] for r in changed])
+        conn.executemany("DELETE FROM calcs WHERE path = ?", [(p,) for p in gone])
+    conn.close()
+    return len(changed), same, len(gone)
+
+
+def open_covering(root="."):
+    """(connection, catalog root) of the catalog covering ROOT after an incremental rescan.
+
+    The nearest catalog in ROOT or its parents is used; without one a new
+    catalog is created in ROOT.
+    """
+    db = find_catalog(root) or Path(root).resolve() / DB_NAME
+    scan(db.parent, db)
+    return open_catalog(db), db.parent
+
+# ─────────────────────────────────── querying ────────────────────────────────
+def select(conn, func=None, calc=None, status=None, kind=None, under=None, label=None,
+           **ranges):
+    """Return catalog rows matching the filters.
+
+    UNDER is a path relative to the catalog root, LABEL the name of the
+    calculation directory; ranges maps a numeric column (ca, sx, sy, sz, a, b, c, energy) to (min, max).
+    """
+    where, args = [], []
+    for col, val in (("func", func), ("calc", calc), ("status", status), ("kind", kind),
+                     ("label", label)):
+        if val is not None:
+            where.append(f"{col} = ?"); args.append(val)
+    if under and under != ".":
+        prefix = under.rstrip("/") + "/"          # exact: LIKE treats _ as a wildcard
+        where.append("(path = ? OR substr(path, 1, length(?)) = ?)")
+        args += [under.rstrip("/"), prefix, prefix]
+    for col, rng in ranges.items():
+        if rng is None:
+            continue
+        if col not in COLUMNS:
+            raise ValueError(f"unknown column {col}")
+        where.append(f"{col} BETWEEN ? AND ?"); args += list(rng)
+    sql = "SELECT * FROM calcs"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return conn.execute(sql + " ORDER BY path", args).fetchall()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("scan")
+    p.add_argument("root", nargs="?", default=".")
+    p.add_argument("--db")
+    p.add_argument("--full", action="store_true", help="re-harvest every directory")
+    p = sub.add_parser("query")
+    p.add_argument("--db")
+    for opt in ("func", "calc", "status", "kind", "under", "label"):
+        p.add_argument(f"--{opt}")
+    p.add_argument("--scan", action="store_true", help="rescan the catalog incrementally first")
+    for col in ("ca", "sx", "sy", "sz", "energy"):
+        p.add_argument(f"--{col}", type=float, nargs=2, metavar=("MIN", "MAX"))
+    p.add_argument("--table", action="store_true")
+    p.add_argument("-0", dest="null", action="store_true", help="NUL-separated paths")
+    args = ap.parse_args()
+
+    if args.cmd == "scan":
+        db = args.db or os.path.join(args.root, DB_NAME)
+        t0 = time.perf_counter()
+        n_new, n_same, n_gone = scan(args.root, db, args.full)
+        print(f"✅ Catalog {db}: {n_new} updated, {n_same} unchanged, "
+              f"{n_gone} removed ({time.perf_counter() - t0:.2f} s)")
+        return
+
+    if args.scan and not args.db:
+        conn, root = open_covering()
+    else:
+        db = args.db or find_catalog()
+        if db is None:
+            print(f"❌ No {DB_NAME} found; run 'calc_catalog.py scan' first", file=sys.stderr)
+            sys.exit(1)
+        if args.scan:
+            scan(Path(db).parent, db)
+        conn, root = open_catalog(db), Path(db).parent
+    under = os.path.relpath(os.path.abspath(args.under), root) if args.under else None
+    rows = select(conn, args.func, args.calc, args.status, args.kind, under, args.label,
+                  ca=args.ca, sx=args.sx, sy=args.sy, sz=args.sz, energy=args.energy)
+    if args.table:
+        cols = ["path", "func", "calc", "kind", "status", "sx", "sy", "sz", "ca", "energy"]
+        print("\t".join(cols))
+        for r in rows:
+            print("\t".join("NA" if r[c] is None else
+                            f"{r[c]:.6g}" if isinstance(r[c], float) else str(r[c])
+                            for c in cols))
+    else:
+        end = "\0" if args.null else "\n"
+        for r in rows:
+            sys.stdout.write(str(root / r["path"]) + end)
+    sys.exit(0 if rows else 1)
+
+
+if __name__ == "__main__":
+    main()
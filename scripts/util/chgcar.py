@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+chgcar.py
+Volumetric files (CHGCAR, CHG) on a memory map, and re-gridding of a
+charge density onto a strained cell as a seed CHGCAR for ICHARG = 1.
+
+VASP stores ρ·V on a grid of fractional coordinates, so under a homogeneous
+strain the stored values carry over point for point; only the header (the
+new lattice and positions) changes.  When the target FFT grid differs the
+values are interpolated on the fractional grid, and every block is scaled
+so it integrates to the right total: the electron count (source value or
+--nelect) for the charge, the source moment for magnetization blocks.
+
+The default trilinear method streams the file: it holds two z-planes of the
+source and writes the result through a temporary memmap, so grids larger
+than memory work.  --method fourier (band-limited, exact for smooth
+densities) loads one block at a time.
+
+Usage
+-----
+chgcar.py info   CHGCAR
+chgcar.py regrid CHGCAR POSCAR [-o CHGCAR] [--grid NX NY NZ] [--method linear|fourier]
+                 [--nelect N]
+
+POSCAR is the structure of the new cell (same atoms in the same order).
+Augmentation occupancies and the per-atom lines of spin-polarised files are
+copied unchanged.
+"""
+import argparse
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from vasp_io import Poscar, parse_poscar_lines, read_poscar, format_poscar  # noqa: E402
+
+CHUNK = 1 << 24                   # bytes scanned/parsed per step
+WRITE_VALUES = 5 * 200_000        # values formatted per write
+
+# ─────────────────────────────────── layout ──────────────────────────────────
+@dataclass
+class Block:
+    """One grid of values: total charge, or a magnetization component."""
+    grid: tuple                   # (NX, NY, NZ)
+    start: int                    # byte offset of the first value
+    end: int                      # byte offset just past the values
+    tail: bytes = b""             # augmentation / per-atom lines up to the next grid line
+
+    @property
+    def size(self):
+        return self.grid[0] * self.grid[1] * self.grid[2]
+
+
+@dataclass
+class Volumetric:
+    path: Path
+    poscar: Poscar
+    blocks: list = field(default_factory=list)
+
+
+def skip_lines(mm, pos, n):
+    """Offset just past the N-th newline from POS (end of file if fewer)."""
+    while n > 0:
+        chunk = mm[pos:pos + CHUNK]
+        if not chunk:
+            return pos
+        c = chunk.count(b"\n")
+        if c < n:
+            n -= c
+            pos += len(chunk)
+            continue
+        idx = -1
+        for _ in range(n):
+            idx = chunk.find(b"\n", idx + 1)
+        return pos + idx + 1
+    return pos
+
+
+def read_line(mm, pos):
+    """(line bytes, offset of the next line)."""
+    end = mm.find(b"\n", pos)
+    end = len(mm) if end < 0 else end + 1
+    return mm[pos:end], end
+
+
+def grid_of(line):
+    parts = line.split()
+    if len(parts) == 3 and all(p.isdigit() for p in parts):
+        return tuple(int(p) for p in parts)
+    return None
+
+
+def scan(path, mm):
+    """Locate the header, grid blocks and the text between them."""
+    head = mm[:1 << 20].decode(errors="replace").splitlines()
+    poscar, used = parse_poscar_lines(head)
+    pos = skip_lines(mm, 0, used)
+    vol = Volumetric(Path(path), poscar)
+
+    grid = None
+    while pos < len(mm):                                   # blank line(s), then the grid
+        line, nxt = read_line(mm, pos)
+        pos = nxt
+        grid = grid_of(line)
+        if grid:
+            break
+    while grid:
+        first, _ = read_line(mm, pos)
+        per_line = len(first.split())
+        if per_line == 0:
+            raise ValueError(f"{path}: no values after grid line {grid}")
+        n = grid[0] * grid[1] * grid[2]
+        end = skip_lines(mm, pos, -(-n // per_line))
+        block = Block(grid, pos, end)
+        vol.blocks.append(block)
+        # text up to the next grid line (augmentation occupancies, moments)
+        pos, tail, grid = end, [], None
+        while pos < len(mm):
+            line, nxt = read_line(mm, pos)
+            g = grid_of(line)
+            if g and g == block.grid:
+                grid, pos = g, nxt
+                break
+            tail.append(line)
+            pos = nxt
+        block.tail = b"".join(tail)
+    if not vol.blocks:
+        raise ValueError(f"{path}: no grid found")
+    return vol
+
+
+def open_volumetric(path):
+    """Return (Volumetric, mmap, file); close both when done."""
+    f = open(path, "rb")
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        f.close()
+        raise ValueError(f"{path}: empty file")
+    return scan(path, mm), mm, f
+
+# ─────────────────────────────────── values ──────────────────────────────────
+def iter_values(mm, block):
+    """Yield the values of BLOCK as float arrays, CHUNK bytes at a time."""
+    pos, total = block.start, 0
+    while pos < block.end:
+        stop = min(block.end, pos + CHUNK)
+        if stop < block.end:
+            stop = mm.rfind(b"\n", pos, stop) + 1 or stop
+        vals = np.array(mm[pos:stop].split(), dtype=np.float64)
+        total += vals.size
+        yield vals
+        pos = stop
+    if total != block.size:
+        raise ValueError(f"block {block.grid}: {total} values, expected {block.size}")
+
+
+def iter_planes(mm, block):
+    """Yield the z-planes of BLOCK as (NY, NX) arrays (x runs fastest in the file)."""
+    nx, ny, _ = block.grid
+    size = nx * ny
+    buf = np.empty(0)
+    for vals in iter_values(mm, block):
+        buf = np.concatenate([buf, vals]) if buf.size else vals
+        k = buf.size // size
+        for z in range(k):
+            yield buf[z * size:(z + 1) * size].reshape(ny, nx)
+        buf = buf[k * size:]
+
+
+def block_sum(mm, block):
+    return sum(float(v.sum()) for v in iter_values(mm, block))
+
+# ─────────────────────────────────── interpolation ───────────────────────────
+def weights(n_src, n_dst):
+    """Indices and weights of linear interpolation from n_src to n_dst periodic points."""
+    s = np.arange(n_dst) * (n_src / n_dst)
+    i0 = np.floor(s).astype(int)
+    w = s - i0
+    return i0 % n_src, (i0 + 1) % n_src, w
+
+
+def bilinear(plane, nx, ny):
+    ny0, nx0 = plane.shape
+    if (nx0, ny0) == (nx, ny):
+        return plane
+    i0, i1, wx = weights(nx0, nx)
+    j0, j1, wy = weights(ny0, ny)
+    rows = plane[:, i0] * (1 - wx) + plane[:, i1] * wx
+    return rows[j0] * (1 - wy)[:, None] + rows[j1] * wy[:, None]
+
+
+def linear_planes(mm, block, grid):
+    """Yield the target z-planes of BLOCK on GRID (trilinear, two source planes in memory)."""
+    nx, ny, nz = grid
+    nz0 = block.grid[2]
+    k0s, k1s, wz = weights(nz0, nz)
+    src = iter_planes(mm, block)
+    cache, loaded = {}, -1
+
+    def plane(k):
+        nonlocal loaded
+        while loaded < k:
+            loaded += 1
+            cache[loaded] = bilinear(next(src), nx, ny)
+        return cache[k]
+
+    for k0, k1, w in zip(k0s, k1s, wz):
+        a = plane(k0)
+        if k1 == 0:                                          # periodic wrap: plane 0 kept
+            b = cache[0]
+        else:
+            b = plane(k1)
+        yield a if w == 0 else a * (1 - w) + b * w
+        for k in [k for k in cache if 0 < k < k0]:
+            del cache[k]
+
+
+def fourier_block(mm, block, grid):
+    """Whole BLOCK resampled on GRID by zero-padding/truncating its Fourier series."""
+    nx0, ny0, nz0 = block.grid
+    data = np.concatenate(list(iter_values(mm, block))).reshape(nz0, ny0, nx0)
+    src = np.fft.fftshift(np.fft.fftn(data))
+    dst_shape = (grid[2], grid[1], grid[0])
+    out = np.zeros(dst_shape, dtype=complex)
+    sl_src, sl_dst = [], []
+    for n0, n1 in zip(data.shape, dst_shape):
+        m = min(n0, n1)
+        c0, c1 = n0 // 2 - m // 2, n1 // 2 - m // 2
+        sl_src.append(slice(c0, c0 + m))
+        sl_dst.append(slice(c1, c1 + m))
+    out[tuple(sl_dst)] = src[tuple(sl_src)]
+    res = np.fft.ifftn(np.fft.ifftshift(out)).real * (out.size / data.size)
+    for z in range(dst_shape[0]):
+        yield res[z]
+
+# ─────────────────────────────────── writing ─────────────────────────────────
+def format_values(vals):
+    """VASP-style lines of five values (the last line may be shorter)."""
+    full = vals.size // 5 * 5
+    fmt = " %17.11E" * 5
+    lines = [fmt % tuple(r) for r in vals[:full].reshape(-1, 5)]
+    if full < vals.size:
+        lines.append("".join(f" {v:17.11E}" for v in vals[full:]))
+    return "\n".join(lines) + "\n"
+
+
+def regrid(src, poscar_path, out, grid=None, method="linear", nelect=None):
+    """Write the density of SRC on the cell of POSCAR_PATH to OUT; return a summary."""
+    target = read_poscar(poscar_path)
+    vol, mm, f = open_volumetric(src)
+    try:
+        p = vol.poscar
+        if list(p.counts) != list(target.counts):
+            raise ValueError(f"atom counts differ: {p.counts} (CHGCAR) vs {target.counts} (POSCAR)")
+        grid = tuple(grid) if grid else vol.blocks[0].grid
+        same_cell = np.allclose(p.lattice, target.lattice, atol=1e-8) and np.allclose(
+            p.frac, target.frac, atol=1e-8)
+        if same_cell and grid == vol.blocks[0].grid and nelect is None:
+            if Path(src).resolve() != Path(out).resolve():
+                shutil.copyfile(src, out)
+            return "identical cell and grid, copied"
+
+        header = Poscar(p.comment or target.comment, target.lattice, list(target.symbols),
+                        list(target.counts), target.frac)
+        n_dst = grid[0] * grid[1] * grid[2]
+        out = Path(out)
+        tmp_out = out.with_name(f".{out.name}.tmp")
+        notes = []
+        with tempfile.TemporaryDirectory(dir=out.parent) as tmpdir, open(tmp_out, "w") as w:
+            w.write(format_poscar(header) + "\n")
+            for b, block in enumerate(vol.blocks):
+                n_src = block.size
+                stage = np.memmap(Path(tmpdir) / f"block{b}.f8", dtype=np.float64, mode="w+",
+                                  shape=(n_dst,))
+                planes = (fourier_block if method == "fourier" else linear_planes)(mm, block, grid)
+                plane_size = grid[0] * grid[1]
+                src_total = block_sum(mm, block) / n_src
+                dst_sum = 0.0
+                for z, pl in enumerate(planes):
+                    stage[z * plane_size:(z + 1) * plane_size] = pl.ravel()
+                    dst_sum += float(pl.sum())
+                dst_total = dst_sum / n_dst
+                want = nelect if (b == 0 and nelect is not None) else src_total
+                scale = want / dst_total if abs(dst_total) > 1e-12 else 1.0
+                notes.append(f"block {b}: {src_total:.4f} → {want:.4f} (×{scale:.6f})")
+
+                w.write(f"{grid[0]:5d}{grid[1]:5d}{grid[2]:5d}\n")
+                for i in range(0, n_dst, WRITE_VALUES):
+                    w.write(format_values(np.asarray(stage[i:i + WRITE_VALUES]) * scale))
+                w.write(block.tail.decode(errors="replace"))
+                del stage
+        os.replace(tmp_out, out)
+        return f"{vol.blocks[0].grid} → {grid}, " + "; ".join(notes)
+    finally:
+        mm.close()
+        f.close()
+
+# ─────────────────────────────────── CLI ─────────────────────────────────────
+def info(path):
+    vol, mm, f = open_volumetric(path)
+    try:
+        p = vol.poscar
+        print(f"📋 {path}: {' '.join(f'{s}{c}' for s, c in zip(p.symbols, p.counts))}, "
+              f"V = {p.volume:.3f} Å³, {len(vol.blocks)} block(s)")
+        names = ["charge", "magnetization", "magnetization y", "magnetization z"]
+        for i, b in enumerate(vol.blocks):
+            total = block_sum(mm, b) / b.size
+            label = names[i] if len(vol.blocks) in (1, 2, 4) and i < 4 else f"block {i}"
+            if len(vol.blocks) == 4 and i == 1:
+                label = "magnetization x"
+            print(f"  {label:<16} grid {b.grid[0]}×{b.grid[1]}×{b.grid[2]}  integral {total:12.5f}"
+                  f"  (+{len(b.tail)} B augmentation)")
+    finally:
+        mm.close()
+        f.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("info", help="grid, blocks and integrals")
+    p.add_argument("file")
+    p = sub.add_parser("regrid", help="seed CHGCAR for a new cell")
+    p.add_argument("file")
+    p.add_argument("poscar", help="structure of the new cell")
+    p.add_argument("-o", "--output", default="CHGCAR")
+    p.add_argument("--grid", nargs=3, type=int, metavar=("NX", "NY", "NZ"),
+                   help="target FFT grid (default: the source grid)")
+    p.add_argument("--method", choices=("linear", "fourier"), default="linear")
+    p.add_argument("--nelect", type=float, help="electron count of the new cell (default: as the source)")
+    args = ap.parse_args()
+
+    try:
+        if args.cmd == "info":
+            info(args.file)
+        else:
+            msg = regrid(args.file, args.poscar, args.output, args.grid, args.method, args.nelect)
+            print(f"✅ {args.output}: {msg}")
+    except (OSError, ValueError, IndexError, StopIteration) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
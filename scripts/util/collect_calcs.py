@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+collect_calcs.py
+Incrementally copy finished calculations named NAME into ./NAME, keeping
+their relative paths (the engine behind collect_calcs.sh).
+
+The calculations are selected from the calculation catalog (calc_catalog.py,
+rescanned incrementally first): every directory called NAME with a POSCAR and
+a finished OUTCAR.
+
+A manifest (NAME/.collect_manifest.tsv) records every copied file with its
+size, mtime and SHA-256, plus the OUTCAR size/mtime of each calculation.
+Whether an OUTCAR finished comes from the catalog, which only re-reads
+OUTCARs whose size or mtime changed since its last scan.  A calculation
+whose OUTCAR is unchanged is skipped without listing its files (--verify
+lists them anyway, to catch other files changed afterwards); for the rest
+only files whose size or mtime changed are copied, by a bounded pool of copy
+workers.  Symlinks are recreated as symlinks.
+
+Usage
+-----
+collect_calcs.py NAME [--jobs 8] [--dry-run] [--verify]
+
+Excluded files: CHG, CHGCAR, WAVECAR
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import calc_catalog  # noqa: E402
+from events import stage  # noqa: E402
+
+MANIFEST = calc_catalog.COLLECTED
+EXCLUDE = {"CHG", "CHGCAR", "WAVECAR"}
+CALC_KEY = "@OUTCAR"
+
+# ─────────────────────────────────── manifest ────────────────────────────────
+def read_manifest(dest):
+    """Return {relative path: (size, mtime_ns, sha256)}."""
+    out = {}
+    mf = dest / MANIFEST
+    if mf.is_file():
+        for line in mf.read_text().splitlines():
+            if line.startswith("#") or not line.strip():
+                continue
+            path, size, mtime, digest = line.split("\t")
+            out[path] = (int(size), int(mtime), digest)
+    return out
+
+
+def write_manifest(dest, entries):
+    tmp = dest / (MANIFEST + ".tmp")
+    with open(tmp, "w") as f:
+        f.write("# path\tsize\tmtime_ns\tsha256\n")
+        for path in sorted(entries):
+            size, mtime, digest = entries[path]
+            f.write(f"{path}\t{size}\t{mtime}\t{digest}\n")
+    os.replace(tmp, dest / MANIFEST)
+
+# ─────────────────────────────────── discovery ───────────────────────────────
+def find_calcs(root, name):
+    """[(directory, finished)] of the catalogued calculations called NAME below ROOT.
+
+    Copies already collected into ROOT/NAME are left out.
+    """
+    conn, croot = calc_catalog.open_covering(root)
+    rows = calc_catalog.select(conn, under=os.path.relpath(root, croot), label=name)
+    conn.close()
+    dest = os.path.join(root, name)
+    out = []
+    for r in rows:
+        d = os.path.normpath(croot / r["path"])
+        if d == dest or d.startswith(dest + os.sep):
+            continue
+        out.append((d, r["status"] in ("converged", "unconverged")))
+    return out
+
+
+def calc_files(calc):
+    """Yield (path, lstat) for every file or symlink below CALC that is not excluded."""
+    for d, dirs, files in os.walk(calc):
+        for fn in files + [x for x in dirs if os.path.islink(os.path.join(d, x))]:
+            if fn in EXCLUDE:
+                continue
+            p = os.path.join(d, fn)
+            try:
+                yield p, os.lstat(p)
+            except OSError:
+                continue
+
+
+def copy_hashed(src, dst):
+    """Copy SRC to DST (keeping mtime) and return the SHA-256 of the data.
+
+    A symlink is recreated with the same target; its digest is that of the
+    target path.
+    """
+    h = hashlib.sha256()
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp = dst + ".part"
+    if os.path.islink(src):
+        target = os.readlink(src)
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        os.symlink(target, tmp)
+        os.replace(tmp, dst)
+        h.update(target.encode())
+        return h.hexdigest()
+    with open(src, "rb") as fi, open(tmp, "wb") as fo:
+        for chunk in iter(lambda: fi.read(1 << 20), b""):
+            h.update(chunk)
+            fo.write(chunk)
+    shutil.copystat(src, tmp)
+    os.replace(tmp, dst)
+    return h.hexdigest()
+
+# ─────────────────────────────────── collect ─────────────────────────────────
+def collect(name, root=".", jobs=8, dry_run=False, verify=False):
+    """Collect finished NAME calculations; return (copy jobs, n unchanged OUTCARs, skipped dirs)."""
+    root = os.path.abspath(root)
+    dest = Path(root) / name
+    dest.mkdir(exist_ok=True)
+    manifest = read_manifest(dest)
+    copies, unchanged, skipped = [], 0, []
+
+    for calc, finished in find_calcs(root, name):
+        rel = os.path.relpath(calc, root)
+        if not finished:
+            skipped.append(rel)
+            continue
+        try:
+            st = os.stat(os.path.join(calc, "OUTCAR"))
+        except OSError:
+            skipped.append(rel)
+            continue
+        key = f"{rel}/{CALC_KEY}"
+        prev = manifest.get(key)
+        if prev and prev[:2] == (st.st_size, st.st_mtime_ns):
+            unchanged += 1
+            if not verify:
+                continue
+        for path, fst in calc_files(calc):
+            frel = os.path.relpath(path, root)
+            old = manifest.get(frel)
+            if old and old[:2] == (fst.st_size, fst.st_mtime_ns) and os.path.lexists(dest / frel):
+                continue
+            copies.append((path, frel, fst))
+        manifest[key] = (st.st_size, st.st_mtime_ns, "-")
+
+    if dry_run:
+        return copies, unchanged, skipped
+
+    def work(job):
+        src, frel, fst = job
+        return frel, (fst.st_size, fst.st_mtime_ns, copy_hashed(src, str(dest / frel)))
+
+    with stage("copy", dest) as ev, ThreadPoolExecutor(max(1, jobs)) as pool:
+        for frel, entry in pool.map(work, copies):
+            manifest[frel] = entry
+        ev["bytes"] = sum(fst.st_size for _, _, fst in copies)
+    write_manifest(dest, manifest)
+    return copies, unchanged, skipped
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("name", help="directory name to collect (e.g. relax)")
+    ap.add_argument("--jobs", type=int, default=8, help="parallel copy workers")
+    ap.add_argument("--dry-run", action="store_true", help="list what would be copied")
+    ap.add_argument("--verify", action="store_true",
+                    help="also check the files of calculations whose OUTCAR is unchanged")
+    args = ap.parse_args()
+
+    copies, unchanged, skipped = collect(args.name, ".", args.jobs, args.dry_run, args.verify)
+    for rel in skipped:
+        print(f"Skipping {rel} (no finished OUTCAR)")
+    verb = "Would copy" if args.dry_run else "Copied"
+    for _, frel, _ in copies:
+        print(f"{verb} {frel}")
+    print(f"✅ {verb} {len(copies)} files; "
+          f"{unchanged} calculations unchanged, {len(skipped)} not finished")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,27 @@
 #!/bin/bash
 
-# Script to find and delete all WAVECAR files in subdirectories
+# Script to delete the WAVECAR files of finished calculations in subdirectories.
+# WAVECARs still needed by a pending chain step or an unfinished follow-up
+# calculation are kept (see scratch_manager.py for the full storage rules).
 
 echo "Searching for WAVECAR files..."
 echo "================================"
 
-# Find all WAVECAR files
-wavecar_files=$(find . -name "WAVECAR" -type f)
-
-if [ -z "$wavecar_files" ]; then
-    echo "No WAVECAR files found."
+python3 ~/scripts/util/scratch_manager.py prune . --only WAVECAR | tee /tmp/.wavecar_plan.$$
+if grep -q "^Nothing to prune" /tmp/.wavecar_plan.$$; then
+    rm -f /tmp/.wavecar_plan.$$
     exit 0
 fi
-
-# Count and display files
-count=$(echo "$wavecar_files" | wc -l)
-echo "Found $count WAVECAR file(s):"
-echo "$wavecar_files"
-echo ""
-
-# Calculate total size
-total_size=$(find . -name "WAVECAR" -type f -exec du -ch {} + | tail -1 | cut -f1)
-echo "Total size: $total_size"
+rm -f /tmp/.wavecar_plan.$$
 echo ""
 
 # Ask for confirmation
-read -p "Do you want to delete all these WAVECAR files? (y/N): " -n 1 -r
+read -p "Do you want to delete these WAVECAR files? (y/N): " -n 1 -r
 echo ""
 
 if [[ $REPLY =~ ^[Yy]$ ]]; then
     echo "Deleting WAVECAR files..."
-    find . -name "WAVECAR" -type f -delete
-    echo "✅ All WAVECAR files have been deleted."
+    python3 ~/scripts/util/scratch_manager.py prune . --only WAVECAR --apply | tail -1
 else
     echo "❌ Operation cancelled."
 fi
@@ -2,6 +2,8 @@
 # distribute_inputs_to_scaled.sh
 # Run this script from within a CALC directory to copy selected files
 # into all *PATTERN* subdirectories.
+# Set LINK_MODE=hardlink (or symlink) to store each file once in the
+# project's content-addressed .input_store and link it instead of copying.
 set -euo pipefail
 
 ROOT=$PWD
@@ -66,12 +68,17 @@ echo
 ###############################################################################
 # 3. Copy files into each *PATTERN* directory
 ###############################################################################
-for d in "${TARGET_DIRS[@]}"; do
-  for file in "${FILES_TO_COPY[@]}"; do
-    echo "Copying $file → $d/$file"
-    cp -f "$file" "$d/"
+if [[ -n "${LINK_MODE:-}" ]]; then
+  python3 ~/scripts/util/input_store.py link "${FILES_TO_COPY[@]}" \
+    -t "${TARGET_DIRS[@]}" --mode "$LINK_MODE"
+else
+  for d in "${TARGET_DIRS[@]}"; do
+    for file in "${FILES_TO_COPY[@]}"; do
+      echo "Copying $file → $d/$file"
+      cp -f "$file" "$d/"
+    done
   done
-done
+fi
 
 echo
 echo "✅ Files successfully copied to all *${PATTERN}* directories."
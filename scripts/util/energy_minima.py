@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 import sys
-import numpy as np
-import pandas as pd
-from scipy.signal import argrelmin
 from pathlib import Path
 import glob
+import io
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from result_archive import read_text  # noqa: E402
 
 def find_local_minima(pattern):
     """
@@ -16,28 +17,37 @@ def find_local_minima(pattern):
     Returns:
         List of directory names containing local minima
     """
-    # Find all directories matching the pattern, excluding .tar.gz files
+    # Find all directories matching the pattern; indexed archives
+    # (result_archive.py) stand in for folders that were removed after archiving
     all_matches = glob.glob(pattern)
     directories = [d for d in all_matches if Path(d).is_dir() and not d.endswith('.tar.gz')]
+    directories += [d for d in all_matches if d.endswith('.tar.gz')
+                    and Path(d + '.idx').is_file() and not Path(d[:-7]).is_dir()]
     
     if not directories:
         print(f"No valid directories found matching pattern: {pattern}", file=sys.stderr)
         return []
     
+    # Heavy imports only when there is work to do (keeps vtools.py start-up fast)
+    import pandas as pd
+    from scipy.signal import argrelmin
+
     minima_dirs = []
     
     # Process each directory
     for directory in sorted(directories):
-        dir_path = Path(directory)
-        energy_file = dir_path / "energies.dat"
+        archive = directory.endswith('.tar.gz')
+        dir_path = Path(directory[:-7] if archive else directory)
+        energy_file = Path(directory) if archive else dir_path / "energies.dat"
         
-        if not energy_file.exists():
+        if not archive and not energy_file.exists():
             print(f"Warning: {energy_file} not found, skipping {directory}", file=sys.stderr)
             continue
             
         try:
             # Read the energy data
-            df = pd.read_csv(energy_file, delim_whitespace=True, comment="#")
+            source = io.StringIO(read_text(energy_file, "energies.dat")) if archive else energy_file
+            df = pd.read_csv(source, delim_whitespace=True, comment="#")
             
             if "Energy(eV)" not in df.columns or "Directory" not in df.columns:
                 print(f"Warning: Required columns not found in {energy_file}", file=sys.stderr)
@@ -84,7 +94,7 @@ def find_local_minima(pattern):
     
     return minima_dirs
 
-if __name__ == "__main__":
+def main():
     if len(sys.argv) < 2:
         print("Usage: python energy_minima.py 'pattern/to/directories/*'", file=sys.stderr)
         sys.exit(1)
@@ -95,3 +105,6 @@ if __name__ == "__main__":
     if not minima:
         print("No minima found", file=sys.stderr)
         sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+events.py
+Structured pipeline events (JSON lines) and a per-stage timing report.
+
+Shell stages emit events through events.sh (ev_run / ev_start / ev_end);
+Python tools use emit() or the stage() context manager below.  Every event
+is one line in $VASP_EVENTS (default ~/.vasp_events.jsonl):
+
+    {"stage": "vasp", "dir": "...", "start": 1.7e9, "end": 1.7e9,
+     "status": 0, "bytes": 0, "job": "123456", "host": "c001"}
+
+Queue wait is derived: a "submit" event (submit_multiple.sh) and the
+"job" event of the same SLURM job id give a "queue" interval.
+
+Usage
+-----
+events.py report [EVENTS.jsonl ...] [--since HOURS] [--stage NAME ...]
+
+The report prints, per stage, the count, failures, total/mean/p50/p90/max
+duration and bytes moved, followed by the critical path: the chain of
+events that ends last, walking back through the latest event that finished
+before each one started, with the time attributed to each stage and to
+idle gaps.
+"""
+import argparse
+import bisect
+import json
+import os
+import socket
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_LOG = Path.home() / ".vasp_events.jsonl"
+
+# ─────────────────────────────────── emit ────────────────────────────────────
+def log_path():
+    return Path(os.environ.get("VASP_EVENTS", DEFAULT_LOG))
+
+
+def emit(stage, directory, start, end, status=0, nbytes=0, **extra):
+    """Append one event; never raises (instrumentation must not break a run)."""
+    ev = {"stage": stage, "dir": str(directory), "start": start, "end": end,
+          "status": int(status), "bytes": int(nbytes),
+          "job": os.environ.get("SLURM_JOB_ID", ""), "host": socket.gethostname(), **extra}
+    try:
+        with open(log_path(), "a") as f:
+            f.write(json.dumps(ev) + "\n")
+    except OSError:
+        pass
+
+
+@contextmanager
+def stage(name, directory="."):
+    """Time a block; set ev['bytes'] or ev['status'] inside it. Exceptions mark status 1."""
+    ev = {"bytes": 0, "status": 0}
+    start = time.time()
+    try:
+        yield ev
+    except BaseException:
+        ev["status"] = ev["status"] or 1
+        raise
+    finally:
+        emit(name, directory, start, time.time(), ev["status"], ev["bytes"])
+
+# ─────────────────────────────────── report ──────────────────────────────────
+def read_events(paths):
+    events = []
+    for p in paths:
+        with open(p) as f:
+            for line in f:
+                try:
+                    ev = json.loads(line)
+                    ev["start"], ev["end"] = float(ev["start"]), float(ev["end"])
+                    events.append(ev)
+                except (ValueError, KeyError, TypeError):
+                    continue
+    return events
+
+
+def derive_queue(events):
+    """Return 'queue' events from submit → job pairs with the same job id."""
+    submits = {e["job"]: e["start"] for e in events if e["stage"] == "submit" and e.get("job")}
+    starts = {}
+    for e in events:
+        if e["stage"] == "job" and e.get("job"):
+            starts[e["job"]] = min(starts.get(e["job"], e["start"]), e["start"])
+    return [{"stage": "queue", "dir": "", "job": j, "start": submits[j], "end": starts[j],
+             "status": 0, "bytes": 0} for j in submits if j in starts and starts[j] >= submits[j]]
+
+
+def percentile(sorted_vals, q):
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo)
+
+
+def stage_table(events):
+    by = defaultdict(list)
+    for e in events:
+        by[e["stage"]].append(e)
+    rows = []
+    for name, evs in by.items():
+        d = sorted(e["end"] - e["start"] for e in evs)
+        rows.append((name, len(evs), sum(e["status"] != 0 for e in evs), sum(d),
+                     sum(d) / len(d), percentile(d, 0.5), percentile(d, 0.9), d[-1],
+                     sum(e.get("bytes", 0) for e in evs)))
+    return sorted(rows, key=lambda r: -r[3])
+
+
+def critical_path(events):
+    """Walk back from the last-ending event; return (chain, idle seconds).
+
+    'job' events enclose the stages run inside them, so they are left out
+    when anything else is available; the chain then shows what the job spent
+    its time on.
+    """
+    pool = [e for e in events if e["stage"] != "job"] or list(events)
+    pool = sorted(pool, key=lambda e: e["end"])
+    if not pool:
+        return [], 0.0
+    ends = [e["end"] for e in pool]
+    idx = len(pool) - 1
+    chain, idle = [pool[idx]], 0.0
+    while True:
+        cur = chain[-1]
+        idx = min(bisect.bisect_right(ends, cur["start"]), idx) - 1
+        if idx < 0:
+            break
+        idle += cur["start"] - pool[idx]["end"]
+        chain.append(pool[idx])
+    return chain[::-1], idle
+
+
+def fmt(sec):
+    if sec >= 3600:
+        return f"{sec / 3600:.2f}h"
+    if sec >= 60:
+        return f"{sec / 60:.1f}m"
+    return f"{sec:.2f}s"
+
+
+def human(n):
+    for unit in ("B", "K", "M", "G", "T"):
+        if n < 1024 or unit == "T":
+            return f"{n:.1f}{unit}"
+        n /= 1024
+
+
+def report(events, out=sys.stdout):
+    if not events:
+        print("No events.", file=out)
+        return
+    t0 = min(e["start"] for e in events)
+    t1 = max(e["end"] for e in events)
+    print(f"{len(events)} events, wall clock {fmt(t1 - t0)}\n", file=out)
+    print(f"{'Stage':<12}{'N':>7}{'Fail':>6}{'Total':>10}{'Mean':>9}{'p50':>9}"
+          f"{'p90':>9}{'Max':>9}{'Bytes':>10}", file=out)
+    for name, n, fail, tot, mean, p50, p90, mx, nb in stage_table(events):
+        print(f"{name:<12}{n:>7}{fail:>6}{fmt(tot):>10}{fmt(mean):>9}{fmt(p50):>9}"
+              f"{fmt(p90):>9}{fmt(mx):>9}{human(nb):>10}", file=out)
+
+    chain, idle = critical_path(events)
+    share = defaultdict(float)
+    for e in chain:
+        share[e["stage"]] += e["end"] - e["start"]
+    span = chain[-1]["end"] - chain[0]["start"]
+    print(f"\nCritical path: {len(chain)} events over {fmt(span)}", file=out)
+    for name, sec in sorted(share.items(), key=lambda kv: -kv[1]):
+        print(f"  {name:<12}{fmt(sec):>10}  {100 * sec / max(span, 1e-9):5.1f}%", file=out)
+    print(f"  {'(idle)':<12}{fmt(idle):>10}  {100 * idle / max(span, 1e-9):5.1f}%", file=out)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("report")
+    p.add_argument("files", nargs="*", help=f"event logs (default: $VASP_EVENTS or {DEFAULT_LOG})")
+    p.add_argument("--since", type=float, help="only events that ended in the last HOURS")
+    p.add_argument("--stage", nargs="+", help="only these stages")
+    args = ap.parse_args()
+
+    files = args.files or [log_path()]
+    try:
+        events = read_events(files)
+    except OSError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    events += derive_queue(events)
+    if args.since:
+        cut = time.time() - 3600 * args.since
+        events = [e for e in events if e["end"] >= cut]
+    if args.stage:
+        events = [e for e in events if e["stage"] in args.stage]
+    report(events)
+
+
+if __name__ == "__main__":
+    main()
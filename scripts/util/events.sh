@@ -0,0 +1,67 @@
+#!/bin/bash
+# events.sh – structured pipeline events, one JSON object per line.
+#
+# Source this file from job scripts and drivers:
+#
+#   source ~/scripts/util/events.sh
+#   ev_run vasp "$PWD" ibrun vasp_std          # time one command
+#   ev_start vaspkit; echo 102 | vaspkit; ev_end vaspkit "$PWD" $?
+#
+# Events go to $VASP_EVENTS (default ~/.vasp_events.jsonl) and are summarised
+# by `python3 ~/scripts/util/events.py report`.  Fields: stage, dir, start,
+# end (epoch seconds), status, bytes, job (SLURM_JOB_ID) and host.
+
+VASP_EVENTS="${VASP_EVENTS:-$HOME/.vasp_events.jsonl}"
+declare -gA _EV_T0 2>/dev/null || declare -A _EV_T0
+
+ev_now() {
+    if [[ -n "${EPOCHREALTIME:-}" ]]; then
+        echo "${EPOCHREALTIME/,/.}"
+    else
+        date +%s.%N
+    fi
+}
+
+# ev_emit STAGE DIR START END [STATUS] [BYTES]
+ev_emit() {
+    local stage=$1 dir=$2 start=$3 end=$4 status=${5:-0} bytes=${6:-0}
+    dir=${dir//\\/\\\\}
+    dir=${dir//\"/\\\"}
+    printf '{"stage":"%s","dir":"%s","start":%s,"end":%s,"status":%d,"bytes":%d,"job":"%s","host":"%s"}\n' \
+        "$stage" "$dir" "$start" "$end" "$status" "$bytes" "${SLURM_JOB_ID:-}" "${HOSTNAME:-}" \
+        >> "$VASP_EVENTS" 2>/dev/null || true
+}
+
+# ev_start STAGE – remember the start time of STAGE
+ev_start() {
+    _EV_T0[$1]=$(ev_now)
+}
+
+# ev_end STAGE DIR [STATUS] [BYTES] – emit STAGE from its ev_start time
+ev_end() {
+    local stage=$1 dir=$2 status=${3:-0} bytes=${4:-0}
+    local start=${_EV_T0[$stage]:-$(ev_now)}
+    ev_emit "$stage" "$dir" "$start" "$(ev_now)" "$status" "$bytes"
+    unset "_EV_T0[$stage]"
+}
+
+# ev_run STAGE DIR CMD [ARGS...] – run CMD, emit its event, return its status
+ev_run() {
+    local stage=$1 dir=$2
+    shift 2
+    local start rc
+    start=$(ev_now)
+    "$@"
+    rc=$?
+    ev_emit "$stage" "$dir" "$start" "$(ev_now)" "$rc"
+    return $rc
+}
+
+# ev_bytes FILE... – total size of the existing FILEs
+ev_bytes() {
+    local total=0 f
+    for f in "$@"; do
+        [[ -f "$f" ]] && total=$((total + $(stat -c %s "$f" 2>/dev/null || echo 0)))
+    done
+    echo "$total"
+}
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+incar.py
+INCAR object model: round-trip parser, typed tag validation, layering of
+overrides on a base INCAR, and bulk generation of INCAR variants.
+
+The parser keeps every line as written (comments, blank lines, spacing,
+'A = 1; B = 2' lines), so str(Incar.read(path)) reproduces the file byte
+for byte.  Setting a tag rewrites only the value on its line and keeps its
+inline comment; a new tag is appended at the end.
+
+Usage
+-----
+incar.py get   INCAR TAG [TAG ...]
+incar.py set   INCAR TAG=VALUE [TAG=VALUE ...] [-o OUT]     # in place by default
+incar.py check INCAR [--poscar POSCAR]
+incar.py merge BASE OVERRIDE [OVERRIDE ...] -o OUT          # later files win
+incar.py grid  BASE TAG=V1,V2,... [TAG=...] -d OUTDIR [--files POSCAR POTCAR KPOINTS]
+
+grid writes OUTDIR/<TAG>_<V>[_<TAG>_<V>...]/INCAR for the Cartesian
+product of all value lists, in one process.
+
+Types
+-----
+Tags are typed with the vocabulary of templates/INCAR.template (INT, FLOAT,
+BOOL, SPECIES_INT, SPECIES_FLOAT) plus ATOM_FLOAT for per-atom lists and a
+set of allowed words for keyword tags.  Template tags missing from the
+built-in table are added to it.
+"""
+import argparse
+import itertools
+import os
+import re
+import shutil
+import sys
+from pathlib import Path
+
+TEMPLATE = Path(__file__).resolve().parent / "templates" / "INCAR.template"
+
+TAG_TYPES = {
+    "ISTART": "INT", "ICHARG": "INT", "ISPIN": "INT", "NELM": "INT", "NELMIN": "INT",
+    "NSW": "INT", "IBRION": "INT", "ISIF": "INT", "ISMEAR": "INT", "LORBIT": "INT",
+    "LMAXMIX": "INT", "LDAUTYPE": "INT", "LDAUPRINT": "INT", "NCORE": "INT", "NPAR": "INT",
+    "KPAR": "INT", "IVDW": "INT", "ISYM": "INT", "NBANDS": "INT", "NEDOS": "INT",
+    "VOSKOWN": "INT", "NFREE": "INT",
+    "ENCUT": "FLOAT", "EDIFF": "FLOAT", "EDIFFG": "FLOAT", "SIGMA": "FLOAT", "POTIM": "FLOAT",
+    "AMIX": "FLOAT", "BMIX": "FLOAT", "AMIX_MAG": "FLOAT", "BMIX_MAG": "FLOAT",
+    "ENAUG": "FLOAT", "NELECT": "FLOAT", "SYMPREC": "FLOAT", "KSPACING": "FLOAT",
+    "EMIN": "FLOAT", "EMAX": "FLOAT", "NUPDOWN": "FLOAT", "AEXX": "FLOAT", "HFSCREEN": "FLOAT",
+    "LASPH": "BOOL", "GGA_COMPAT": "BOOL", "LDAU": "BOOL", "LDIAG": "BOOL", "LWAVE": "BOOL",
+    "LCHARG": "BOOL", "LNONCOLLINEAR": "BOOL", "LSORBIT": "BOOL",
+    "LHFCALC": "BOOL", "ADDGRID": "BOOL", "LPLANE": "BOOL", "LVTOT": "BOOL", "LELF": "BOOL",
+    "LEPSILON": "BOOL", "LAECHG": "BOOL", "KGAMMA": "BOOL",
+    "LDAUL": "SPECIES_INT", "LDAUU": "SPECIES_FLOAT", "LDAUJ": "SPECIES_FLOAT",
+    "RWIGS": "SPECIES_FLOAT",
+    "MAGMOM": "ATOM_FLOAT",
+    "PREC": {"LOW", "MEDIUM", "HIGH", "NORMAL", "SINGLE", "ACCURATE"},
+    "ALGO": {"NORMAL", "VERYFAST", "FAST", "CONJUGATE", "ALL", "DAMPED", "SUBROT",
+             "EIGENVAL", "EXACT", "NONE", "NOTHING", "CHI", "G0W0", "GW0", "GW",
+             "SCGW0", "SCGW", "BSE", "TIMEEV", "CRPA"},
+    "LREAL": {"AUTO", "A", "ON", "O", ".TRUE.", ".FALSE.", "T", "F", "TRUE", "FALSE"},
+    "GGA": {"PE", "PS", "RP", "91", "AM", "PB", "B3", "B5", "BO", "OR", "ML", "CX", "MK", "LIBXC"},
+    "METAGGA": {"SCAN", "RSCAN", "R2SCAN", "TPSS", "RTPSS", "M06L", "MBJ", "LIBXC"},
+}
+
+TAG_RE = re.compile(r"^\s*([A-Za-z][A-Za-z0-9_]*)\s*=\s*(.*?)\s*$")
+
+# ─────────────────────────────────── values ──────────────────────────────────
+def expand_list(text):
+    """'2*3.0 -3' → ['3.0', '3.0', '-3'] (VASP n*v repeat syntax)."""
+    out = []
+    for tok in text.split():
+        count, _, val = tok.rpartition("*")
+        if count.isdigit():
+            out += [val] * int(count)
+        else:
+            out.append(tok)
+    return out
+
+
+def parse_bool(text):
+    t = text.strip().strip(".").upper()
+    if t in ("T", "TRUE"):
+        return True
+    if t in ("F", "FALSE"):
+        return False
+    raise ValueError(f"not a logical: {text!r}")
+
+
+def parse_value(tag, text):
+    """Return the typed value of TAG (str when the type is unknown).
+
+    Like VASP, scalars are read from the first word; trailing text is ignored.
+    """
+    kind = TAG_TYPES.get(tag.upper())
+    first = text.split()[0] if text.split() else text
+    if kind == "INT":
+        return int(first)
+    if kind == "FLOAT":
+        return float(first.replace("d", "e").replace("D", "e"))
+    if kind == "BOOL":
+        return parse_bool(first)
+    if kind == "SPECIES_INT":
+        return [int(x) for x in expand_list(text)]
+    if kind in ("SPECIES_FLOAT", "ATOM_FLOAT"):
+        return [float(x) for x in expand_list(text)]
+    return text
+
+
+def format_value(value):
+    """VASP text for a Python value (strings are written unchanged)."""
+    if isinstance(value, bool):
+        return ".TRUE." if value else ".FALSE."
+    if isinstance(value, float):
+        return f"{value:g}"
+    if isinstance(value, (list, tuple)):
+        return " ".join(format_value(v) for v in value)
+    return str(value)
+
+# ─────────────────────────────────── model ───────────────────────────────────
+def _split_comment(line):
+    """Split LINE into (code, comment) at the first # or !."""
+    m = re.search(r"[#!]", line)
+    return (line, "") if m is None else (line[:m.start()], line[m.start():])
+
+
+class Incar:
+    """Ordered INCAR that round-trips its source text.
+
+    lines  – raw text of each line (without newline)
+    tags   – {TAG: (line index, segment index)} of the last assignment
+    """
+
+    def __init__(self, text=""):
+        self.lines = text.split("\n")
+        self.trailing_newline = text.endswith("\n")
+        if self.trailing_newline:
+            self.lines.pop()
+        self._index()
+
+    @classmethod
+    def read(cls, path):
+        return cls(Path(path).read_text())
+
+    def write(self, path):
+        """Write to PATH through a .tmp file, replacing (not truncating) PATH.
+
+        An INCAR hard-linked from the input store is read-only and shared, so
+        it must be replaced rather than written through.
+        """
+        tmp = Path(f"{path}.tmp")
+        tmp.write_text(str(self))
+        os.replace(tmp, path)
+
+    def __str__(self):
+        return "\n".join(self.lines) + ("\n" if self.trailing_newline else "")
+
+    def copy(self):
+        return Incar(str(self))
+
+    def _index(self):
+        self.tags = {}
+        for i, line in enumerate(self.lines):
+            code, _ = _split_comment(line)
+            for j, seg in enumerate(code.split(";")):
+                m = TAG_RE.match(seg)
+                if m:
+                    self.tags[m.group(1).upper()] = (i, j)
+
+    def _segment(self, tag):
+        i, j = self.tags[tag.upper()]
+        code, _ = _split_comment(self.lines[i])
+        return TAG_RE.match(code.split(";")[j])
+
+    # ── mapping interface ──
+    def __contains__(self, tag):
+        return tag.upper() in self.tags
+
+    def __iter__(self):
+        return iter(sorted(self.tags, key=self.tags.get))
+
+    def raw(self, tag, default=None):
+        """Value text of TAG as written (without comment)."""
+        return self._segment(tag).group(2) if tag in self else default
+
+    def get(self, tag, default=None):
+        """Typed value of TAG."""
+        return parse_value(tag, self.raw(tag)) if tag in self else default
+
+    __getitem__ = get
+
+    def items(self):
+        return [(t, self.raw(t)) for t in self]
+
+    def set(self, tag, value):
+        """Set TAG, keeping its position and inline comment; append if new."""
+        tag, text = tag.upper(), format_value(value)
+        if tag not in self.tags:
+            if self.lines == [""]:
+                self.lines = []
+            self.lines.append(f"{tag} = {text}")
+            self.trailing_newline = True
+            self.tags[tag] = (len(self.lines) - 1, 0)
+            return self
+        i, j = self.tags[tag]
+        code, comment = _split_comment(self.lines[i])
+        segs = code.split(";")
+        m = TAG_RE.match(segs[j])
+        segs[j] = segs[j][:m.start(2)] + text + segs[j][m.end(2):]
+        self.lines[i] = ";".join(segs) + comment
+        return self
+
+    __setitem__ = set
+
+    def remove(self, tag):
+        """Drop TAG (its whole line when it is the only assignment there)."""
+        if tag not in self:
+            return self
+        i, j = self.tags[tag.upper()]
+        code, comment = _split_comment(self.lines[i])
+        segs = code.split(";")
+        if len([s for s in segs if TAG_RE.match(s)]) == 1:
+            del self.lines[i]
+        else:
+            del segs[j]
+            self.lines[i] = ";".join(segs).lstrip() + comment
+        self._index()
+        return self
+
+    def update(self, other):
+        """Apply the tags of OTHER (dict or Incar) on top of this INCAR."""
+        pairs = other.items() if isinstance(other, Incar) else dict(other).items()
+        for tag, value in pairs:
+            if value is None:
+                self.remove(tag)
+            else:
+                self.set(tag, value)
+        return self
+
+
+def layered(base, *overrides):
+    """Return a new Incar: BASE with each override (dict, Incar or path) applied in order."""
+    out = (Incar.read(base) if isinstance(base, (str, Path)) else base).copy()
+    for o in overrides:
+        out.update(Incar.read(o) if isinstance(o, (str, Path)) else o)
+    return out
+
+# ─────────────────────────────────── validation ──────────────────────────────
+def read_template_types(path=TEMPLATE):
+    """Return {TAG: type} from INCAR.template lines 'TAG = TYPE # ...'."""
+    out = {}
+    if not Path(path).is_file():
+        return out
+    for line in Path(path).read_text().splitlines():
+        m = TAG_RE.match(_split_comment(line)[0])
+        if m and m.group(2) in ("INT", "FLOAT", "BOOL", "SPECIES_INT", "SPECIES_FLOAT"):
+            out[m.group(1).upper()] = m.group(2)
+    return out
+
+
+def validate(incar, natoms=None, nspecies=None):
+    """Return a list of problems: wrong types, unknown keywords and list lengths."""
+    problems, values = [], {}
+    for tag in incar:
+        kind, raw = TAG_TYPES.get(tag), incar.raw(tag)
+        try:
+            values[tag] = parse_value(tag, raw)
+        except ValueError:
+            problems.append(f"{tag} = {raw}: expected {kind}")
+            continue
+        if isinstance(kind, set):
+            word = raw.split()[0].upper() if raw.split() else ""
+            if word not in kind and word.strip(".") not in {k.strip(".") for k in kind}:
+                problems.append(f"{tag} = {raw}: expected one of {', '.join(sorted(kind))}")
+
+    noncollinear = values.get("LNONCOLLINEAR") or values.get("LSORBIT")
+    for tag, value in values.items():
+        kind = TAG_TYPES.get(tag)
+        if kind == "ATOM_FLOAT" and natoms:
+            need = 3 * natoms if noncollinear else natoms
+            if len(value) != need:
+                problems.append(f"{tag}: {len(value)} values for {need} "
+                                f"(atoms{' × 3' if noncollinear else ''})")
+        elif kind in ("SPECIES_INT", "SPECIES_FLOAT") and nspecies and len(value) != nspecies:
+            problems.append(f"{tag}: {len(value)} values for {nspecies} species")
+    if "MAGMOM" in values and values.get("ISPIN", 1) == 1 and not noncollinear:
+        problems.append("MAGMOM set but ISPIN = 1")
+    return problems
+
+# ─────────────────────────────────── bulk ────────────────────────────────────
+def safe_name(value):
+    return re.sub(r"[^A-Za-z0-9.+-]+", "_", str(value)).strip("_") or "x"
+
+
+def grid(base, axes, out_dir, files=(), src_dir="."):
+    """Write OUT_DIR/<TAG>_<V>.../INCAR for the product of AXES {TAG: [values]}.
+
+    Returns the created directories.  FILES are copied from SRC_DIR into each.
+    """
+    base = Incar.read(base) if isinstance(base, (str, Path)) else base
+    tags = list(axes)
+    made = []
+    for combo in itertools.product(*(axes[t] for t in tags)):
+        d = Path(out_dir) / "_".join(f"{t}_{safe_name(v)}" for t, v in zip(tags, combo))
+        d.mkdir(parents=True, exist_ok=True)
+        layered(base, dict(zip(tags, combo))).write(d / "INCAR")
+        for f in files:
+            shutil.copyfile(Path(src_dir) / f, d / f)
+        made.append(d)
+    return made
+
+
+def parse_assignments(items):
+    out = {}
+    for item in items:
+        tag, sep, value = item.partition("=")
+        if not sep or not tag.strip():
+            raise ValueError(f"expected TAG=VALUE, got {item!r}")
+        out[tag.strip()] = value.strip()
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("get")
+    p.add_argument("incar")
+    p.add_argument("tags", nargs="+")
+    p = sub.add_parser("set")
+    p.add_argument("incar")
+    p.add_argument("assignments", nargs="+", metavar="TAG=VALUE")
+    p.add_argument("-o", "--output")
+    p = sub.add_parser("check")
+    p.add_argument("incar")
+    p.add_argument("--poscar", help="POSCAR for per-atom / per-species list lengths")
+    p = sub.add_parser("merge")
+    p.add_argument("base")
+    p.add_argument("overrides", nargs="+")
+    p.add_argument("-o", "--output", required=True)
+    p = sub.add_parser("grid")
+    p.add_argument("base")
+    p.add_argument("axes", nargs="+", metavar="TAG=V1,V2,...")
+    p.add_argument("-d", "--out-dir", required=True)
+    p.add_argument("--files", nargs="*", default=[], help="files copied into every directory")
+    args = ap.parse_args()
+
+    for tag, kind in read_template_types().items():
+        TAG_TYPES.setdefault(tag, kind)
+    try:
+        if args.cmd == "get":
+            inc = Incar.read(args.incar)
+            for t in args.tags:
+                print(inc.raw(t, ""))
+        elif args.cmd == "set":
+            inc = Incar.read(args.incar).update(parse_assignments(args.assignments))
+            inc.write(args.output or args.incar)
+        elif args.cmd == "check":
+            natoms = nspecies = None
+            if args.poscar:
+                sys.path.insert(0, str(Path(__file__).resolve().parent))
+                from vasp_io import read_poscar
+                pos = read_poscar(args.poscar)
+                natoms, nspecies = pos.natoms, len(pos.symbols)
+            problems = validate(Incar.read(args.incar), natoms, nspecies)
+            for msg in problems:
+                print(f"❌ {args.incar}: {msg}")
+            if not problems:
+                print(f"✅ {args.incar}")
+            sys.exit(1 if problems else 0)
+        elif args.cmd == "merge":
+            layered(args.base, *args.overrides).write(args.output)
+        else:
+            axes = {t: v.split(",") for t, v in parse_assignments(args.axes).items()}
+            made = grid(args.base, axes, args.out_dir, args.files)
+            print(f"✅ {len(made)} INCARs written under {args.out_dir}")
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+input_store.py
+Content-addressed store for VASP inputs that are fanned out to many
+calculation directories (POTCAR, KPOINTS, INCAR, ...).
+
+Each distinct file is stored once under <project>/.input_store/objects/ by
+its SHA-256 and linked into the targets: hardlink by default, symlink when
+the target is on another filesystem, plain copy as the last resort.  Every
+link is recorded in .input_store/manifest.tsv.
+
+Stored objects are read-only, so a write through one link can never change
+the other calculations: sed -i and cp -f replace the link with a private
+file, while a plain cp or >> onto a linked file fails with "Permission
+denied".  Link files that are only read (POTCAR, KPOINTS, shared INCARs);
+use --mode copy for files a job rewrites in place.  POSCAR, which the
+relaxation loops overwrite with a plain cp, is always placed as a copy.
+
+Usage
+-----
+input_store.py link FILE [FILE ...] (-t DIR [DIR ...] | -p PATTERN) [--mode hardlink|symlink|copy]
+input_store.py verify [--rehash]
+input_store.py gc
+
+-p PATTERN matches direct subdirectories named *PATTERN* (as distribute_inputs.sh
+does).  The store lives in the nearest parent holding .input_store, or is
+created in the current directory.
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import stat
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+STORE_NAME = ".input_store"
+WORKERS = 16
+ALWAYS_COPY = {"POSCAR"}       # rewritten in place by `cp CONTCAR POSCAR`
+
+# ─────────────────────────────────── store ───────────────────────────────────
+def find_store(start="."):
+    p = Path(start).resolve()
+    for d in [p, *p.parents]:
+        if (d / STORE_NAME).is_dir():
+            return d / STORE_NAME
+    return p / STORE_NAME
+
+
+def sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def object_path(store, digest):
+    return store / "objects" / digest[:2] / digest[2:]
+
+
+def ingest(store, src):
+    """Copy SRC into the store (once) and return (digest, object path)."""
+    digest = sha256(src)
+    obj = object_path(store, digest)
+    if not obj.exists():
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=obj.parent, prefix=f".{obj.name}.")
+        os.close(fd)
+        try:
+            shutil.copyfile(src, tmp)
+            os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            os.replace(tmp, obj)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    return digest, obj
+
+
+def read_manifest(store):
+    """Return {target: (digest, name, mode)}."""
+    out = {}
+    mf = store / "manifest.tsv"
+    if mf.is_file():
+        for line in mf.read_text().splitlines():
+            if line.startswith("#") or not line.strip():
+                continue
+            digest, name, mode, target = line.split("\t")
+            out[target] = (digest, name, mode)
+    return out
+
+
+def write_manifest(store, entries):
+    tmp = store / "manifest.tsv.tmp"
+    with open(tmp, "w") as f:
+        f.write("# sha256\tname\tmode\ttarget\n")
+        for target in sorted(entries):
+            digest, name, mode = entries[target]
+            f.write(f"{digest}\t{name}\t{mode}\t{target}\n")
+    os.replace(tmp, store / "manifest.tsv")
+
+# ─────────────────────────────────── linking ─────────────────────────────────
+def place(obj, dest, mode):
+    """Link OBJ to DEST, falling back hardlink → symlink → copy. Returns mode used."""
+    if dest.is_symlink() or dest.exists():
+        dest.unlink()
+    if mode == "hardlink":
+        try:
+            os.link(obj, dest)
+            return "hardlink"
+        except OSError:
+            mode = "symlink"
+    if mode == "symlink":
+        try:
+            os.symlink(os.path.relpath(obj, dest.parent), dest)
+            return "symlink"
+        except OSError:
+            pass
+    shutil.copyfile(obj, dest)
+    return "copy"
+
+
+def link(files, targets, mode="hardlink", store=None):
+    """Link every FILE into every TARGET directory; return (name, digest, dest, mode) per link."""
+    store = Path(store) if store else find_store()
+    root = store.parent
+    objs = [(Path(f).name, *ingest(store, f)) for f in files]
+    jobs = [(name, digest, obj, Path(t).resolve() / name)
+            for t in targets for name, digest, obj in objs]
+
+    def work(job):
+        name, digest, obj, dest = job
+        return name, digest, dest, place(obj, dest, "copy" if name in ALWAYS_COPY else mode)
+
+    with ThreadPoolExecutor(WORKERS) as pool:
+        done = list(pool.map(work, jobs))
+
+    entries = read_manifest(store)
+    for name, digest, dest, used in done:
+        entries[os.path.relpath(dest, root)] = (digest, name, used)
+    write_manifest(store, entries)
+    return done
+
+
+def verify(store, rehash=False):
+    """Check every manifest entry; return list of (target, problem)."""
+    root = store.parent
+    entries = read_manifest(store)
+    corrupt = set()
+    if rehash:
+        digests = sorted({e[0] for e in entries.values()})
+        with ThreadPoolExecutor(WORKERS) as pool:
+            ok = pool.map(lambda d: not object_path(store, d).is_file()
+                          or sha256(object_path(store, d)) == d, digests)
+            corrupt = {d for d, good in zip(digests, ok) if not good}
+
+    def check(item):
+        target, (digest, _, mode) = item
+        dest, obj = root / target, object_path(store, digest)
+        if not obj.is_file():
+            return target, "store object missing"
+        if digest in corrupt:
+            return target, "store object modified"
+        if not (dest.exists() or dest.is_symlink()):
+            return target, "missing"
+        if mode == "hardlink" and not rehash:
+            return (target, None) if os.path.samefile(dest, obj) else (target, "replaced")
+        if mode == "symlink" and not rehash:
+            return (target, None) if dest.resolve() == obj.resolve() else (target, "replaced")
+        return (target, None) if sha256(dest) == digest else (target, "content differs")
+
+    with ThreadPoolExecutor(WORKERS) as pool:
+        return [r for r in pool.map(check, entries.items()) if r[1]]
+
+
+def gc(store):
+    """Drop manifest entries whose target is gone and objects nothing references."""
+    root = store.parent
+    entries = {t: e for t, e in read_manifest(store).items()
+               if (root / t).exists() or (root / t).is_symlink()}
+    write_manifest(store, entries)
+    used = {e[0] for e in entries.values()}
+    removed = 0
+    for obj in (store / "objects").glob("*/*"):
+        if obj.parent.name + obj.name not in used:
+            obj.unlink()
+            removed += 1
+    return removed
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--store", help="store directory (default: nearest .input_store)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("link")
+    p.add_argument("files", nargs="+")
+    g = p.add_mutually_exclusive_group(required=True)
+    g.add_argument("-t", "--targets", nargs="+")
+    g.add_argument("-p", "--pattern")
+    p.add_argument("--mode", choices=["hardlink", "symlink", "copy"], default="hardlink")
+    p = sub.add_parser("verify")
+    p.add_argument("--rehash", action="store_true", help="hash every target instead of comparing inodes")
+    sub.add_parser("gc")
+    args = ap.parse_args()
+    store = Path(args.store) if args.store else find_store()
+
+    if args.cmd == "link":
+        targets = args.targets or sorted(str(d) for d in Path(".").glob(f"*{args.pattern}*") if d.is_dir())
+        if not targets:
+            print("❌ No target directories found")
+            sys.exit(1)
+        missing = [f for f in args.files if not Path(f).is_file()]
+        if missing:
+            print(f"❌ Not found: {' '.join(missing)}")
+            sys.exit(1)
+        store.mkdir(exist_ok=True)
+        done = link(args.files, targets, args.mode, store)
+        modes = {}
+        for *_, used in done:
+            modes[used] = modes.get(used, 0) + 1
+        print(f"✅ {len(done)} files placed in {len(targets)} directories "
+              f"({', '.join(f'{n} {m}' for m, n in sorted(modes.items()))})")
+    elif args.cmd == "verify":
+        bad = verify(store, args.rehash)
+        for target, problem in bad:
+            print(f"❌ {target}: {problem}")
+        print(f"{'✅' if not bad else '⚠️ '} {len(read_manifest(store))} entries checked, {len(bad)} problems")
+        sys.exit(1 if bad else 0)
+    else:
+        print(f"🧹 Removed {gc(store)} unreferenced objects")
+
+
+if __name__ == "__main__":
+    main()
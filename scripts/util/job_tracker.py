@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+job_tracker.py
+Directory ↔ SLURM job id records with a cached, batched view of the queue,
+and throttled submission.
+
+Submitters record every job they start (submit_multiple.sh does this).  The
+state of all tracked jobs is refreshed with ONE `squeue -u $USER` call, and
+jobs that left the queue get their final state from one `sacct` call.  The
+result is cached in the database with a TTL, so status checks and throttle
+loops in many shells cost at most one scheduler query per TTL instead of one
+per job.
+
+Usage
+-----
+job_tracker.py record DIR JOBID [--campaign NAME]
+job_tracker.py status [--campaign NAME] [--dirs] [--ttl 60]
+job_tracker.py wait   --max N [--ttl 60]           # block until fewer than N jobs are in flight
+job_tracker.py submit DIR ... [--script jobscript] [--max N] [--campaign NAME] [--ttl 60]
+job_tracker.py refresh                               # query the scheduler now
+
+Jobs in flight are all of the user's queued and running jobs (tracked or
+not, as site limits count them) plus the jobs recorded since the last
+refresh.  A campaign defaults to the directory the submitter ran in.
+
+Environment
+-----------
+JOB_TRACKER_DB   database file (default ~/.vasp_jobs.sqlite)
+
+The scheduler commands are squeue, sacct and sbatch from PATH; the shims of
+simulator/fake_slurm.py stand in for them in tests.
+"""
+import argparse
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from events import emit  # noqa: E402
+
+DEFAULT_DB = Path.home() / ".vasp_jobs.sqlite"
+TTL = 60.0                                          # seconds a queue snapshot stays valid
+QUEUED = {"PENDING", "CONFIGURING", "REQUEUED", "RESIZING", "SUSPENDED"}
+RUNNING = {"RUNNING", "COMPLETING", "STAGE_OUT"}
+SUBMITTED_RE = re.compile(r"Submitted batch job (\d+)")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id        TEXT PRIMARY KEY,
+    dir       TEXT NOT NULL,
+    campaign  TEXT NOT NULL,
+    submitted REAL NOT NULL,
+    state     TEXT NOT NULL,        -- queued | running | finished
+    final     TEXT,                 -- scheduler end state (COMPLETED, FAILED, ...)
+    updated   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_campaign ON jobs(campaign, state);
+CREATE INDEX IF NOT EXISTS idx_jobs_state    ON jobs(state);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# ─────────────────────────────────── database ────────────────────────────────
+def db_path():
+    return Path(os.environ.get("JOB_TRACKER_DB", DEFAULT_DB))
+
+
+def open_db(path=None):
+    conn = sqlite3.connect(path or db_path(), timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def meta(conn, key, default=None):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def set_meta(conn, **values):
+    conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [(k, str(v)) for k, v in values.items()])
+
+
+def record(conn, directory, job_id, campaign):
+    now = time.time()
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, 'queued', NULL, ?)",
+                     (str(job_id), os.path.abspath(directory), os.path.abspath(campaign), now, now))
+
+# ─────────────────────────────────── scheduler ───────────────────────────────
+def query_queue():
+    """{job id: SLURM state} of all the user's jobs in the queue (one squeue call)."""
+    user = os.environ.get("USER") or os.environ.get("LOGNAME") or ""
+    cmd = ["squeue", "-h", "-o", "%i %T"] + (["-u", user] if user else [])
+    out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+    states = {}
+    for line in out.splitlines():
+        parts = line.split()
+        if len(parts) >= 2:
+            states[parts[0].split("_")[0]] = parts[1]      # array tasks report as their parent
+    return states
+
+
+def query_final(ids):
+    """{job id: end state} from one sacct call; empty when sacct is unavailable."""
+    if not ids or shutil.which("sacct") is None:
+        return {}
+    cmd = ["sacct", "-n", "-X", "-P", "-o", "JobID,State", "-j", ",".join(ids)]
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+    final = {}
+    for line in out.splitlines():
+        jid, _, state = line.partition("|")
+        if state:
+            final[jid.split("_")[0]] = state.split()[0]   # "CANCELLED by 123" → CANCELLED
+    return final
+
+
+def refresh(conn, ttl=TTL, force=False):
+    """Update all tracked jobs from one queue snapshot unless the cached one is younger than TTL.
+
+    Returns True when the scheduler was queried.
+    """
+    now = time.time()
+    if not force and now - float(meta(conn, "refreshed", 0)) < ttl:
+        return False
+    states = query_queue()
+    active = [r["id"] for r in conn.execute("SELECT id FROM jobs WHERE state != 'finished'")]
+    gone = [j for j in active if j not in states]
+    final = query_final(gone)
+    with conn:
+        for jid in active:
+            s = states.get(jid)
+            if s is None:
+                conn.execute("UPDATE jobs SET state = 'finished', final = ?, updated = ? WHERE id = ?",
+                             (final.get(jid, "UNKNOWN"), now, jid))
+            else:
+                state = "queued" if s in QUEUED else "running" if s in RUNNING else "finished"
+                conn.execute("UPDATE jobs SET state = ?, final = ?, updated = ? WHERE id = ?",
+                             (state, s if state == "finished" else None, now, jid))
+        set_meta(conn, refreshed=now, user_active=sum(s in QUEUED | RUNNING for s in states.values()))
+    return True
+
+
+def in_flight(conn):
+    """The user's queued + running jobs at the last refresh, plus jobs recorded since."""
+    since = float(meta(conn, "refreshed", 0))
+    newer = conn.execute("SELECT COUNT(*) FROM jobs WHERE submitted > ?", (since,)).fetchone()[0]
+    return int(meta(conn, "user_active", 0)) + newer
+
+
+def wait_slot(conn, limit, ttl=TTL, quiet=False):
+    """Block until fewer than LIMIT jobs are in flight; return the count."""
+    told = False
+    while True:
+        refresh(conn, ttl)
+        n = in_flight(conn)
+        if n < limit:
+            return n
+        if not quiet and not told:
+            print(f"⏳ {n} job(s) in flight (limit {limit}); waiting for a slot", flush=True)
+            told = True
+        time.sleep(max(1.0, ttl - (time.time() - float(meta(conn, "refreshed", 0)))))
+
+# ─────────────────────────────────── reports ─────────────────────────────────
+def summary(conn, campaign=None):
+    """{campaign: {"queued": n, "running": n, "finished": n, <final state>: n}}."""
+    sql = "SELECT campaign, state, final, COUNT(*) AS n FROM jobs"
+    params = ()
+    if campaign:
+        sql += " WHERE campaign = ?"
+        params = (os.path.abspath(campaign),)
+    out = defaultdict(lambda: defaultdict(int))
+    for r in conn.execute(sql + " GROUP BY campaign, state, final", params):
+        out[r["campaign"]][r["state"]] += r["n"]
+        if r["state"] == "finished":
+            out[r["campaign"]][r["final"] or "UNKNOWN"] += r["n"]
+    return out
+
+
+def print_status(conn, campaign=None, dirs=False):
+    age = time.time() - float(meta(conn, "refreshed", 0))
+    print(f"📋 queue snapshot {age:.0f} s old, {in_flight(conn)} job(s) in flight")
+    print(f"{'QUEUED':>7} {'RUNNING':>8} {'FINISHED':>9} {'FAILED':>7}  CAMPAIGN")
+    for name, c in sorted(summary(conn, campaign).items()):
+        bad = c["finished"] - c["COMPLETED"] - c["UNKNOWN"]
+        print(f"{c['queued']:>7} {c['running']:>8} {c['finished']:>9} {bad:>7}  {name}")
+    if dirs:
+        sql = "SELECT id, state, final, dir FROM jobs"
+        rows = conn.execute(sql + (" WHERE campaign = ?" if campaign else "") + " ORDER BY submitted",
+                            (os.path.abspath(campaign),) if campaign else ())
+        for r in rows:
+            print(f"  {r['id']:>10} {(r['final'] or r['state']).lower():<10} {r['dir']}")
+
+# ─────────────────────────────────── submission ──────────────────────────────
+def submit(conn, dirs, script, campaign, limit=None, ttl=TTL):
+    """sbatch SCRIPT in every directory, throttled to LIMIT jobs in flight; return (submitted, failed)."""
+    ok = failed = 0
+    for d in dirs:
+        if limit:
+            wait_slot(conn, limit, ttl)
+        t = time.time()
+        try:
+            res = subprocess.run(["sbatch", script], cwd=d, capture_output=True, text=True)
+        except OSError as e:
+            print(f"  ✗ {d}: {e}")
+            failed += 1
+            continue
+        m = SUBMITTED_RE.search(res.stdout)
+        if res.returncode != 0 or not m:
+            print(f"  ✗ {d}: {(res.stderr or res.stdout).strip()}")
+            failed += 1
+            continue
+        record(conn, d, m.group(1), campaign)
+        emit("submit", os.path.abspath(d), t, t, 0, job=m.group(1))
+        print(f"  ✓ {d}: job {m.group(1)}")
+        ok += 1
+    return ok, failed
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("record", help="remember that DIR runs as JOBID")
+    p.add_argument("dir")
+    p.add_argument("job_id")
+    p.add_argument("--campaign", default=".")
+    p = sub.add_parser("status", help="queued/running/finished counts per campaign")
+    p.add_argument("--campaign")
+    p.add_argument("--dirs", action="store_true", help="also list every job")
+    p = sub.add_parser("wait", help="block until a submission slot is free")
+    p.add_argument("--max", type=int, required=True)
+    p = sub.add_parser("submit", help="throttled sbatch in every directory")
+    p.add_argument("dirs", nargs="+")
+    p.add_argument("--script", default="jobscript")
+    p.add_argument("--max", type=int, help="jobs in flight allowed (default: unlimited)")
+    p.add_argument("--campaign", default=".")
+    sub.add_parser("refresh", help="query the scheduler now")
+    for p in sub.choices.values():
+        p.add_argument("--ttl", type=float, default=TTL, help=f"seconds a queue snapshot is reused (default {TTL:g})")
+    args = ap.parse_args()
+
+    try:
+        conn = open_db()
+        if args.cmd == "record":
+            record(conn, args.dir, args.job_id, args.campaign)
+        elif args.cmd == "status":
+            refresh(conn, args.ttl)
+            print_status(conn, args.campaign, args.dirs)
+        elif args.cmd == "wait":
+            wait_slot(conn, args.max, args.ttl)
+        elif args.cmd == "submit":
+            ok, failed = submit(conn, args.dirs, args.script, args.campaign, args.max, args.ttl)
+            print(f"{'✅' if not failed else '⚠️ '} {ok} job(s) submitted, {failed} failed")
+            sys.exit(1 if failed else 0)
+        else:
+            refresh(conn, force=True)
+            print_status(conn)
+    except (OSError, sqlite3.Error, subprocess.CalledProcessError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+kpoints.py
+KPOINTS files without vaspkit: Γ-centred / Monkhorst-Pack meshes from a
+k-spacing (vaspkit task 102) and line-mode high-symmetry paths (task 303).
+
+The mesh is N_i = max(1, round(|b_i| / (2π · spacing))) with |b_i| the
+reciprocal lattice lengths including the 2π, spacing in units of 2π/Å as
+vaspkit asks for it.  Meshes are memoized on the reciprocal lattice, and an
+existing KPOINTS is only rewritten when the mesh or scheme actually changes,
+so calling this at the top of every relaxation iteration costs one POSCAR
+read.
+
+Usage
+-----
+kpoints.py mesh [TARGET ...] [--spacing 0.03] [--scheme gamma|mp] [-o KPOINTS]
+kpoints.py path [TARGET ...] [--npoints 20] [-o KPATH.in]
+
+TARGET is a POSCAR or a directory holding one (default: the current
+directory); the output is written next to it.  Several targets are handled
+in one process.
+
+Paths
+-----
+The path is chosen from the metric of the cell as given (no symmetry search):
+cubic, tetragonal, orthorhombic, hexagonal, and the fcc/bcc primitive cells
+get their Setyawan–Curtarolo paths; any other cell gets Γ to the three face
+centres.  Atomic basis symmetry is not considered, so a lower-symmetry
+structure in a cubic cell still gets the cubic path.
+"""
+import argparse
+import functools
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from vasp_io import read_poscar  # noqa: E402
+
+LEN_TOL = 1e-4       # relative, lattice lengths
+ANG_TOL = 1e-2       # degrees
+
+# ─────────────────────────────────── mesh ────────────────────────────────────
+def reciprocal(lattice):
+    """Rows are b_i with the 2π included (1/Å)."""
+    return 2 * math.pi * np.linalg.inv(lattice).T
+
+
+@functools.lru_cache(maxsize=1024)
+def _mesh(recip_lengths, spacing):
+    return tuple(max(1, int(b / (2 * math.pi * spacing) + 0.5)) for b in recip_lengths)
+
+
+def kmesh(lattice, spacing):
+    """Subdivisions along b1, b2, b3 for a k-spacing in units of 2π/Å."""
+    lengths = np.linalg.norm(reciprocal(lattice), axis=1)
+    return list(_mesh(tuple(np.round(lengths, 8)), float(spacing)))
+
+
+def mesh_text(mesh, spacing, scheme="gamma"):
+    style = "Monkhorst-Pack" if scheme == "mp" else "Gamma"
+    return (f"K-Spacing Value to Generate K-Mesh: {spacing:.3f}\n0\n{style}\n"
+            f"{mesh[0]:5d}{mesh[1]:5d}{mesh[2]:5d}\n    0.0    0.0    0.0\n")
+
+
+def read_mesh(path):
+    """(scheme, mesh) of an automatic-grid KPOINTS, or None for anything else."""
+    try:
+        lines = Path(path).read_text().splitlines()
+        if int(lines[1].split()[0]) != 0:
+            return None
+        scheme = {"G": "gamma", "M": "mp"}.get(lines[2].strip()[:1].upper())
+        mesh = [int(x) for x in lines[3].split()[:3]]
+        shift = [float(x) for x in lines[4].split()[:3]] if len(lines) > 4 else [0.0] * 3
+    except (OSError, ValueError, IndexError):
+        return None
+    if scheme is None or len(mesh) != 3 or any(shift):
+        return None
+    return scheme, mesh
+
+
+def write_mesh(poscar, out, spacing, scheme="gamma"):
+    """Write the mesh KPOINTS for POSCAR to OUT; return (mesh, changed)."""
+    mesh = kmesh(read_poscar(poscar).lattice, spacing)
+    if read_mesh(out) == (scheme, mesh):
+        return mesh, False
+    tmp = Path(out).with_name(f".{Path(out).name}.tmp")
+    tmp.write_text(mesh_text(mesh, spacing, scheme))
+    tmp.replace(out)
+    return mesh, True
+
+# ─────────────────────────────────── paths ───────────────────────────────────
+# Fractional coordinates (of the reciprocal vectors of the cell) and segments.
+PATHS = {
+    "cubic": ({"GAMMA": (0, 0, 0), "X": (0, .5, 0), "M": (.5, .5, 0), "R": (.5, .5, .5)},
+              ["GAMMA-X-M-GAMMA-R-X", "M-R"]),
+    "tetragonal": ({"GAMMA": (0, 0, 0), "X": (0, .5, 0), "M": (.5, .5, 0), "Z": (0, 0, .5),
+                    "R": (0, .5, .5), "A": (.5, .5, .5)},
+                   ["GAMMA-X-M-GAMMA-Z-R-A-Z", "X-R", "M-A"]),
+    "orthorhombic": ({"GAMMA": (0, 0, 0), "X": (.5, 0, 0), "Y": (0, .5, 0), "Z": (0, 0, .5),
+                      "S": (.5, .5, 0), "U": (.5, 0, .5), "T": (0, .5, .5), "R": (.5, .5, .5)},
+                     ["GAMMA-X-S-Y-GAMMA-Z-U-R-T-Z", "Y-T", "U-X", "S-R"]),
+    "hexagonal": ({"GAMMA": (0, 0, 0), "M": (.5, 0, 0), "K": (1 / 3, 1 / 3, 0), "A": (0, 0, .5),
+                   "L": (.5, 0, .5), "H": (1 / 3, 1 / 3, .5)},
+                  ["GAMMA-M-K-GAMMA-A-L-H-A", "L-M", "K-H"]),
+    "fcc": ({"GAMMA": (0, 0, 0), "X": (.5, 0, .5), "L": (.5, .5, .5), "W": (.5, .25, .75),
+             "U": (.625, .25, .625), "K": (.375, .375, .75)},
+            ["GAMMA-X-W-K-GAMMA-L-U-W-L-K", "U-X"]),
+    "bcc": ({"GAMMA": (0, 0, 0), "H": (.5, -.5, .5), "N": (0, 0, .5), "P": (.25, .25, .25)},
+            ["GAMMA-H-N-GAMMA-P-H", "P-N"]),
+    "generic": ({"GAMMA": (0, 0, 0), "X": (.5, 0, 0), "Y": (0, .5, 0), "Z": (0, 0, .5)},
+                ["X-GAMMA-Y", "GAMMA-Z"]),
+}
+
+
+def cell_parameters(lattice):
+    lengths = np.linalg.norm(lattice, axis=1)
+    angles = []
+    for i, j in ((1, 2), (0, 2), (0, 1)):
+        c = lattice[i] @ lattice[j] / (lengths[i] * lengths[j])
+        angles.append(math.degrees(math.acos(max(-1.0, min(1.0, c)))))
+    return lengths, np.array(angles)
+
+
+def lattice_type(lattice):
+    """(name, axis permutation) from the cell metric; see the module docstring."""
+    (a, b, c), ang = cell_parameters(lattice)
+    same = lambda x, y: abs(x - y) <= LEN_TOL * max(x, y)  # noqa: E731
+    angle = lambda i, v: abs(ang[i] - v) <= ANG_TOL       # noqa: E731
+    if all(angle(i, 90) for i in range(3)):
+        if same(a, b) and same(b, c):
+            return "cubic", (0, 1, 2)
+        for unique, perm in ((2, (0, 1, 2)), (0, (1, 2, 0)), (1, (2, 0, 1))):
+            others = [x for k, x in enumerate((a, b, c)) if k != unique]
+            if same(*others):
+                return "tetragonal", perm
+        return "orthorhombic", (0, 1, 2)
+    if same(a, b) and same(b, c):
+        if all(angle(i, 60) for i in range(3)):
+            return "fcc", (0, 1, 2)
+        if all(angle(i, math.degrees(math.acos(-1 / 3))) for i in range(3)):
+            return "bcc", (0, 1, 2)
+    for unique, perm in ((2, (0, 1, 2)), (0, (1, 2, 0)), (1, (2, 0, 1))):
+        i, j = [k for k in range(3) if k != unique]
+        lens = (a, b, c)
+        if same(lens[i], lens[j]) and angle(i, 90) and angle(j, 90) and angle(unique, 120):
+            return "hexagonal", perm
+    return "generic", (0, 1, 2)
+
+
+def kpath(lattice):
+    """(lattice type, [[(label, frac), (label, frac)], ...] segments)."""
+    name, perm = lattice_type(lattice)
+    points, routes = PATHS[name]
+
+    def place(frac):
+        out = [0.0, 0.0, 0.0]
+        for src, dst in enumerate(perm):
+            out[dst] = float(frac[src])
+        return tuple(out)
+
+    segments = []
+    for route in routes:
+        labels = route.split("-")
+        for start, end in zip(labels, labels[1:]):
+            segments.append([(start, place(points[start])), (end, place(points[end]))])
+    return name, segments
+
+
+def path_text(lattice, npoints=20):
+    name, segments = kpath(lattice)
+    lines = [f"K-Path ({name}) generated by kpoints.py", f"{npoints:5d}", "Line-Mode", "Reciprocal"]
+    for seg in segments:
+        for label, frac in seg:
+            lines.append("  " + "  ".join(f"{x:13.10f}" for x in frac) + f"     {label}")
+        lines.append("")
+    return name, "\n".join(lines)
+
+# ─────────────────────────────────── CLI ─────────────────────────────────────
+def resolve(target):
+    """(POSCAR path, directory) of a TARGET argument."""
+    p = Path(target)
+    return (p / "POSCAR", p) if p.is_dir() else (p, p.parent)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("mesh", help="automatic mesh from a k-spacing (vaspkit 102)")
+    p.add_argument("targets", nargs="*", default=["."])
+    p.add_argument("--spacing", type=float, default=0.03, help="in units of 2π/Å (default 0.03)")
+    p.add_argument("--scheme", choices=("gamma", "mp"), default="gamma")
+    p.add_argument("-o", "--output", default="KPOINTS", help="file name in each target directory")
+    p.add_argument("--quiet", action="store_true")
+    p = sub.add_parser("path", help="line-mode high-symmetry path (vaspkit 303)")
+    p.add_argument("targets", nargs="*", default=["."])
+    p.add_argument("--npoints", type=int, default=20, help="points per segment")
+    p.add_argument("-o", "--output", default="KPATH.in", help="file name in each target directory")
+    args = ap.parse_args()
+
+    failed = 0
+    for target in args.targets:
+        poscar, d = resolve(target)
+        out = d / args.output
+        try:
+            if args.cmd == "mesh":
+                mesh, changed = write_mesh(poscar, out, args.spacing, args.scheme)
+                if not args.quiet:
+                    mark = "✅" if changed else "♻️ "
+                    state = "written" if changed else "unchanged"
+                    print(f"{mark} {out}: {'×'.join(map(str, mesh))} {args.scheme} mesh {state}")
+            else:
+                name, text = path_text(read_poscar(poscar).lattice, args.npoints)
+                out.write_text(text)
+                print(f"✅ {out}: {name} path")
+        except (OSError, ValueError, IndexError) as e:
+            print(f"❌ {target}: {e}", file=sys.stderr)
+            failed += 1
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
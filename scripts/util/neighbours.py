@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+neighbours.py
+Periodic neighbour lists by cell lists, fully vectorized with numpy.
+
+Atoms are binned on a grid of cells at least `cutoff` high along every
+lattice direction, so only the surrounding cells are searched: O(N) for
+large supercells instead of the O(N²) all-pairs distance matrix.  Cells
+smaller than the cutoff are handled by searching as many image cells as
+needed, so the same call works for a 5-atom unit cell and a 10⁵-atom
+supercell.
+
+Usage
+-----
+neighbours.py POSCAR --cutoff 3.0 [--species A B]    # pair-distance summary
+
+Library
+-------
+neighbour_list(frac, lattice, cutoff) → NeighbourList with arrays
+    i, j      atom indices (every pair appears as i→j and j→i)
+    shift     integer lattice image of j (r_j + shift·L − r_i is the bond)
+    vec       bond vectors in Å
+    dist      bond lengths in Å
+"""
+import argparse
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from vasp_io import read_poscar  # noqa: E402
+
+
+@dataclass
+class NeighbourList:
+    i: np.ndarray
+    j: np.ndarray
+    shift: np.ndarray
+    vec: np.ndarray
+    dist: np.ndarray
+
+    def __len__(self):
+        return len(self.i)
+
+    def select(self, mask):
+        return NeighbourList(self.i[mask], self.j[mask], self.shift[mask],
+                             self.vec[mask], self.dist[mask])
+
+    def sorted(self):
+        """Pairs ordered by centre atom, then by distance."""
+        order = np.lexsort((self.dist, self.i))
+        return self.select(order)
+
+    def counts(self, natoms):
+        """Number of neighbours of every atom."""
+        return np.bincount(self.i, minlength=natoms)
+
+
+def cell_heights(lattice):
+    """Distance between opposite faces of the cell along each lattice direction (Å)."""
+    volume = abs(np.linalg.det(lattice))
+    cross = np.cross(lattice[[1, 2, 0]], lattice[[2, 0, 1]])
+    return volume / np.linalg.norm(cross, axis=1)
+
+
+def neighbour_list(frac, lattice, cutoff, self_images=True):
+    """All pairs closer than CUTOFF (Å) under periodic boundary conditions.
+
+    With SELF_IMAGES an atom is also paired with its own periodic images when
+    the cell is shorter than the cutoff.
+    """
+    frac = np.asarray(frac, dtype=np.float64) % 1.0
+    lattice = np.asarray(lattice, dtype=np.float64)
+    n = len(frac)
+    empty = NeighbourList(*(np.zeros(0, dtype=int) for _ in range(2)), np.zeros((0, 3), dtype=int),
+                          np.zeros((0, 3)), np.zeros(0))
+    if n == 0:
+        return empty
+
+    heights = cell_heights(lattice)
+    nbins = np.maximum(1, np.floor(heights / cutoff).astype(int))
+    reach = np.ceil(cutoff * nbins / heights).astype(int)          # bins to search each way
+    binidx = np.minimum((frac * nbins).astype(int), nbins - 1)
+    flat = np.ravel_multi_index(binidx.T, nbins)
+    order = np.argsort(flat, kind="stable")
+    nflat = int(np.prod(nbins))
+    counts = np.bincount(flat, minlength=nflat)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    cutoff2 = cutoff * cutoff
+    cart = frac @ lattice
+    out_i, out_j, out_s, out_v = [], [], [], []
+    atoms = np.arange(n)
+    for d in np.stack(np.meshgrid(*[np.arange(-r, r + 1) for r in reach], indexing="ij"), -1).reshape(-1, 3):
+        target = binidx + d
+        shift = np.floor_divide(target, nbins)                     # image of the neighbour bin
+        wrapped = target - shift * nbins
+        tflat = np.ravel_multi_index(wrapped.T, nbins)
+        c = counts[tflat]
+        total = int(c.sum())
+        if total == 0:
+            continue
+        ii = np.repeat(atoms, c)
+        offset = np.arange(total) - np.repeat(np.cumsum(c) - c, c)
+        jj = order[np.repeat(starts[tflat], c) + offset]
+        ss = np.repeat(shift, c, axis=0)
+        vec = cart[jj] - cart[ii] + ss @ lattice
+        d2 = np.einsum("ij,ij->i", vec, vec)
+        keep = d2 < cutoff2
+        keep &= ~((ii == jj) & ~ss.any(axis=1))                    # the atom itself
+        if not self_images:
+            keep &= ii != jj
+        out_i.append(ii[keep]); out_j.append(jj[keep])
+        out_s.append(ss[keep]); out_v.append(vec[keep])
+    if not out_i:
+        return empty
+    vec = np.concatenate(out_v)
+    return NeighbourList(np.concatenate(out_i), np.concatenate(out_j), np.concatenate(out_s),
+                         vec, np.sqrt(np.einsum("ij,ij->i", vec, vec)))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("poscar")
+    ap.add_argument("--cutoff", type=float, default=3.0, help="Å (default 3.0)")
+    ap.add_argument("--species", nargs=2, metavar=("A", "B"), help="only A–B pairs")
+    args = ap.parse_args()
+
+    try:
+        p = read_poscar(args.poscar)
+    except (OSError, ValueError, IndexError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    nl = neighbour_list(p.frac, p.lattice, args.cutoff)
+    elems = p.elements
+    if args.species:
+        a, b = args.species
+        nl = nl.select((elems[nl.i] == a) & (elems[nl.j] == b))
+    print(f"📋 {args.poscar}: {p.natoms} atoms, {len(nl)} directed pairs within {args.cutoff} Å")
+    species = np.unique(elems, return_inverse=True)[1]
+    names = list(dict.fromkeys(elems))
+    order = {s: k for k, s in enumerate(sorted(set(elems)))}
+    si, sj = species[nl.i], species[nl.j]
+    for a in names:
+        for b in names[names.index(a):]:
+            d = nl.dist[(si == order[a]) & (sj == order[b])]
+            if len(d):
+                print(f"  {a}–{b}: {len(d):7d}  min {d.min():.4f}  mean {d.mean():.4f}  max {d.max():.4f} Å")
+
+
+if __name__ == "__main__":
+    main()
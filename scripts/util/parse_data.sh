@@ -66,20 +66,10 @@ get_lengths() {
         return 1
     fi
 
-    # Use Python parser for reliable POSCAR parsing
-    local python_script="$HOME/scripts/util/parse_poscar.py"
-    
-    if [[ ! -f "$python_script" ]]; then
-        echo -e "❌ ERROR: Python parser not found at $python_script"
-        a_len="NA"; b_len="NA"; c_len="NA"
-        return 1
-    fi
-
-    # Call Python parser
-    if result=$(python3 "$python_script" "$f" 2>/dev/null); then
-        a_len=$(echo "$result" | awk '{print $1}')
-        b_len=$(echo "$result" | awk '{print $2}')
-        c_len=$(echo "$result" | awk '{print $3}')
+    # Lengths of all structure files are parsed up front in one Python
+    # process (see LENGTHS below)
+    if [[ -n "${LENGTHS[$f]:-}" ]]; then
+        IFS=" " read -r a_len b_len c_len <<< "${LENGTHS[$f]}"
         echo "Lattice lengths: A=${a_len} Å, B=${b_len} Å, C=${c_len} Å"
         return 0
     else
@@ -89,6 +79,9 @@ get_lengths() {
     fi
 }
 
+source "$HOME/scripts/util/events.sh"
+ev_start harvest
+
 # Discover OUTCARs
 outcar_dirs=()
 while IFS= read -r -d '' dir; do
@@ -115,6 +108,17 @@ mkdir -p "$out_dir"
 (( COPY_XML )) && mkdir -p "$out_dir/vasprun"
 out_abs="$(pwd)/$out_dir"
 
+# Lattice lengths of every POSCAR/CONTCAR, read in a single Python call
+declare -A LENGTHS
+while IFS=$'\t' read -r f a b c; do
+    LENGTHS["$f"]="$a $b $c"
+done < <(
+    for d in "${outcar_dirs[@]}"; do
+        d="${d#./}"; [[ -z "$d" ]] && d="."
+        for s in POSCAR CONTCAR; do [[ -f "$d/$s" ]] && printf '%s\n' "$d/$s"; done
+    done | python3 "$HOME/scripts/util/vtools.py" lengths 2>/dev/null
+)
+
 echo -e "Directory\tA(Å)\tB(Å)\tC(Å)\tEnergy(eV)" > "$out_abs/energies.dat"
 mag_file="$out_abs/magnetization.dat"; : > "$mag_file"
 atom_counts_file="$out_abs/atom_counts.dat"; : > "$atom_counts_file"
@@ -275,6 +279,13 @@ for calc_dir in "${outcar_dirs[@]}"; do
     fi
 done
 
+# Binary, memory-mappable copy of the results (per-atom s/p/d/tot moments as arrays)
+store_args=(build "$out_abs")
+(( IS_RELAX )) && store_args+=(--relax)
+if ! python3 "$HOME/scripts/util/results_store.py" "${store_args[@]}"; then
+    echo -e "${RED}⚠ Binary results could not be written${RESET}"
+fi
+
 summary="$out_abs/convergence_summary.txt"
 {
     echo "Convergence summary  ($FUNC, $CALC)"
@@ -293,14 +304,18 @@ echo -e "${GREEN}\n✓ Finished gathering results for ${FUNC}/${CALC}${RESET}"
 echo -e "   → Energy         : ${CYAN}$out_abs/energies.dat${RESET}"
 echo -e "   → Magnetization  : ${CYAN}$mag_file${RESET}"
 echo -e "   → Atom counts    : ${CYAN}$atom_counts_file${RESET}"
+echo -e "   → Arrays         : ${CYAN}$out_abs/arrays/${RESET}"
 echo -e "   → Summary        : ${CYAN}$summary${RESET}"
 (( COPY_XML )) && echo -e "   → vasprun.xml    : ${CYAN}$out_abs/vasprun/${RESET}"
 
-if tar -zcf "${out_abs}.tar.gz" -C "$(dirname "$out_abs")" "$(basename "$out_abs")"; then
+# Seekable .tar.gz (one gzip member per file) plus .tar.gz.idx, so single
+# files can be read back with result_archive.py cat without extracting
+if python3 "$HOME/scripts/util/result_archive.py" pack "$out_abs" > /dev/null; then
     echo -e "   📦 Archived      : ${CYAN}${out_abs}.tar.gz${RESET}"
 else
     echo -e "${RED}   ⚠ Archive creation failed${RESET}"
 fi
 
+ev_end harvest "$PWD" $(( ${#failed[@]} > 0 )) "$(ev_bytes "${out_abs}.tar.gz")"
 shopt -u nullglob
 exit 0
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+result_archive.py
+Seekable .tar.gz archives of parse_data.sh result folders.
+
+Every tar member (header + data) is written as its own gzip member.  A chain
+of gzip members is still one valid gzip stream, so `tar -zxf` reads the
+archive as usual.  The byte offset of each member goes into ARCHIVE.idx, so
+one member can be read by decompressing only its own bytes.
+
+Usage
+-----
+result_archive.py pack   DIR [-o ARCHIVE]      # default ARCHIVE = DIR.tar.gz
+result_archive.py repack ARCHIVE [ARCHIVE ...] # convert plain tarballs in place
+result_archive.py ls     ARCHIVE
+result_archive.py cat    ARCHIVE MEMBER        # MEMBER relative to the top folder
+result_archive.py extract ARCHIVE MEMBER [MEMBER ...] [-d DIR]
+
+Index format (ARCHIVE.idx, tab separated)
+-----------------------------------------
+name  size  offset  length     – offset/length of the member's gzip bytes
+"""
+import argparse
+import io
+import os
+import sys
+import tarfile
+import zlib
+from pathlib import Path
+
+INDEX_SUFFIX = ".idx"
+BLOCK = tarfile.BLOCKSIZE
+CHUNK = 1 << 20
+
+# ─────────────────────────────────── writing ─────────────────────────────────
+class _MemberWriter:
+    """Write each tar member as an independent gzip member and record offsets."""
+
+    def __init__(self, path, level=6):
+        self.f = open(path, "wb")
+        self.level = level
+        self.index = []
+
+    def _start(self):
+        return self.f.tell(), zlib.compressobj(self.level, zlib.DEFLATED, 31)
+
+    def _finish(self, name, size, start, z):
+        self.f.write(z.flush())
+        self.index.append((name, size, start, self.f.tell() - start))
+
+    def add(self, info, fileobj=None):
+        start, z = self._start()
+        self.f.write(z.compress(info.tobuf(tarfile.PAX_FORMAT)))
+        if fileobj is not None:
+            remaining = info.size
+            while remaining:
+                buf = fileobj.read(min(CHUNK, remaining))
+                if not buf:
+                    raise OSError(f"{info.name}: file shrank while archiving")
+                self.f.write(z.compress(buf))
+                remaining -= len(buf)
+            pad = -info.size % BLOCK
+            if pad:
+                self.f.write(z.compress(b"\0" * pad))
+        self._finish(info.name, info.size if info.isreg() else 0, start, z)
+
+    def close(self):
+        start, z = self._start()
+        self.f.write(z.compress(b"\0" * (2 * BLOCK)))      # end-of-archive
+        self.f.write(z.flush())
+        self.f.close()
+
+
+def write_index(archive, index):
+    tmp = f"{archive}{INDEX_SUFFIX}.tmp"
+    with open(tmp, "w") as f:
+        f.write("# name\tsize\toffset\tlength\n")
+        for name, size, off, length in index:
+            f.write(f"{name}\t{size}\t{off}\t{length}\n")
+    os.replace(tmp, f"{archive}{INDEX_SUFFIX}")
+
+
+def pack(directory, archive=None, level=6):
+    """Archive DIRECTORY as a seekable .tar.gz with an index; return the archive path."""
+    directory = Path(directory).resolve()
+    archive = Path(archive) if archive else directory.with_name(directory.name + ".tar.gz")
+    tmp = archive.with_name(archive.name + ".tmp")
+    w = _MemberWriter(tmp, level)
+    try:
+        paths = [directory] + sorted(directory.rglob("*"))
+        for p in paths:
+            arcname = str(p.relative_to(directory.parent))
+            info = tarfile.TarInfo(arcname)
+            st = p.lstat()
+            info.mtime, info.mode = int(st.st_mtime), st.st_mode & 0o7777
+            if p.is_symlink():
+                info.type, info.linkname = tarfile.SYMTYPE, os.readlink(p)
+                w.add(info)
+            elif p.is_dir():
+                info.type = tarfile.DIRTYPE
+                w.add(info)
+            else:
+                info.size = st.st_size
+                with open(p, "rb") as f:
+                    w.add(info, f)
+    finally:
+        w.close()
+    os.replace(tmp, archive)
+    write_index(archive, w.index)
+    return archive
+
+
+def repack(archive, level=6):
+    """Rewrite a plain (single-stream) tarball in the seekable layout."""
+    archive = Path(archive)
+    tmp = archive.with_name(archive.name + ".tmp")
+    w = _MemberWriter(tmp, level)
+    try:
+        with tarfile.open(archive, "r|*") as src:
+            for info in src:
+                w.add(info, src.extractfile(info) if info.isreg() else None)
+    finally:
+        w.close()
+    os.replace(tmp, archive)
+    write_index(archive, w.index)
+    return archive
+
+# ─────────────────────────────────── reading ─────────────────────────────────
+def read_index(archive):
+    """Return {name: (size, offset, length)}; raise OSError when no index exists."""
+    out = {}
+    with open(f"{archive}{INDEX_SUFFIX}") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            name, size, off, length = line.rstrip("\n").split("\t")
+            out[name] = (int(size), int(off), int(length))
+    return out
+
+
+def resolve(index, member):
+    """Match MEMBER against index names, with or without the top folder."""
+    if member in index:
+        return member
+    hits = [n for n in index if n.split("/", 1)[-1] == member]
+    if len(hits) != 1:
+        raise KeyError(member)
+    return hits[0]
+
+
+def read_member(archive, member, index=None):
+    """Return the bytes of one archive member, decompressing only that member."""
+    index = index or read_index(archive)
+    name = resolve(index, member)
+    _, off, length = index[name]
+    with open(archive, "rb") as f:
+        f.seek(off)
+        raw = zlib.decompress(f.read(length), 31)
+    with tarfile.open(fileobj=io.BytesIO(raw), mode="r:") as t:
+        info = t.next()
+        return t.extractfile(info).read()
+
+
+def read_text(archive, member, index=None):
+    return read_member(archive, member, index).decode()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("pack")
+    p.add_argument("directory")
+    p.add_argument("-o", "--output")
+    p = sub.add_parser("repack")
+    p.add_argument("archives", nargs="+")
+    p = sub.add_parser("ls")
+    p.add_argument("archive")
+    p = sub.add_parser("cat")
+    p.add_argument("archive")
+    p.add_argument("member")
+    p = sub.add_parser("extract")
+    p.add_argument("archive")
+    p.add_argument("members", nargs="+")
+    p.add_argument("-d", "--dest", default=".")
+    args = ap.parse_args()
+
+    try:
+        if args.cmd == "pack":
+            out = pack(args.directory, args.output)
+            print(f"📦 {out} ({len(read_index(out))} members indexed)")
+        elif args.cmd == "repack":
+            for a in args.archives:
+                repack(a)
+                print(f"📦 {a} re-packed ({len(read_index(a))} members indexed)")
+        elif args.cmd == "ls":
+            for name, (size, _, length) in read_index(args.archive).items():
+                print(f"{size:>12}  {length:>10}  {name}")
+        elif args.cmd == "cat":
+            sys.stdout.buffer.write(read_member(args.archive, args.member))
+        else:
+            index = read_index(args.archive)
+            for m in args.members:
+                dest = Path(args.dest) / resolve(index, m)
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                dest.write_bytes(read_member(args.archive, m, index))
+                print(f"✅ {dest}")
+    except FileNotFoundError as e:
+        hint = " (no index – run result_archive.py repack first)" if str(e.filename).endswith(INDEX_SUFFIX) else ""
+        print(f"❌ {e.filename}: not found{hint}", file=sys.stderr)
+        sys.exit(1)
+    except KeyError as e:
+        print(f"❌ {args.archive}: no unique member {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+results_store.py
+Binary, memory-mappable companion to the text files parse_data.sh writes.
+
+build – read OUT_DIR/energies.dat (written by parse_data.sh) and, for every
+        directory listed there, the final magnetization block of its OUTCAR
+        and the species counts of its structure file, then write one .npy per
+        column into OUT_DIR/arrays/
+show  – print a short summary of a stored result set
+
+Usage
+-----
+results_store.py build OUT_DIR [--base DIR] [--relax]
+results_store.py show  OUT_DIR
+
+Layout of OUT_DIR/arrays/
+-------------------------
+directory.npy   (N,)            calculation directory names
+lattice.npy     (N, 3)          A, B, C lengths in Å
+energy.npy      (N,)            final energies in eV
+natoms.npy      (N,)            atoms per calculation
+species.npy     (N,)            formula string (e.g. Sr1Ti1O3)
+moments.npy     (N, Amax, k)    per-atom moments, NaN padded; columns in meta.json
+meta.json                       column labels and species index ranges
+
+Each .npy is read with np.load(..., mmap_mode="r"), so loading a result set
+only maps the files; nothing is parsed.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from vasp_io import read_poscar, read_outcar_magnetization  # noqa: E402
+
+ARRAY_DIR = "arrays"
+MOMENT_ORDER = ["s", "p", "d", "f", "tot"]
+
+# ─────────────────────────────────── build ───────────────────────────────────
+def read_energies(path):
+    """Return rows of energies.dat as (directory, a, b, c, energy)."""
+    rows = []
+    with open(path) as f:
+        next(f, None)                      # header
+        for line in f:
+            parts = line.split("\t")
+            if len(parts) < 5:
+                continue
+            d, *vals = (p.strip() for p in parts[:5])
+            try:
+                rows.append((d, *map(float, vals)))
+            except ValueError:
+                continue
+    return rows
+
+
+def build(out_dir, base=".", relax=False):
+    out_dir, base = Path(out_dir), Path(base)
+    rows = read_energies(out_dir / "energies.dat")
+    if not rows:
+        raise ValueError(f"{out_dir}/energies.dat has no data rows")
+
+    blocks, natoms, species, labels = [], [], [], set()
+    ranges = None
+    for d, *_ in rows:
+        calc = base / d
+        struct = calc / "CONTCAR" if relax and (calc / "CONTCAR").is_file() else calc / "POSCAR"
+        try:
+            p = read_poscar(struct)
+            natoms.append(p.natoms)
+            species.append("".join(f"{s}{n}" for s, n in zip(p.symbols, p.counts)))
+            if ranges is None:
+                ends = np.cumsum(p.counts)
+                ranges = {s: [int(e - n + 1), int(e)] for s, n, e in zip(p.symbols, p.counts, ends)}
+        except (OSError, ValueError, IndexError):
+            natoms.append(0)
+            species.append("")
+        mag = read_outcar_magnetization(calc / "OUTCAR") if (calc / "OUTCAR").is_file() else None
+        blocks.append(mag)
+        if mag is not None:
+            labels.update(mag[0])
+
+    columns = [c for c in MOMENT_ORDER if c in labels]
+    amax = max([len(b[1]) for b in blocks if b is not None] + natoms + [0])
+    moments = np.full((len(rows), amax, len(columns)), np.nan, dtype=np.float32)
+    for i, b in enumerate(blocks):
+        if b is None:
+            continue
+        lab, arr = b
+        for j, c in enumerate(columns):
+            if c in lab:
+                moments[i, :len(arr), j] = arr[:, lab.index(c)]
+
+    arrays = out_dir / ARRAY_DIR
+    arrays.mkdir(exist_ok=True)
+    np.save(arrays / "directory.npy", np.array([r[0] for r in rows]))
+    np.save(arrays / "lattice.npy", np.array([r[1:4] for r in rows]))
+    np.save(arrays / "energy.npy", np.array([r[4] for r in rows]))
+    np.save(arrays / "natoms.npy", np.array(natoms, dtype=np.int32))
+    np.save(arrays / "species.npy", np.array(species))
+    np.save(arrays / "moments.npy", moments)
+    meta = {"moment_columns": columns, "species_ranges": ranges or {},
+            "n_calcs": len(rows), "n_with_moments": sum(b is not None for b in blocks)}
+    (arrays / "meta.json").write_text(json.dumps(meta, indent=1))
+    return meta
+
+# ─────────────────────────────────── load ────────────────────────────────────
+def load(out_dir):
+    """Return a dict of memory-mapped arrays plus 'meta' for one result set."""
+    arrays = Path(out_dir) / ARRAY_DIR
+    res = {p.stem: np.load(p, mmap_mode="r") for p in arrays.glob("*.npy")}
+    res["meta"] = json.loads((arrays / "meta.json").read_text())
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("build")
+    p.add_argument("out_dir")
+    p.add_argument("--base", default=".", help="directory the energies.dat paths are relative to")
+    p.add_argument("--relax", action="store_true", help="read species from CONTCAR")
+    p = sub.add_parser("show")
+    p.add_argument("out_dir")
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        try:
+            meta = build(args.out_dir, args.base, args.relax)
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Binary results: {meta['n_calcs']} calculations, "
+              f"{meta['n_with_moments']} with moments ({' '.join(meta['moment_columns'])})")
+        return
+
+    res = load(args.out_dir)
+    print(f"{len(res['directory'])} calculations, moments {res['moments'].shape}, "
+          f"columns {res['meta']['moment_columns']}")
+    for d, e in zip(res["directory"], res["energy"]):
+        print(f"  {d}\t{e:.6f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+scratch_manager.py
+Report and prune scratch usage of a calculation tree in one parallel scan.
+
+report  – bytes by file type and the largest calculation directories
+prune   – apply the storage rules below (dry run unless --apply)
+restore – decompress files prune compressed
+
+Rules
+-----
+• WAVECAR       deleted once the calculation finished, unless a pending chain
+                step (chain_vasp_jobscript.sh FILES_TO_COPY) or a symlink from
+                an unfinished follow-up calculation still needs it
+• CHGCAR        compressed once finished, with the same exceptions
+• vasprun.xml   compressed once finished
+• CHG, XDATCAR  deleted once finished and harvested (the directory is listed
+                in an energies.dat written by parse_data.sh next to it)
+
+A calculation counts as finished when it has a COMPLETED marker or its
+OUTCAR carries the timing footer.  Compression uses zstd -T0 when
+available, then pigz, then Python's gzip.
+
+Usage
+-----
+scratch_manager.py report  [ROOT] [--top 20]
+scratch_manager.py prune   [ROOT] [--only NAME ...] [--apply]
+scratch_manager.py restore PATH [PATH ...]
+"""
+import argparse
+import gzip
+import os
+import re
+import shutil
+import subprocess
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from vasp_io import outcar_finished  # noqa: E402
+
+WORKERS = 16
+TRACKED = ("WAVECAR", "CHGCAR", "CHG", "vasprun.xml", "OUTCAR", "XDATCAR",
+           "PROCAR", "DOSCAR", "EIGENVAL", "LOCPOT", "ELFCAR")
+RULES = {
+    "WAVECAR": "delete",
+    "CHGCAR": "compress",
+    "vasprun.xml": "compress",
+    "CHG": "delete_harvested",
+    "XDATCAR": "delete_harvested",
+}
+CHAIN_SCRIPT = "chain_vasp_jobscript.sh"
+COMPRESSED = (".zst", ".gz")
+
+# ─────────────────────────────────── scan ────────────────────────────────────
+def _walk(top):
+    """Return (files, symlink targets, chain scripts) below TOP."""
+    files, links, chains = [], [], []
+    stack = [top]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    if e.is_symlink():
+                        try:
+                            links.append((d, os.path.realpath(e.path)))
+                        except OSError:
+                            pass
+                    elif e.is_dir():
+                        stack.append(e.path)
+                    elif e.is_file():
+                        files.append((d, e.name, e.stat().st_size))
+                        if e.name == CHAIN_SCRIPT:
+                            chains.append(e.path)
+        except OSError:
+            continue
+    return files, links, chains
+
+
+def scan(root):
+    """Scan ROOT with one walker per top-level entry; merge the results."""
+    root = os.path.abspath(root)
+    tops, files = [], []
+    with os.scandir(root) as it:
+        for e in it:
+            if e.is_dir(follow_symlinks=False):
+                tops.append(e.path)
+            elif e.is_file(follow_symlinks=False):
+                files.append((root, e.name, e.stat().st_size))
+    links, chains = [], []
+    with ThreadPoolExecutor(WORKERS) as pool:
+        for f, lk, c in pool.map(_walk, tops):
+            files += f
+            links += lk
+            chains += c
+    return files, links, chains
+
+
+def file_type(name):
+    base = name
+    for ext in COMPRESSED:
+        if base.endswith(ext):
+            base = base[:-len(ext)]
+    return base if base in TRACKED else "other"
+
+# ─────────────────────────────────── state ───────────────────────────────────
+def finished(d, names):
+    if "COMPLETED" in names:
+        return True
+    return "OUTCAR" in names and outcar_finished(os.path.join(d, "OUTCAR"))
+
+
+def chain_needs(chains):
+    """Return {directory: set(files)} still needed by unfinished chain steps."""
+    need = defaultdict(set)
+    for script in chains:
+        text = Path(script).read_text(errors="replace")
+        dirs = re.search(r"^DIRS=\((.*)\)", text, re.M)
+        copy = re.search(r"^FILES_TO_COPY=\((.*)\)", text, re.M)
+        if not dirs or not copy:
+            continue
+        dirs = re.findall(r'"([^"]*)"', dirs.group(1))
+        files = set(re.findall(r'"([^"]*)"', copy.group(1)))
+        base = os.path.dirname(script)
+        for i in range(1, len(dirs)):
+            if not os.path.exists(os.path.join(base, dirs[i], "COMPLETED")):
+                need[os.path.normpath(os.path.join(base, dirs[i - 1]))] |= files
+    return need
+
+
+def harvested_dirs(parents):
+    """Return the set of calculation directories listed in a nearby energies.dat."""
+    out = set()
+    for parent in parents:
+        for ed in Path(parent).glob("*/energies.dat"):
+            with open(ed) as f:
+                next(f, None)
+                for line in f:
+                    name = line.split("\t", 1)[0].strip()
+                    if name:
+                        out.add(os.path.normpath(os.path.join(parent, name)))
+    return out
+
+
+def plan(root, only=None):
+    """Return (actions, files) where actions are (action, path, size, reason)."""
+    files, links, chains = scan(root)
+    by_dir = defaultdict(set)
+    for d, name, _ in files:
+        by_dir[d].add(name)
+
+    done = {d: finished(d, names) for d, names in by_dir.items()
+            if "OUTCAR" in names or "COMPLETED" in names}
+    need = chain_needs(chains)
+    linked = {target for src_dir, target in links if not done.get(src_dir, False)}
+    harvested = harvested_dirs({os.path.dirname(d) for d in done})
+
+    actions = []
+    for d, name, size in files:
+        rule = RULES.get(name)
+        if rule is None or (only and name not in only):
+            continue
+        path = os.path.join(d, name)
+        if not done.get(d, False):
+            continue
+        if name in need.get(d, ()) or path in linked:
+            continue
+        if rule == "delete":
+            actions.append(("delete", path, size, "finished"))
+        elif rule == "compress":
+            actions.append(("compress", path, size, "finished"))
+        elif rule == "delete_harvested" and os.path.normpath(d) in harvested:
+            actions.append(("delete", path, size, "harvested"))
+    return actions, files
+
+# ─────────────────────────────────── codecs ──────────────────────────────────
+def codec():
+    if shutil.which("zstd"):
+        return ".zst", lambda p: ["zstd", "-q", "-T0", "--rm", "-f", p]
+    if shutil.which("pigz"):
+        return ".gz", lambda p: ["pigz", "-f", p]
+    return ".gz", None
+
+
+def compress(path):
+    ext, cmd = codec()
+    if cmd:
+        subprocess.run(cmd(path), check=True)
+    else:
+        with open(path, "rb") as src, gzip.open(path + ext, "wb", compresslevel=1) as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        os.remove(path)
+    return path + ext
+
+
+def restore(path):
+    """Decompress PATH (.zst or .gz) next to itself and remove the archive."""
+    if path.endswith(".zst"):
+        subprocess.run(["zstd", "-q", "-d", "--rm", "-f", path], check=True)
+    elif path.endswith(".gz"):
+        with gzip.open(path, "rb") as src, open(path[:-3], "wb") as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        os.remove(path)
+    else:
+        raise ValueError(f"{path}: not a compressed file")
+    return path.rsplit(".", 1)[0]
+
+
+def human(n):
+    for unit in ("B", "K", "M", "G", "T"):
+        if n < 1024 or unit == "T":
+            return f"{n:.1f}{unit}"
+        n /= 1024
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("report")
+    p.add_argument("root", nargs="?", default=".")
+    p.add_argument("--top", type=int, default=20)
+    p = sub.add_parser("prune")
+    p.add_argument("root", nargs="?", default=".")
+    p.add_argument("--only", nargs="+", help="restrict to these file names (e.g. WAVECAR)")
+    p.add_argument("--apply", action="store_true", help="perform the actions (default: dry run)")
+    p = sub.add_parser("restore")
+    p.add_argument("paths", nargs="+")
+    args = ap.parse_args()
+
+    if args.cmd == "restore":
+        missing = [p for p in args.paths if not os.path.isfile(p)]
+        if missing:
+            print(f"❌ Not found: {' '.join(missing)}")
+            sys.exit(1)
+        with ThreadPoolExecutor(WORKERS) as pool:
+            for out in pool.map(restore, args.paths):
+                print(f"♻️  {out}")
+        return
+
+    if args.cmd == "report":
+        files, _, _ = scan(args.root)
+        by_type, by_dir = defaultdict(int), defaultdict(int)
+        for d, name, size in files:
+            by_type[file_type(name)] += size
+            by_dir[d] += size
+        print(f"Total: {human(sum(by_type.values()))} in {len(files)} files\n")
+        print("By file type:")
+        for t, n in sorted(by_type.items(), key=lambda kv: -kv[1]):
+            print(f"  {t:<12} {human(n):>8}")
+        print(f"\nLargest {args.top} directories:")
+        for d, n in sorted(by_dir.items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"  {human(n):>8}  {os.path.relpath(d, args.root)}")
+        return
+
+    actions, _ = plan(args.root, set(args.only) if args.only else None)
+    if not actions:
+        print("Nothing to prune.")
+        return
+    totals = defaultdict(int)
+    for act, path, size, reason in actions:
+        totals[act] += size
+        print(f"  {act:<8} {human(size):>8}  {os.path.relpath(path, args.root)}  ({reason})")
+    print("\n" + ", ".join(f"{a}: {human(n)}" for a, n in totals.items()))
+    if not args.apply:
+        print("(dry run – rerun with --apply)")
+        return
+
+    def run(action):
+        act, path, _, _ = action
+        if act == "delete":
+            os.remove(path)
+        else:
+            compress(path)
+
+    with ThreadPoolExecutor(WORKERS) as pool:
+        list(pool.map(run, actions))
+    print(f"✅ {len(actions)} files processed")
+
+
+if __name__ == "__main__":
+    main()
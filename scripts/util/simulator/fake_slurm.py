@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+fake_slurm.py
+Minimal local SLURM for dry runs: sbatch/squeue/scancel plus a runner that
+executes queued jobscripts with a concurrency limit, and the PATH shims
+(sbatch, ibrun, vasp_std, vaspkit, module, ...) that point the repo's
+scripts at the simulators in this directory.
+
+Usage
+-----
+fake_slurm.py shims DIR                 # write the shims; then export PATH=DIR:$PATH
+fake_slurm.py sbatch SCRIPT [ARGS]      # what the sbatch shim runs
+fake_slurm.py squeue [-h] [-o FMT] [-j IDS] [-u USER]   # pending/running jobs
+fake_slurm.py sacct -j IDS [-o JobID,State] [-n] [-P] [-X]  # end state of finished jobs
+fake_slurm.py scancel ID ...
+fake_slurm.py drain [--max-running N]   # run every queued job, wait for all
+
+Environment
+-----------
+FAKE_SLURM_DIR   job state directory           (default ~/.fake_slurm)
+FAKE_SBATCH      queue | run | background      (default queue)
+                 queue       – record the job; `drain` runs it later
+                 run         – run it before sbatch returns
+                 background  – start it detached right away
+
+State is one JSON file per job in FAKE_SLURM_DIR/{pending,running,done}/,
+moved between the folders with os.replace, so concurrent sbatch calls and
+runners never share a file.
+"""
+import argparse
+import fcntl
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+STATES = ("pending", "running", "done")
+
+# ─────────────────────────────────── state ───────────────────────────────────
+def state_dir():
+    root = Path(os.environ.get("FAKE_SLURM_DIR", Path.home() / ".fake_slurm"))
+    for s in STATES:
+        (root / s).mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def next_job_id(root):
+    with open(root / "last_id", "a+") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        last = int(f.read().strip() or 1000)
+        f.seek(0); f.truncate()
+        f.write(str(last + 1))
+    return last + 1
+
+
+def write_job(path, job):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(job))
+    os.replace(tmp, path)
+
+
+def sbatch_options(script):
+    """#SBATCH -J/-o/-e/-n values of a jobscript (short and long forms)."""
+    opts = {}
+    keys = {"-J": "name", "--job-name": "name", "-o": "out", "--output": "out",
+            "-e": "err", "--error": "err", "-n": "ntasks", "--ntasks": "ntasks"}
+    for line in Path(script).read_text(errors="replace").splitlines():
+        m = re.match(r"#SBATCH\s+(--?[\w-]+)(?:[=\s]+(\S+))?", line)
+        if m and m.group(1) in keys and m.group(2):
+            opts[keys[m.group(1)]] = m.group(2)
+    return opts
+
+# ─────────────────────────────────── commands ────────────────────────────────
+def sbatch(script, args):
+    root = state_dir()
+    jid = next_job_id(root)
+    opts = sbatch_options(script)
+    out = opts.get("out", "slurm-%j.out").replace("%j", str(jid))
+    job = {"id": jid, "name": opts.get("name", Path(script).name), "dir": os.getcwd(),
+           "script": str(Path(script).resolve()), "args": args, "out": out,
+           "err": opts.get("err", out).replace("%j", str(jid)),
+           "ntasks": opts.get("ntasks", "1"), "submit": time.time()}
+    write_job(root / "pending" / f"{jid}.json", job)
+    print(f"Submitted batch job {jid}", flush=True)
+
+    mode = os.environ.get("FAKE_SBATCH", "queue")
+    if mode == "run":
+        execute(root, jid)
+    elif mode == "background":
+        subprocess.Popen([sys.executable, __file__, "_exec", str(jid)], start_new_session=True,
+                         stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return 0
+
+
+def execute(root, jid):
+    """Run pending job JID to completion; return its exit status (None if it was taken)."""
+    src = root / "pending" / f"{jid}.json"
+    run = root / "running" / f"{jid}.json"
+    try:
+        os.replace(src, run)                              # claim the job
+    except FileNotFoundError:
+        return None
+    job = json.loads(run.read_text())
+    job["start"] = time.time()
+    write_job(run, job)
+
+    env = dict(os.environ, SLURM_JOB_ID=str(jid), SLURM_JOB_NAME=job["name"],
+               SLURM_SUBMIT_DIR=job["dir"], SLURM_NTASKS=str(job["ntasks"]))
+    cwd = Path(job["dir"])
+    with open(cwd / job["out"], "w") as out:
+        err = out if job["err"] == job["out"] else open(cwd / job["err"], "w")
+        try:
+            rc = subprocess.call(["bash", job["script"], *job["args"]], cwd=cwd, env=env,
+                                 stdin=subprocess.DEVNULL, stdout=out, stderr=err)
+        finally:
+            if err is not out:
+                err.close()
+
+    job.update(end=time.time(), status=rc)
+    write_job(root / "done" / f"{jid}.json", job)
+    run.unlink()
+    return rc
+
+
+def pending_ids(root):
+    return sorted(int(p.stem) for p in (root / "pending").glob("*.json"))
+
+
+def drain(max_running):
+    """Run queued jobs (also those queued meanwhile) until none are left."""
+    root = state_dir()
+    ran = failed = 0
+    with ThreadPoolExecutor(max(1, max_running)) as pool:
+        while True:
+            ids = pending_ids(root)
+            if not ids:
+                break
+            for rc in pool.map(lambda j: execute(root, j), ids):
+                if rc is not None:
+                    ran += 1
+                    failed += rc != 0
+    return ran, failed
+
+
+SQUEUE_FIELDS = {"i": "id", "j": "name", "T": "state", "t": "code", "M": "time", "Z": "dir"}
+
+
+def squeue(fmt=None, header=True, ids=None):
+    """Pending/running jobs; FMT takes the %i %j %T %t %M %Z fields of squeue -o."""
+    root = state_dir()
+    if header and fmt is None:
+        print(f"{'JOBID':>8} {'NAME':<16} {'ST':<3} {'TIME':>8}  DIR")
+    now = time.time()
+    for state, code, long in (("running", "R", "RUNNING"), ("pending", "PD", "PENDING")):
+        for p in sorted((root / state).glob("*.json")):
+            try:
+                job = json.loads(p.read_text())
+            except (OSError, ValueError):
+                continue                                    # moved while listing
+            if ids and str(job["id"]) not in ids:
+                continue
+            t = int(now - job.get("start", now))
+            if fmt is None:
+                print(f"{job['id']:>8} {job['name'][:16]:<16} {code:<3} {t // 60:>5}:{t % 60:02d}  {job['dir']}")
+                continue
+            vals = dict(job, state=long, code=code, time=f"{t // 60}:{t % 60:02d}")
+            print(re.sub(r"%(\w)", lambda m: str(vals.get(SQUEUE_FIELDS.get(m.group(1)), m.group(0))), fmt))
+
+
+def sacct(ids, fields):
+    """FIELDS (JobID, State, JobName, Elapsed) of the jobs IDS, '|'-separated."""
+    root = state_dir()
+    for jid in ids:
+        state, job = None, None
+        for folder, name in (("done", None), ("running", "RUNNING"), ("pending", "PENDING")):
+            try:
+                job = json.loads((root / folder / f"{jid}.json").read_text())
+            except (OSError, ValueError):
+                continue
+            status = job.get("status")
+            state = name or ("COMPLETED" if status == 0 else status if isinstance(status, str) else "FAILED")
+            break
+        if job is None:
+            continue
+        t = int(job.get("end", time.time()) - job.get("start", job.get("submit", time.time())))
+        vals = {"JobID": job["id"], "State": state, "JobName": job["name"], "Elapsed": f"{t // 60}:{t % 60:02d}"}
+        print("|".join(str(vals.get(f, "")) for f in fields))
+
+
+def scancel(ids):
+    root = state_dir()
+    for jid in ids:
+        src = root / "pending" / f"{jid}.json"
+        try:
+            job = json.loads(src.read_text())
+            src.unlink()
+        except FileNotFoundError:
+            print(f"scancel: error: job {jid} is not pending")
+            continue
+        job.update(end=time.time(), status="CANCELLED")
+        write_job(root / "done" / f"{jid}.json", job)
+
+# ─────────────────────────────────── shims ───────────────────────────────────
+SHIMS = {
+    "sbatch":   f'exec python3 "{HERE}/fake_slurm.py" sbatch "$@"',
+    "squeue":   f'exec python3 "{HERE}/fake_slurm.py" squeue "$@"',
+    "sacct":    f'exec python3 "{HERE}/fake_slurm.py" sacct "$@"',
+    "scancel":  f'exec python3 "{HERE}/fake_slurm.py" scancel "$@"',
+    "ibrun":    'exec "$@"',
+    "mpirun":   'while [[ "$1" == -* ]]; do shift 2; done; exec "$@"',
+    "vasp_std": f'exec python3 "{HERE}/fake_vasp.py"',
+    "vasp_gam": f'exec python3 "{HERE}/fake_vasp.py"',
+    "vasp_ncl": f'exec python3 "{HERE}/fake_vasp.py"',
+    "vaspkit":  f'exec python3 "{HERE}/fake_vaspkit.py"',
+    "module":   ':',
+}
+
+
+def write_shims(bindir):
+    bindir = Path(bindir)
+    bindir.mkdir(parents=True, exist_ok=True)
+    shims = dict(SHIMS)
+    if shutil.which("python") is None:                    # scripts that call `python`
+        shims["python"] = 'exec python3 "$@"'
+    for name, body in shims.items():
+        path = bindir / name
+        path.write_text(f"#!/usr/bin/env bash\n# fake_slurm.py shim\n{body}\n")
+        path.chmod(0o755)
+    return sorted(shims)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("shims")
+    p.add_argument("bindir")
+    p = sub.add_parser("sbatch")
+    p.add_argument("script")
+    p.add_argument("args", nargs=argparse.REMAINDER)
+    p = sub.add_parser("squeue", add_help=False)               # -h is --noheader, as in squeue
+    p.add_argument("-h", "--noheader", action="store_true")
+    p.add_argument("-o", "--format")
+    p.add_argument("-j", "--jobs")
+    p.add_argument("-u", "--user")                          # every fake job is the user's
+    p = sub.add_parser("sacct")
+    p.add_argument("-j", "--jobs", required=True)
+    p.add_argument("-o", "--format", default="JobID,State")
+    for flag in ("-n", "-P", "-X"):
+        p.add_argument(flag, action="store_true")
+    p = sub.add_parser("scancel")
+    p.add_argument("ids", nargs="+", type=int)
+    p = sub.add_parser("drain")
+    p.add_argument("--max-running", type=int, default=os.cpu_count() or 4)
+    p = sub.add_parser("_exec")
+    p.add_argument("id", type=int)
+    args = ap.parse_args()
+
+    if args.cmd == "shims":
+        names = write_shims(args.bindir)
+        print(f"✅ {len(names)} shims in {args.bindir}: {' '.join(names)}")
+        print(f'   export PATH="{Path(args.bindir).resolve()}:$PATH"')
+    elif args.cmd == "sbatch":
+        if not Path(args.script).is_file():
+            print(f"sbatch: error: Unable to open file {args.script}", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(sbatch(args.script, args.args))
+    elif args.cmd == "squeue":
+        squeue(args.format, not args.noheader, args.jobs.split(",") if args.jobs else None)
+    elif args.cmd == "sacct":
+        sacct(args.jobs.split(","), args.format.split(","))
+    elif args.cmd == "scancel":
+        scancel(args.ids)
+    elif args.cmd == "drain":
+        ran, failed = drain(args.max_running)
+        print(f"{'✅' if not failed else '⚠️ '} {ran} job(s) run, {failed} failed")
+        sys.exit(1 if failed else 0)
+    elif args.cmd == "_exec":
+        rc = execute(state_dir(), args.id)
+        sys.exit(rc or 0)
+
+
+if __name__ == "__main__":
+    main()
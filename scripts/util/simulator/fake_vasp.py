@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+fake_vasp.py
+Local stand-in for vasp_std: reads the inputs of the current directory,
+sleeps for a modelled run time and writes OUTCAR, OSZICAR, CONTCAR,
+vasprun.xml, CHGCAR and WAVECAR in the formats the repo's parsers expect.
+
+Energies follow a per-atom equation of state E(V) = E0 + B·(V/V0 − 1)², so
+scale-factor scans have real minima, plus a small deterministic per-directory
+noise.  Stress is −dE/dV, moments come from MAGMOM when ISPIN = 2 and
+relaxations (IBRION 1/2/3, NSW > 0) take a few ionic steps towards V0 when
+ISIF ≥ 3.
+
+Usage
+-----
+fake_vasp.py                 # in a calculation directory (vasp_std shim)
+
+Environment
+-----------
+FAKE_VASP_SECONDS    fixed run time per call                    (default 0)
+FAKE_VASP_COST       extra seconds per atom² · k-point · step   (default 0)
+FAKE_VASP_V0         equilibrium volume per atom, Å³            (default 12.0)
+FAKE_VASP_STEPS      ionic steps of a relaxation                (default 3)
+FAKE_VASP_FAIL       fraction of directories that crash         (default 0)
+FAKE_VASP_WAVECAR_KB size of the WAVECAR written                (default 64)
+FAKE_VASP_NGRID      CHGCAR grid points per axis                (default 8)
+"""
+import hashlib
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from vasp_io import read_poscar, format_poscar  # noqa: E402
+from incar import Incar, expand_list  # noqa: E402
+
+E0, BULK = -7.5, 4.0                     # eV/atom, eV/atom curvature of E(V/V0)
+EV_A3_TO_KB = 1602.1766
+
+# ─────────────────────────────────── inputs ──────────────────────────────────
+def env(name, default, cast=float):
+    try:
+        return cast(os.environ.get(name, default))
+    except ValueError:
+        return cast(default)
+
+
+def seed_of(path):
+    """Deterministic per-directory seed (same directory → same numbers)."""
+    return int.from_bytes(hashlib.blake2b(str(path).encode(), digest_size=8).digest(), "little")
+
+
+def count_kpoints(path):
+    """Number of k-points implied by KPOINTS (grid product or explicit list)."""
+    try:
+        lines = Path(path).read_text().splitlines()
+        n = int(lines[1].split()[0])
+        if n > 0:
+            return n
+        return int(np.prod([int(x) for x in lines[3].split()[:3]]))
+    except (OSError, ValueError, IndexError):
+        return 1
+
+
+def magmom_list(incar, natoms):
+    raw = incar.raw("MAGMOM")
+    if raw is None:
+        return [1.0] * natoms
+    try:
+        vals = [float(x) for x in expand_list(raw)]
+    except ValueError:
+        return [1.0] * natoms
+    if len(vals) == 3 * natoms:                          # non-collinear: use |m|
+        vals = list(np.linalg.norm(np.reshape(vals, (natoms, 3)), axis=1))
+    return vals if len(vals) == natoms else [1.0] * natoms
+
+# ─────────────────────────────────── model ───────────────────────────────────
+def energy(volume, natoms, v0, noise):
+    x = volume / (natoms * v0) - 1.0
+    return natoms * (E0 + BULK * x * x) + noise
+
+
+def pressure_kb(volume, natoms, v0):
+    """−dE/dV in kB (positive = compressive, as VASP prints it)."""
+    x = volume / (natoms * v0) - 1.0
+    return -2.0 * BULK * x / v0 * EV_A3_TO_KB
+
+
+def trajectory(pos, incar, v0):
+    """Yield the structure of every ionic step."""
+    ibrion, nsw, isif = (incar.get(t, d) for t, d in (("IBRION", -1), ("NSW", 0), ("ISIF", 2)))
+    relax = nsw > 0 and ibrion in (1, 2, 3)
+    steps = min(nsw, env("FAKE_VASP_STEPS", 3, int)) if relax else 1
+    target = pos.natoms * v0
+    for i in range(max(steps, 1)):
+        p = pos.copy()
+        if relax and isif >= 3:
+            frac = (i + 1) / steps                          # move towards V0
+            ratio = (1 - frac) + frac * target / pos.volume
+            p.lattice = pos.lattice * ratio ** (1 / 3)
+        yield p
+
+# ─────────────────────────────────── writers ─────────────────────────────────
+def outcar_step(p, e, moments, rng, v0, nelm):
+    pk = pressure_kb(p.volume, p.natoms, v0)
+    cart = p.cart
+    forces = rng.normal(0, 0.01, cart.shape)
+    recip = np.linalg.inv(p.lattice).T
+    out = [f"       DAV:  {nelm:3d}   aborting loop because EDIFF is reached",
+           "",
+           "  VOLUME and BASIS-vectors are now :",
+           f"  volume of cell : {p.volume:14.2f}",
+           "      direct lattice vectors                 reciprocal lattice vectors"]
+    out += ["   " + "".join(f"{x:13.9f}" for x in a) + "  " + "".join(f"{x:13.9f}" for x in b)
+            for a, b in zip(p.lattice, recip)]
+    out += ["",
+           " POSITION                                       TOTAL-FORCE (eV/Angst)",
+           " -----------------------------------------------------------------------------------"]
+    out += [f" {c[0]:12.5f}{c[1]:12.5f}{c[2]:12.5f}   {f[0]:13.6f}{f[1]:13.6f}{f[2]:13.6f}"
+            for c, f in zip(cart, forces)]
+    out += [" -----------------------------------------------------------------------------------",
+            "  FORCE on cell =-STRESS in cart. coord.  units (eV):",
+            "  Direction    XX          YY          ZZ          XY          YZ          ZX",
+            f"  in kB  {pk:12.5f}{pk:12.5f}{pk:12.5f}{0:12.5f}{0:12.5f}{0:12.5f}",
+            f"  external pressure = {pk:12.2f} kB  Pullay stress =        0.00 kB",
+            "",
+            "  FREE ENERGIE OF THE ION-ELECTRON SYSTEM (eV)",
+            "  ---------------------------------------------------",
+            f"  free  energy   TOTEN  =     {e:16.8f} eV",
+            "",
+            f"  energy  without entropy=     {e:16.8f}  energy(sigma->0) =     {e:16.8f}",
+            ""]
+    if moments is not None:
+        out += [" magnetization (x)", " ", "# of ion       s       p       d       tot",
+                "------------------------------------------"]
+        out += [f"{i:5d}       {0.01 * m:6.3f}  {0.02 * m:6.3f}  {0.97 * m:6.3f}  {m:6.3f}"
+                for i, m in enumerate(moments, 1)]
+        out += ["--------------------------------------------------",
+                f"tot          {0.01 * sum(moments):6.3f}  {0.02 * sum(moments):6.3f}  "
+                f"{0.97 * sum(moments):6.3f}  {sum(moments):6.3f}", ""]
+    return "\n".join(out) + "\n"
+
+
+def write_chgcar(path, p, ngrid, rng):
+    grid = (1.0 + 0.05 * rng.random(ngrid ** 3)) * p.natoms * 8 / ngrid ** 3 * p.volume
+    body = [format_poscar(p).rstrip("\n"), "", f"{ngrid:5d}{ngrid:5d}{ngrid:5d}"]
+    for i in range(0, grid.size, 5):
+        body.append(" ".join(f"{v:.11E}" for v in grid[i:i + 5]))
+    Path(path).write_text("\n".join(body) + "\n")
+
+
+def write_vasprun(path, incar, steps, energies, symbols):
+    items = "\n".join(f'  <i name="{t}">{v}</i>' for t, v in incar.items())
+    atoms = "\n".join(f"   <rc><c>{s}</c><c>1</c></rc>" for s in symbols)
+    calcs = "\n".join(
+        f' <calculation>\n  <energy>\n   <i name="e_fr_energy">{e:16.8f}</i>\n'
+        f'   <i name="e_wo_entrp">{e:16.8f}</i>\n   <i name="e_0_energy">{e:16.8f}</i>\n'
+        f'  </energy>\n </calculation>' for e in energies)
+    last = steps[-1]
+    basis = "\n".join("     <v>" + " ".join(f"{x:16.8f}" for x in row) + " </v>" for row in last.lattice)
+    pos = "\n".join("   <v>" + " ".join(f"{x:16.8f}" for x in row) + " </v>" for row in last.frac)
+    Path(path).write_text(
+        '<?xml version="1.0" encoding="ISO-8859-1"?>\n<modeling>\n'
+        ' <generator>\n  <i name="program" type="string">vasp </i>\n'
+        '  <i name="version" type="string">6.3.0 (fake_vasp.py)</i>\n </generator>\n'
+        f' <incar>\n{items}\n </incar>\n'
+        f' <atominfo>\n  <atoms>{last.natoms}</atoms>\n  <array name="atoms">\n   <set>\n{atoms}\n   </set>\n  </array>\n </atominfo>\n'
+        f'{calcs}\n'
+        f' <structure name="finalpos">\n  <crystal>\n   <varray name="basis">\n{basis}\n   </varray>\n'
+        f'   <i name="volume">{last.volume:16.8f}</i>\n  </crystal>\n'
+        f'  <varray name="positions">\n{pos}\n  </varray>\n </structure>\n</modeling>\n')
+
+# ─────────────────────────────────── run ─────────────────────────────────────
+def run(workdir="."):
+    wd = Path(workdir).resolve()
+    missing = [f for f in ("POSCAR", "INCAR", "POTCAR") if not (wd / f).is_file()]
+    incar = Incar.read(wd / "INCAR") if (wd / "INCAR").is_file() else Incar()
+    if not (wd / "KPOINTS").is_file() and "KSPACING" not in incar:
+        missing.append("KPOINTS")
+    if missing:
+        print(f" VERY BAD NEWS! internal error in subroutine IBZKPT: missing {' '.join(missing)}")
+        return 1
+
+    pos = read_poscar(wd / "POSCAR")
+    rng = np.random.default_rng(seed_of(wd))
+    v0 = env("FAKE_VASP_V0", 12.0)
+    nkpts = count_kpoints(wd / "KPOINTS")
+    steps = list(trajectory(pos, incar, v0))
+    spin = incar.get("ISPIN", 1) == 2
+    moments = magmom_list(incar, pos.natoms) if spin else None
+    nelm = 12
+
+    t0 = time.time()
+    duration = env("FAKE_VASP_SECONDS", 0) + env("FAKE_VASP_COST", 0) * pos.natoms ** 2 * nkpts * len(steps)
+    crash = rng.random() < env("FAKE_VASP_FAIL", 0)
+
+    noise = rng.normal(0, 1e-3) * pos.natoms
+    energies = [energy(p.volume, p.natoms, v0, noise) for p in steps]
+    with open(wd / "OUTCAR", "w") as out, open(wd / "OSZICAR", "w") as osz:
+        out.write(" vasp.6.3.0 18Jan22 (build fake_vasp.py) complex\n"
+                  f" executed on             LinuxIFC date {time.strftime('%Y.%m.%d  %H:%M:%S')}\n"
+                  f" running on {os.environ.get('SLURM_NTASKS', '1')} total cores\n"
+                  f"   NIONS = {pos.natoms:6d}   NKPTS = {nkpts:6d}\n\n")
+        for i, (p, e) in enumerate(zip(steps, energies), 1):
+            if crash and i == len(steps):
+                break
+            time.sleep(duration / len(steps))
+            out.write(outcar_step(p, e, moments, rng, v0, nelm))
+            for j in range(1, nelm + 1):
+                osz.write(f"DAV: {j:3d}    {e + 10 ** (2 - j):.12E}   {10 ** (2 - j):.5E}\n")
+            mag = f"  mag={sum(moments):10.4f}" if spin else ""
+            osz.write(f"{i:4d} F= {e:.8E} E0= {e:.8E}  d E ={e - energies[i - 2] if i > 1 else e:.6E}{mag}\n")
+        if crash:
+            out.flush()
+            print(" forrtl: severe (174): SIGSEGV, segmentation fault occurred")
+            return 139
+        if incar.get("NSW", 0) > 0 and incar.get("IBRION", -1) in (1, 2, 3):
+            out.write("\n reached required accuracy - stopping structural energy minimisation\n")
+        elapsed = time.time() - t0
+        out.write("\n\n General timing and accounting informations for this job:\n"
+                  " ========================================================\n\n"
+                  f"                  Total CPU time used (sec):    {elapsed:12.3f}\n"
+                  f"                            User time (sec):    {elapsed:12.3f}\n"
+                  f"                          System time (sec):    {0:12.3f}\n"
+                  f"                         Elapsed time (sec):    {elapsed:12.3f}\n")
+
+    (wd / "CONTCAR").write_text(format_poscar(steps[-1]))
+    write_vasprun(wd / "vasprun.xml", incar, steps, energies, pos.elements)
+    if incar.get("LCHARG", True):
+        write_chgcar(wd / "CHGCAR", steps[-1], env("FAKE_VASP_NGRID", 8, int), rng)
+    if incar.get("LWAVE", True):
+        with open(wd / "WAVECAR", "wb") as f:
+            f.truncate(env("FAKE_VASP_WAVECAR_KB", 64, int) * 1024)
+    return 0
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ("-h", "--help"):
+        print(__doc__.strip())
+        return
+    try:
+        sys.exit(run())
+    except (OSError, ValueError, IndexError) as e:
+        print(f" VERY BAD NEWS! internal error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+fake_vaspkit.py
+Stand-in for the vaspkit menus the scripts drive through stdin.
+
+Only task 102 (k-mesh from a spacing) produces a file, written by
+util/kpoints.py the way vaspkit does; every other task is accepted and
+ignored so scripted pipelines keep going.
+
+Usage
+-----
+echo -e "102\\n2\\n0.03" | fake_vaspkit.py      # Gamma mesh, spacing 0.03 (2π/Å)
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from vasp_io import read_poscar  # noqa: E402
+from kpoints import kmesh, mesh_text  # noqa: E402
+
+
+def task_102(answers):
+    scheme = answers[0] if answers else "2"
+    spacing = float(answers[1]) if len(answers) > 1 else 0.04
+    mesh = kmesh(read_poscar("POSCAR").lattice, spacing)
+    Path("KPOINTS").write_text(mesh_text(mesh, spacing, "mp" if scheme == "1" else "gamma"))
+    print(f" -->> (01) Written KPOINTS File with {'x'.join(map(str, mesh))} mesh")
+
+
+def main():
+    answers = sys.stdin.read().split()
+    if not answers:
+        return
+    task = answers[0].lstrip("0") or "0"
+    try:
+        if task == "102":
+            task_102(answers[1:])
+        else:
+            print(f" fake_vaspkit: task {answers[0]} ignored")
+    except (OSError, ValueError, IndexError) as e:
+        print(f" fake_vaspkit: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+validate_inputs.py
+Pre-submission check of every calculation directory below a root, in
+parallel, so broken inputs are caught before the queue wait instead of
+after it.
+
+A calculation directory is one holding a POSCAR and an INCAR (directories
+with a COMPLETED marker are skipped unless --all).  Each directory is run
+through every check_* function of this module plus those of --plugin files;
+a check returns a list of (severity, message) with severity "error" or
+"warning".
+
+Usage
+-----
+validate_inputs.py [ROOT ...] [--only NAME ...] [--skip NAME ...] [--plugin FILE ...]
+                   [--json REPORT] [-j N] [--all] [--quiet] [--strict]
+validate_inputs.py --list
+
+Outputs
+-------
+A per-directory summary on stdout and, with --json, a report
+{"summary": {...}, "results": [{"dir", "check", "severity", "message"}, ...]}.
+Exit status 1 when any error was found (or any warning with --strict), so
+submit scripts can refuse to call sbatch.
+
+Built-in checks
+---------------
+files     POSCAR/INCAR/POTCAR present; KPOINTS present unless INCAR sets KSPACING
+poscar    POSCAR parses, cell volume > 0, no two atoms closer than 0.5 Å
+incar     incar.validate(): tag types, MAGMOM/LDAU* lengths against the POSCAR
+potcar    POTCAR TITEL species match the POSCAR species order; one functional
+kpoints   KPOINTS grid mode and positive subdivisions
+scaling   lattice lengths of POSCAR_scaled_X_Y_Z/ and scale_S/POSCAR_z_Z/
+          directories against the unscaled reference POSCAR (for a POSCAR
+          seeded by seed_from_relaxed.py, the POSCAR.unseeded it keeps, and
+          a and b of the seeded POSCAR against it; c is seeded)
+
+A plugin is any Python file defining check_<name>(calc) functions; calc is
+a Calc with the directory, its file names and cached parsed inputs.
+"""
+import argparse
+import functools
+import importlib.util
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from vasp_io import read_poscar  # noqa: E402
+import incar as incar_mod  # noqa: E402
+from calc_catalog import SKIP_DIRS, SCALED_PAT, Z_PAT, SCALE_PAT  # noqa: E402
+
+MIN_DISTANCE = 0.5     # Å
+SCALE_TOL = 1e-3       # Å, as check_scaling.py
+TITEL_RE = re.compile(rb"TITEL\s*=\s*(\S+)\s+(\S+)")
+HEADER_RE = re.compile(rb"^\s*((?:PAW|US)\S*)\s+(\S+)(?:\s+\S+)?\s*$", re.M)   # dataset first lines
+
+# ─────────────────────────────────── calc ────────────────────────────────────
+class Calc:
+    """One calculation directory; parsed inputs are read once and shared by checks."""
+
+    def __init__(self, path, files):
+        self.path = Path(path)
+        self.files = set(files)
+
+    def has(self, name):
+        return name in self.files
+
+    @functools.cached_property
+    def poscar(self):
+        return read_poscar(self.path / "POSCAR")
+
+    @functools.cached_property
+    def incar(self):
+        return incar_mod.Incar.read(self.path / "INCAR")
+
+    @functools.cached_property
+    def potcar_titels(self):
+        """[(functional, label)] of every TITEL line, e.g. ('PAW_PBE', 'Fe_pv')."""
+        with open(self.path / "POTCAR", "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                found = TITEL_RE.findall(mm) or HEADER_RE.findall(mm)
+                return [(a.decode(), b.decode()) for a, b in found]
+
+
+def walk(root, include_done=False):
+    """Yield (directory, file names) of the calculation directories below ROOT."""
+    stack = [str(root)]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        files = {e.name for e in entries if e.is_file()}
+        if "POSCAR" in files and "INCAR" in files and (include_done or "COMPLETED" not in files):
+            yield d, files
+        stack.extend(e.path for e in entries
+                     if e.is_dir(follow_symlinks=False) and e.name not in SKIP_DIRS)
+
+# ─────────────────────────────────── checks ──────────────────────────────────
+def check_files(calc):
+    """POSCAR/INCAR/POTCAR present; KPOINTS unless KSPACING is set."""
+    out = [("error", f"{name} missing") for name in ("POSCAR", "INCAR", "POTCAR")
+           if not calc.has(name)]
+    if not calc.has("KPOINTS") and calc.incar.get("KSPACING") is None:
+        out.append(("error", "KPOINTS missing and INCAR sets no KSPACING"))
+    return out
+
+
+def check_poscar(calc):
+    """POSCAR parses, non-zero volume, no overlapping atoms."""
+    p = calc.poscar
+    out = []
+    if p.natoms == 0 or len(p.frac) != p.natoms:
+        out.append(("error", f"{len(p.frac)} coordinate rows for {p.natoms} atoms"))
+    det = np.linalg.det(p.lattice)
+    if abs(det) < 1e-6:
+        return out + [("error", "cell volume is zero")]
+    if det < 0:
+        out.append(("warning", "left-handed lattice (negative triple product)"))
+    if 1 < p.natoms <= 2000:
+        d = p.frac[:, None, :] - p.frac[None, :, :]
+        d -= np.round(d)
+        dist = np.linalg.norm(d @ p.lattice, axis=-1)
+        np.fill_diagonal(dist, np.inf)
+        i, j = np.unravel_index(np.argmin(dist), dist.shape)
+        if dist[i, j] < MIN_DISTANCE:
+            out.append(("error", f"atoms {i + 1} and {j + 1} are {dist[i, j]:.3f} Å apart"))
+    return out
+
+
+def check_incar(calc):
+    """INCAR tag types and per-atom / per-species list lengths."""
+    natoms = nspecies = None
+    if calc.has("POSCAR"):
+        natoms, nspecies = calc.poscar.natoms, len(calc.poscar.symbols)
+    return [("error", msg) for msg in incar_mod.validate(calc.incar, natoms, nspecies)]
+
+
+def check_potcar(calc):
+    """POTCAR species order matches POSCAR; a single functional."""
+    if not calc.has("POTCAR"):
+        return []
+    titels = calc.potcar_titels
+    if not titels:
+        return [("error", "POTCAR has no TITEL lines")]
+    species = [label.split("_")[0] for _, label in titels]
+    out = []
+    if calc.has("POSCAR") and species != list(calc.poscar.symbols):
+        out.append(("error", f"POTCAR species {' '.join(species)} ≠ POSCAR "
+                             f"{' '.join(calc.poscar.symbols)}"))
+    functionals = sorted({f for f, _ in titels})
+    if len(functionals) > 1:
+        out.append(("warning", f"mixed POTCAR functionals: {', '.join(functionals)}"))
+    return out
+
+
+def check_kpoints(calc):
+    """KPOINTS grid mode and positive subdivisions."""
+    if not calc.has("KPOINTS"):
+        return []
+    lines = (calc.path / "KPOINTS").read_text(errors="replace").splitlines()
+    if len(lines) < 3:
+        return [("error", "KPOINTS shorter than 3 lines")]
+    try:
+        n = int(lines[1].split()[0])
+    except (ValueError, IndexError):
+        return [("error", f"KPOINTS line 2 is not a k-point count: {lines[1]!r}")]
+    mode = lines[2].strip()[:1].upper()
+    if n != 0 or mode not in ("G", "M"):
+        return []                                  # explicit list or line mode
+    try:
+        grid = [int(x) for x in lines[3].split()[:3]]
+    except (ValueError, IndexError):
+        return [("error", "KPOINTS grid line missing or not three integers")]
+    if len(grid) != 3 or min(grid) < 1:
+        return [("error", f"KPOINTS subdivisions {grid} must be three positive integers")]
+    return []
+
+
+@functools.lru_cache(maxsize=256)
+def _lengths(poscar):
+    return np.linalg.norm(read_poscar(poscar).lattice, axis=1)
+
+
+def scaling_reference(path):
+    """(candidate factor triples, reference POSCAR) for a scaled directory, or None.
+
+    scale_S/ only names the a-axis factor: setup_varied_scale_factors.sh
+    leaves b at 1 unless x and y are coupled, so both readings are accepted.
+    """
+    m = SCALED_PAT.search(path.name)
+    if m:
+        candidates = [np.array([float(x) for x in m.groups()])]
+        refs = [path.parent / "POSCAR", path.parent / "POSCAR_scaled_1_1_1" / "POSCAR"]
+    else:
+        mz, ms = Z_PAT.search(path.name), SCALE_PAT.search(path.parent.name)
+        if not (mz and ms):
+            return None
+        s, z = float(ms.group(1)), float(mz.group(1))
+        candidates = [np.array([s, s, z]), np.array([s, 1.0, z])]
+        refs = [path.parent.parent / "POSCAR"]
+    for ref in refs:
+        if ref.is_file() and ref.resolve() != (path / "POSCAR").resolve():
+            return candidates, ref
+    return candidates, None
+
+
+def check_scaling(calc):
+    """Lattice of scaled directories against the reference POSCAR."""
+    found = scaling_reference(calc.path)
+    if found is None:
+        return []
+    candidates, ref = found
+    if ref is None:
+        return [("warning", "scaled directory without a reference POSCAR to compare to")]
+    if calc.has("OUTCAR"):
+        return []                                  # POSCAR may be a relaxed restart
+    got = np.linalg.norm(calc.poscar.lattice, axis=1)
+    if calc.has("POSCAR.unseeded"):                # c came from relaxed neighbours
+        intended = _lengths(str(calc.path / "POSCAR.unseeded"))
+        if np.any(np.abs(got[:2] - intended[:2]) >= SCALE_TOL):
+            return [("error", "seeded POSCAR changed the in-plane lattice: a, b = "
+                     + " ".join(f"{x:.4f}" for x in got[:2]) + " Å, POSCAR.unseeded has "
+                     + " ".join(f"{x:.4f}" for x in intended[:2]))]
+        got = intended
+    ref_len = _lengths(str(ref))
+    if any(np.all(np.abs(got - ref_len * f) < SCALE_TOL) for f in candidates):
+        return []
+    expected = ref_len * candidates[0]
+    return [("error", "lattice lengths " + " ".join(f"{x:.4f}" for x in got) +
+             " Å, expected " + " ".join(f"{x:.4f}" for x in expected) +
+             f" from {ref} × " + " ".join(f"{x:g}" for x in candidates[0]))]
+
+# ─────────────────────────────────── runner ──────────────────────────────────
+def collect_checks(plugins=(), only=None, skip=()):
+    """{name: function} of the built-in and plugin check_* functions."""
+    namespaces = [globals()]
+    for path in plugins:
+        spec = importlib.util.spec_from_file_location(Path(path).stem, path)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        namespaces.append(vars(mod))
+    checks = {}
+    for ns in namespaces:
+        for name, fn in ns.items():
+            if name.startswith("check_") and callable(fn):
+                checks[name[len("check_"):]] = fn
+    unknown = (set(only or ()) | set(skip)) - set(checks)
+    if unknown:
+        raise ValueError(f"unknown check(s): {', '.join(sorted(unknown))}")
+    return {n: f for n, f in checks.items() if (not only or n in only) and n not in skip}
+
+
+_CHECKS = {}
+
+
+def _init(plugins, only, skip):
+    for tag, kind in incar_mod.read_template_types().items():
+        incar_mod.TAG_TYPES.setdefault(tag, kind)
+    _CHECKS.update(collect_checks(plugins, only, skip))
+
+
+def run_dir(item):
+    """All check results for one directory as dicts."""
+    d, files = item
+    calc = Calc(d, files)
+    out = []
+    for name, fn in _CHECKS.items():
+        try:
+            found = fn(calc)
+        except Exception as e:                     # unreadable input is itself a finding
+            found = [("error", f"{type(e).__name__}: {e}")]
+        out += [{"dir": d, "check": name, "severity": sev, "message": msg}
+                for sev, msg in found]
+    return out
+
+
+def validate(roots, plugins=(), only=None, skip=(), jobs=None, include_done=False):
+    """Return (number of directories, list of findings)."""
+    items = sorted({d: files for root in roots for d, files in walk(root, include_done)}.items())
+    if len(items) < 32 or jobs == 1:
+        _init(plugins, only, skip)
+        return len(items), [r for item in items for r in run_dir(item)]
+    with ProcessPoolExecutor(jobs, initializer=_init, initargs=(plugins, only, skip)) as pool:
+        results = pool.map(run_dir, items, chunksize=max(1, len(items) // (4 * (jobs or os.cpu_count() or 1))))
+        return len(items), [r for rs in results for r in rs]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("roots", nargs="*", default=["."])
+    ap.add_argument("--only", nargs="+", metavar="NAME", help="run only these checks")
+    ap.add_argument("--skip", nargs="+", default=[], metavar="NAME")
+    ap.add_argument("--plugin", nargs="+", default=[], metavar="FILE",
+                    help="extra Python files with check_* functions")
+    ap.add_argument("--json", metavar="REPORT", help="write the machine-readable report ('-' = stdout)")
+    ap.add_argument("-j", "--jobs", type=int, help="worker processes (default: all cores)")
+    ap.add_argument("--all", action="store_true", help="include directories marked COMPLETED")
+    ap.add_argument("--quiet", action="store_true", help="print only the summary line")
+    ap.add_argument("--strict", action="store_true", help="warnings also fail")
+    ap.add_argument("--list", action="store_true", help="list available checks")
+    args = ap.parse_args()
+
+    try:
+        if args.list:
+            for name, fn in collect_checks(args.plugin).items():
+                print(f"{name:<10} {(fn.__doc__ or '').strip()}")
+            return
+        t0 = time.perf_counter()
+        n, results = validate(args.roots, args.plugin, args.only, args.skip, args.jobs, args.all)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(2)
+
+    errors = sum(r["severity"] == "error" for r in results)
+    warnings = len(results) - errors
+    bad_dirs = len({r["dir"] for r in results if r["severity"] == "error"})
+    summary = {"root": args.roots, "directories": n, "failed_directories": bad_dirs,
+               "errors": errors, "warnings": warnings,
+               "seconds": round(time.perf_counter() - t0, 3)}
+    if args.json:
+        text = json.dumps({"summary": summary, "results": results}, indent=1)
+        if args.json == "-":
+            print(text)
+        else:
+            tmp = f"{args.json}.tmp"
+            Path(tmp).write_text(text + "\n")
+            os.replace(tmp, args.json)
+
+    out = sys.stderr if args.json == "-" else sys.stdout
+    if not args.quiet:
+        for r in results:
+            mark = "❌" if r["severity"] == "error" else "⚠️ "
+            print(f"{mark} {r['dir']} [{r['check']}] {r['message']}", file=out)
+    fail = errors or (args.strict and warnings)
+    print(f"{'❌' if fail else '✅'} {n} calculation(s) checked in {summary['seconds']:.2f} s: "
+          f"{errors} error(s) in {bad_dirs} dir(s), {warnings} warning(s)", file=out)
+    sys.exit(1 if fail else 0)
+
+
+if __name__ == "__main__":
+    main()
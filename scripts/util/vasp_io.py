@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+vasp_io.py
+Shared readers/writers for VASP structure and output files.
+
+Scripts in other directories import this module with
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[N] / "util"))
+    from vasp_io import read_poscar
+
+so that every tool works on the same structure data instead of re-parsing
+POSCAR lines on its own.
+"""
+import mmap
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+# ─────────────────────────────────── POSCAR ──────────────────────────────────
+@dataclass
+class Poscar:
+    """In-memory POSCAR/CONTCAR.
+
+    lattice   – 3×3 Å, rows are lattice vectors with the scale factor applied
+    frac      – N×3 fractional coordinates
+    symbols   – species in file order
+    counts    – atoms per species
+    selective – N×3 bool flags or None when Selective dynamics is absent
+    """
+    comment: str
+    lattice: np.ndarray
+    symbols: list
+    counts: list
+    frac: np.ndarray
+    selective: np.ndarray = None
+
+    @property
+    def natoms(self):
+        return int(sum(self.counts))
+
+    @property
+    def elements(self):
+        return np.repeat(self.symbols, self.counts)
+
+    @property
+    def cart(self):
+        return self.frac @ self.lattice
+
+    @property
+    def volume(self):
+        return abs(np.linalg.det(self.lattice))
+
+    def copy(self):
+        return Poscar(self.comment, self.lattice.copy(), list(self.symbols),
+                      list(self.counts), self.frac.copy(),
+                      None if self.selective is None else self.selective.copy())
+
+
+def read_poscar(fname):
+    """Parse a VASP5 POSCAR/CONTCAR into a Poscar."""
+    return parse_poscar_lines(Path(fname).read_text().splitlines())[0]
+
+
+def parse_poscar_lines(txt):
+    """Parse POSCAR lines (e.g. the header of a CHGCAR); return (Poscar, lines used)."""
+    comment = txt[0].strip()
+    scale = [float(x) for x in txt[1].split()]
+    lattice = np.array([[float(x) for x in ln.split()[:3]] for ln in txt[2:5]])
+    if len(scale) == 3:
+        lattice = lattice * np.array(scale)
+    elif scale[0] < 0:                       # negative scale = target volume
+        lattice = lattice * (-scale[0] / abs(np.linalg.det(lattice))) ** (1 / 3)
+    else:
+        lattice = lattice * scale[0]
+
+    ptr = 5
+    if txt[ptr].split()[0].isdigit():        # VASP4: no symbols line
+        symbols = comment.split()
+    else:
+        symbols = txt[ptr].split()
+        ptr += 1
+    counts = [int(x) for x in txt[ptr].split()]
+    symbols = symbols[:len(counts)]
+    natoms = sum(counts)
+    ptr += 1
+
+    selective = txt[ptr].strip()[:1].lower() == "s"
+    if selective:
+        ptr += 1
+    cartesian = txt[ptr].strip()[:1].lower() in ("c", "k")
+    ptr += 1
+
+    rows = [txt[i].split() for i in range(ptr, ptr + natoms)]
+    coords = np.array([[float(x) for x in r[:3]] for r in rows]).reshape(-1, 3)
+    if cartesian:
+        coords = coords @ np.linalg.inv(lattice)
+    flags = None
+    if selective:
+        flags = np.array([[f.upper().startswith("T") for f in r[3:6]] for r in rows])
+    return Poscar(comment, lattice, symbols, counts, coords, flags), ptr + natoms
+
+
+def format_poscar(p):
+    """Return the POSCAR text for a Poscar (scale 1.0, Direct coordinates)."""
+    out = [p.comment, "1.0"]
+    out += ["  " + "  ".join(f"{x:20.16f}" for x in v) for v in p.lattice]
+    out.append("  " + "  ".join(p.symbols))
+    out.append("  " + "  ".join(str(c) for c in p.counts))
+    if p.selective is not None:
+        out.append("Selective dynamics")
+    out.append("Direct")
+    for i, r in enumerate(p.frac):
+        line = "  " + "  ".join(f"{x:19.16f}" for x in r)
+        if p.selective is not None:
+            line += "  " + "  ".join("T" if f else "F" for f in p.selective[i])
+        out.append(line)
+    return "\n".join(out) + "\n"
+
+
+def write_poscar(fname, p):
+    Path(fname).write_text(format_poscar(p))
+
+# ─────────────────────────────────── OUTCAR ──────────────────────────────────
+def _map(path):
+    f = open(path, "rb")
+    if os.fstat(f.fileno()).st_size == 0:
+        f.close()
+        return None, None
+    return f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def read_outcar_stress(path):
+    """Return the last stress tensor of an OUTCAR as Voigt (xx yy zz yz zx xy), GPa.
+
+    VASP prints -σ in kBar (positive = compressive) in XX YY ZZ XY YZ ZX order;
+    the returned value is the physical stress with tension positive.
+    """
+    f, mm = _map(path)
+    if mm is None:
+        return None
+    try:
+        pos = mm.rfind(b"  in kB ")
+        if pos < 0:
+            return None
+        mm.seek(pos)
+        vals = [float(x) for x in mm.readline().split()[2:8]]
+    finally:
+        mm.close(); f.close()
+    xx, yy, zz, xy, yz, zx = vals
+    return -0.1 * np.array([xx, yy, zz, yz, zx, xy])
+
+
+def read_outcar_energy(path):
+    """Return the last 'free  energy   TOTEN' value (eV) or None."""
+    f, mm = _map(path)
+    if mm is None:
+        return None
+    try:
+        pos = mm.rfind(b"free  energy   TOTEN")
+        if pos < 0:
+            return None
+        mm.seek(pos)
+        line = mm.readline().decode()
+    finally:
+        mm.close(); f.close()
+    return float(line.split("=")[1].split()[0])
+
+
+def outcar_finished(path):
+    """True when the OUTCAR carries VASP's timing footer."""
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            f.seek(max(0, size - 16384))
+            return b"General timing and accounting" in f.read()
+    except OSError:
+        return False
+
+
+def read_outcar_magnetization(path):
+    """Return (column labels, N×k array) for the last 'magnetization (x)' block.
+
+    Columns are the orbital labels VASP prints (s p d [f] tot); None when the
+    OUTCAR has no magnetization block or the block has no ion rows.
+    """
+    f, mm = _map(path)
+    if mm is None:
+        return None
+    try:
+        pos = mm.rfind(b"magnetization (x)")
+        if pos < 0:
+            return None
+        mm.seek(pos)
+        mm.readline()                      # title
+        mm.readline()                      # blank
+        header = mm.readline().decode().split()
+        mm.readline()                      # dashes
+        rows = []
+        while True:
+            parts = mm.readline().split()
+            if not parts or not parts[0].isdigit():
+                break
+            rows.append([float(x) for x in parts[1:]])
+    finally:
+        mm.close(); f.close()
+    if not rows:
+        return None
+    labels = header[3:] if header[:3] == ["#", "of", "ion"] else header[-len(rows[0]):]
+    return labels, np.array(rows)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+vtools.py
+Single entry point for the Python tools, with lazy imports and a batch mode.
+
+Only the module a subcommand needs is imported, and only when it runs, so
+light commands (lengths, compare) start without numpy-heavy or pandas/scipy
+imports.  `batch` reads one command per stdin line and answers all of
+them from one process, which removes the interpreter start-up from shell
+loops.
+
+Usage
+-----
+vtools.py lengths [FILE ...]           # PATH<TAB>A<TAB>B<TAB>C; paths from stdin if none given
+vtools.py compare [A B] [--tol 1e-8]   # prints true/false (default POSCAR CONTCAR)
+vtools.py minima PATTERN               # local energy minima (energy_minima.py)
+vtools.py <tool> ARGS ...              # any tool listed by `vtools.py --help`
+vtools.py batch [--sep STR]            # one command per stdin line
+
+Batch mode
+----------
+Each stdin line is one command without the leading `vtools.py`, e.g.
+
+    printf 'compare a/POSCAR a/CONTCAR\\nlengths b/CONTCAR\\n' | vtools.py batch
+
+The text output of each command is followed by a NUL byte (or --sep), so
+shell callers can read answers with `read -r -d ''`.  A failing command
+writes its error to stderr and an empty answer.
+"""
+import contextlib
+import importlib
+import io
+import shlex
+import sys
+from pathlib import Path
+
+SCRIPTS = Path(__file__).resolve().parents[1]
+
+# tool name → (directory below scripts/, module); imported on first use
+TOOLS = {
+    "minima": ("util", "energy_minima"),
+    "incar": ("util", "incar"),
+    "catalog": ("util", "calc_catalog"),
+    "results": ("util", "results_store"),
+    "archive": ("util", "result_archive"),
+    "inputs": ("util", "input_store"),
+    "scratch": ("util", "scratch_manager"),
+    "collect": ("util", "collect_calcs"),
+    "spawn": ("util/batch_calcs", "spawn_follow_ups"),
+    "events": ("util", "events"),
+    "jobs": ("util", "job_tracker"),
+    "chgcar": ("util", "chgcar"),
+    "validate": ("util", "validate_inputs"),
+    "kpoints": ("util", "kpoints"),
+    "neighbours": ("util", "neighbours"),
+    "supercell": ("structure/editor", "supercell"),
+    "seed": ("structure/editor", "seed_from_relaxed"),
+    "elastic": ("structure/elastic", "elastic_analysis"),
+    "elastic-fit": ("structure/elastic", "elastic_fit"),
+    "fc-interp": ("structure/phonons", "fc_interpolate"),
+    "descriptors": ("structure/analysis", "descriptors"),
+    "retention": ("magnetism", "magnetic_retention"),
+    "exchange": ("magnetism", "exchange_fit"),
+}
+
+# ─────────────────────────────────── built-ins ───────────────────────────────
+def lattice_lengths(path):
+    """Return (a, b, c) in Å from the header of a POSCAR/CONTCAR (no numpy)."""
+    with open(path) as f:
+        lines = [next(f) for _ in range(5)]
+    scale = [float(x) for x in lines[1].split()]
+    vecs = [[float(x) for x in ln.split()[:3]] for ln in lines[2:5]]
+    if len(scale) == 3:
+        vecs = [[v * s for v, s in zip(row, scale)] for row in vecs]
+    else:
+        s = scale[0]
+        if s < 0:                                  # negative scale = target volume
+            a, b, c = vecs
+            det = abs(a[0] * (b[1] * c[2] - b[2] * c[1]) - a[1] * (b[0] * c[2] - b[2] * c[0])
+                      + a[2] * (b[0] * c[1] - b[1] * c[0]))
+            s = (-s / det) ** (1 / 3)
+        vecs = [[v * s for v in row] for row in vecs]
+    return tuple(sum(v * v for v in row) ** 0.5 for row in vecs)
+
+
+def cmd_lengths(args):
+    paths = args or [ln.strip() for ln in sys.stdin if ln.strip()]
+    status = 0
+    for p in paths:
+        try:
+            a, b, c = lattice_lengths(p)
+            print(f"{p}\t{a:.6f}\t{b:.6f}\t{c:.6f}")
+        except (OSError, ValueError, IndexError, StopIteration) as e:
+            print(f"Error: {p}: {e}", file=sys.stderr)
+            status = 1
+    return status
+
+
+def same_structure(a, b, tol=1e-8):
+    """Line-by-line numeric comparison of two structure files (comment line ignored)."""
+    with open(a) as fa, open(b) as fb:
+        la, lb = fa.readlines(), fb.readlines()
+    if len(la) != len(lb):
+        return False
+    for i, (p, c) in enumerate(zip(la, lb)):
+        p, c = p.strip(), c.strip()
+        if i == 0 or (not p and not c):
+            continue
+        if not p or not c:
+            return False
+        try:
+            pn, cn = [float(x) for x in p.split()], [float(x) for x in c.split()]
+        except ValueError:
+            if p != c:
+                return False
+            continue
+        if len(pn) != len(cn):
+            return False
+        if any(abs(x - y) > tol * max(1.0, abs(x), abs(y)) for x, y in zip(pn, cn)):
+            return False
+    return True
+
+
+def cmd_compare(args):
+    tol = 1e-8
+    if "--tol" in args:
+        i = args.index("--tol")
+        tol = float(args[i + 1])
+        args = args[:i] + args[i + 2:]
+    a, b = args if args else ("POSCAR", "CONTCAR")
+    try:
+        same = same_structure(a, b, tol)
+    except OSError:
+        print("false")
+        return 1
+    print("true" if same else "false")
+    return 0
+
+
+BUILTINS = {"lengths": cmd_lengths, "compare": cmd_compare}
+
+# ─────────────────────────────────── dispatch ────────────────────────────────
+def run_tool(name, args):
+    """Run TOOL's main() in-process with ARGS; return its exit status."""
+    subdir, module = TOOLS[name]
+    path = str(SCRIPTS / subdir)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    mod = importlib.import_module(module)
+    argv = sys.argv
+    sys.argv = [f"vtools.py {name}", *args]
+    try:
+        mod.main()
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    finally:
+        sys.argv = argv
+    return 0
+
+
+def dispatch(argv):
+    if not argv or argv[0] in ("-h", "--help"):
+        print(__doc__.strip())
+        print("\nTools: " + ", ".join(sorted([*BUILTINS, *TOOLS])))
+        return 0
+    name, args = argv[0], argv[1:]
+    if name in BUILTINS:
+        return BUILTINS[name](args)
+    if name in TOOLS:
+        return run_tool(name, args)
+    print(f"❌ Unknown command: {name}", file=sys.stderr)
+    return 2
+
+
+def batch(sep="\0"):
+    """Answer one command per stdin line; return the number of failed commands."""
+    failed = 0
+    out = sys.stdout
+    for line in sys.stdin:
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        buf = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(buf):
+                status = dispatch(shlex.split(line))
+        except Exception as e:                       # keep serving the other requests
+            print(f"Error: {line.strip()}: {e}", file=sys.stderr)
+            status = 1
+        failed += status != 0
+        out.write(buf.getvalue() + sep)
+        out.flush()
+    return failed
+
+
+def main():
+    argv = sys.argv[1:]
+    if argv and argv[0] == "batch":
+        sep = "\0"
+        if "--sep" in argv:
+            sep = argv[argv.index("--sep") + 1].encode().decode("unicode_escape")
+        sys.exit(1 if batch(sep) else 0)
+    sys.exit(dispatch(argv))
+
+
+if __name__ == "__main__":
+    main()